@@ -1,5 +1,12 @@
-import pandas as pd
+import numpy as np
+import contextlib
+import hashlib
+import json
+import math
+import multiprocessing
+import os
 import random
+import time
 import heapq  # 우선순위 큐를 위한 모듈
 from collections import defaultdict
 
@@ -115,41 +122,426 @@ class DataManager:
         return choice_groups
     
     @staticmethod
-    def get_selection_group_blocks(grouped_blocks, selection_groups, grade=2):
+    def get_selection_group_blocks(grouped_blocks, selection_groups, grade=None):
         """
         학년별 특별 선택 그룹(A, B, C 등) 블록 추출
         
-        특정 학년의 선택 그룹(선택A, 선택B 등)에 해당하는 블록들을 추출합니다.
+        선택 그룹(선택A, 선택B 등)에 해당하는 블록들을 추출합니다.
         이는 같은 시간대에 여러 과목이 동시에 진행되는 형태입니다.
+        학년마다 같은 그룹 이름을 쓸 수 있으므로 결과는 (학년, 그룹 이름)으로 구분합니다.
         
         Args:
             grouped_blocks: 그룹화된 수업 블록 리스트
-            selection_groups: 선택 그룹 정보 딕셔너리
-            grade: 학년 (기본값: 2학년)
+            selection_groups: 선택 그룹 정보 딕셔너리 {학년: {그룹 이름: [과목]}} 또는 SelectionGroupIndex
+            grade: 학년 (기본값: None, selection_groups의 모든 학년)
             
         Returns:
-            선택 그룹별 블록 딕셔너리
+            선택 그룹별 블록 딕셔너리 {(학년, 그룹 이름): [블록]} (selection_groups 순서)
         """
-        # 해당 학년의 선택 그룹이 없으면 빈 딕셔너리 반환
-        if grade not in selection_groups:
-            return {}
+        index = SelectionGroupIndex.of(selection_groups)
         
-        result = {}  # 결과를 저장할 딕셔너리
+        # 블록을 한 번만 훑으며 (학년, 과목) 조회로 해당 그룹에 추가
+        group_blocks = defaultdict(list)
+        for block in grouped_blocks:
+            if grade is None or block['grade'] == grade:
+                for group_name in index.groups_of(block['grade'], block['subject']):
+                    group_blocks[(block['grade'], group_name)].append(block)
         
-        # 해당 학년의 각 선택 그룹(A, B, C 등)에 대해 처리
-        for group_name, subjects in selection_groups[grade].items():
-            group_blocks = []  # 현재 그룹의 블록들을 저장할 리스트
-            
-            # 그룹화된 블록 중 현재 학년 및 선택 그룹에 해당하는 과목 찾기
-            for block in grouped_blocks:
-                if block['grade'] == grade and block['subject'] in subjects:
-                    group_blocks.append(block)
+        # 블록이 있는 그룹만 selection_groups 순서대로 반환
+        return {key: group_blocks[key] for key in index.keys(grade) if group_blocks.get(key)}
+    
+    @staticmethod
+    def classify_blocks(grouped_blocks, selection_groups):
+        """
+        그룹화된 블록을 배치 방식별로 분류
+        
+        Args:
+            grouped_blocks: 그룹화된 수업 블록 리스트
+            selection_groups: 선택 그룹 정보 딕셔너리 또는 SelectionGroupIndex
             
-            # 그룹 블록이 있으면 결과에 추가
-            if group_blocks:
-                result[group_name] = group_blocks
+        Returns:
+            tuple: (특별 선택 그룹 블록 {(학년, 그룹 이름): [블록]}, 일반 선택 그룹 블록 {과목: [블록]},
+                    개별 과목 블록 리스트)
+        """
+        index = SelectionGroupIndex.of(selection_groups)
         
-        return result
+        # 1. 모든 학년의 특별 선택 그룹(선택A, B, C 등) 추출
+        selection_group_blocks = DataManager.get_selection_group_blocks(grouped_blocks, index)
+        
+        # 2. 일반 선택 그룹('선택' 그룹) 추출
+        choice_group_blocks = DataManager.get_choice_groups(grouped_blocks)
+        
+        # 3. 특별 선택 또는 일반 선택 그룹에 속하지 않은 개별 과목
+        individual_blocks = [b for b in grouped_blocks
+                             if b['group'] != '선택' and not index.is_grouped(b['grade'], b['subject'])]
+        
+        return selection_group_blocks, choice_group_blocks, individual_blocks
+    
+    @staticmethod
+    def find_components(grouped_blocks, selection_groups, subject_rooms=None):
+        """
+        교사-학급 이분 그래프의 연결 요소 찾기
+        
+        교사와 학급을 정점으로, 수업 블록을 간선으로 보고 서로 교사를 공유하지 않는
+        독립된 묶음을 찾습니다. 같은 시간에 함께 배치해야 하는 선택 그룹(선택A 등)과
+        일반 선택 그룹('선택')의 블록, 개수가 제한된 같은 특별실을 쓰는 블록은 하나의 묶음으로 합칩니다.
+        
+        Args:
+            grouped_blocks: 그룹화된 수업 블록 리스트
+            selection_groups: 선택 그룹 정보 딕셔너리 또는 SelectionGroupIndex
+            subject_rooms: 개수가 제한된 특별실이 필요한 과목 {과목명: 특별실 종류}
+        
+        Returns:
+            연결 요소 리스트 [{"teachers": [교사명], "classes": [(학년, 반)]}]
+        """
+        parent = {}
+        
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]  # 경로 압축
+                node = parent[node]
+            return node
+        
+        def union(a, b):
+            parent[find(a)] = find(b)
+        
+        # 1. 교사와 담당 학급 연결
+        for block in grouped_blocks:
+            for cls in block['classes']:
+                union(("teacher", block['teacher']), ("class", block['grade'], cls))
+        
+        # 2. 같은 시간에 배치되는 선택 그룹 블록끼리 연결
+        linked = [DataManager.get_choice_groups(grouped_blocks).values(),
+                  DataManager.get_selection_group_blocks(grouped_blocks, selection_groups).values()]
+        for groups in linked:
+            for blocks in groups:
+                for block in blocks[1:]:
+                    union(("teacher", block['teacher']), ("teacher", blocks[0]['teacher']))
+        
+        # 3. 같은 특별실을 쓰는 교사끼리 연결 (따로 생성하면 합칠 때 방 개수를 넘을 수 있음)
+        for block in grouped_blocks:
+            room = (subject_rooms or {}).get(block['subject'])
+            if room is not None:
+                union(("teacher", block['teacher']), ("room", room))
+        
+        # 4. 대표 정점별로 교사와 학급 모으기 (입력 순서를 유지하여 결과가 항상 같도록)
+        components = {}
+        for node in parent:
+            component = components.setdefault(find(node), {"teachers": [], "classes": []})
+            if node[0] == "teacher":
+                component["teachers"].append(node[1])
+            elif node[0] == "class":
+                component["classes"].append(node[1:])
+        
+        return [dict(teachers=c["teachers"], classes=sorted(c["classes"])) for c in components.values()]
+
+class SelectionGroupIndex:
+    """
+    특별 선택 그룹(선택A, 선택B 등) 조회표
+    
+    selection_groups를 한 번만 훑어 양방향 조회표를 만들어 두므로, 블록 분류나 시수 검증에서
+    "이 과목이 어느 그룹에 속하는가", "이 셀 값이 그룹 이름인가"를 그룹 수와 관계없이 바로 찾습니다.
+    그룹 이름은 학년마다 따로 정할 수 있으므로 모든 조회는 (학년, 그룹 이름) 기준입니다.
+    """
+    
+    def __init__(self, selection_groups, teachers=None):
+        """
+        Args:
+            selection_groups: 선택 그룹 정보 {학년: {그룹 이름: [과목]}}
+            teachers: 교사 정보 (있으면 그룹별 담당 교사 조회표도 만듦)
+        """
+        self.selection_groups = selection_groups
+        self.subjects = {}                # (학년, 그룹 이름) -> 과목 튜플 (데이터 순서)
+        self.groups = defaultdict(list)   # (학년, 과목) -> 그 과목이 속한 그룹 이름 목록
+        self.teachers = defaultdict(set)  # (학년, 그룹 이름) -> 그룹 과목을 가르치는 교사
+        for grade, groups in selection_groups.items():
+            for group_name, subjects in groups.items():
+                self.subjects[(grade, group_name)] = tuple(subjects)
+                for subject in subjects:
+                    self.groups[(grade, subject)].append(group_name)
+        for teacher, info in (teachers or {}).items():
+            for subject_info in info['subjects']:
+                for group_name in self.groups.get((subject_info['grade'], subject_info['subject']), ()):
+                    self.teachers[(subject_info['grade'], group_name)].add(teacher)
+    
+    @classmethod
+    def of(cls, selection_groups):
+        """selection_groups 딕셔너리 또는 이미 만든 조회표를 조회표로 반환"""
+        return selection_groups if isinstance(selection_groups, cls) else cls(selection_groups)
+    
+    def keys(self, grade=None):
+        """(학년, 그룹 이름) 목록 (selection_groups 순서, grade를 주면 해당 학년만)"""
+        return [key for key in self.subjects if grade is None or key[0] == grade]
+    
+    def is_group(self, grade, label):
+        """반 시간표의 셀 값이 해당 학년의 그룹 이름인지 여부"""
+        return (grade, label) in self.subjects
+    
+    def is_grouped(self, grade, subject):
+        """과목이 해당 학년의 특별 선택 그룹에 속하는지 여부"""
+        return (grade, subject) in self.groups
+    
+    def subjects_of(self, grade, group_name):
+        """그룹에 속한 과목 (없는 그룹이면 빈 튜플)"""
+        return self.subjects.get((grade, group_name), ())
+    
+    def groups_of(self, grade, subject):
+        """과목이 속한 그룹 이름 목록 (속하지 않으면 빈 튜플)"""
+        return self.groups.get((grade, subject), ())
+    
+    def teachers_of(self, grade, group_name):
+        """그룹 과목을 가르치는 교사 집합 (teachers 없이 만들었으면 빈 집합)"""
+        return self.teachers.get((grade, group_name), set())
+
+# -----------------------------
+# 달력 모듈
+# -----------------------------
+class SchoolCalendar:
+    """
+    시간표의 요일/교시 구성을 담당하는 클래스
+    settings와 고정 시간으로부터 학급별로 배치 가능한 (요일, 교시) 목록을 미리 계산합니다.
+    요일 수와 요일별 교시 수는 모두 settings에서 가져오므로 8~9교시나 주 6일 수업도 지원합니다.
+    """
+    
+    def __init__(self, settings, fixed_slots):
+        """
+        초기화: 요일/교시 정보와 학급별 배치 가능 시간 계산
+        
+        Args:
+            settings: 시간표 설정 (요일, 요일별 교시 수, 학년별 학급 수)
+            fixed_slots: 고정 시간 슬롯 {(학년, 반, 요일, 교시, 라벨)}
+        """
+        self.days = list(settings['days'])
+        self.day_index = {day: i for i, day in enumerate(self.days)}  # 요일 -> 인덱스
+        self.periods_per_day = {day: settings['periods_per_day_by_day'][day] for day in self.days}
+        self.max_periods = max(self.periods_per_day.values())  # 시간표의 교시 열 수
+        
+        # 전체 수업 시간 목록 [(요일, 교시 인덱스), ...]
+        self.slots = [(day, period) for day in self.days for period in range(self.periods_per_day[day])]
+        
+        # 시간대 비트마스크: slots의 i번째 시간대 = i번째 비트 (시간대 집합의 교집합을 & 연산으로 계산)
+        self.slot_bit = {slot: 1 << i for i, slot in enumerate(self.slots)}
+        self.day_mask = defaultdict(int)  # 요일 -> 그 요일의 모든 시간대 비트
+        for slot, bit in self.slot_bit.items():
+            self.day_mask[slot[0]] |= bit
+        
+        # 학급별 고정 시간 {(학년, 반): {(요일, 교시 인덱스): 라벨}}
+        self.fixed = defaultdict(dict)
+        for (grade, cls, day, period, label) in fixed_slots:
+            self.fixed[(grade, cls)][(day, period - 1)] = label
+        
+        # 학급별 배치 가능 시간 (고정 시간 제외) - 설정된 모든 학급에 대해 미리 계산
+        self._open_slots = {}
+        self._open_periods = {}  # (학년, 반, 요일) -> 배치 가능 교시 목록
+        for grade, class_count in settings['grades'].items():
+            for cls in range(1, class_count + 1):
+                self.open_slots(grade, cls)
+    
+    def open_slots(self, grade, cls):
+        """
+        학급에 수업을 배치할 수 있는 (요일, 교시) 목록 (고정 시간 제외)
+        """
+        key = (grade, cls)
+        if key not in self._open_slots:
+            fixed = self.fixed.get(key, {})
+            self._open_slots[key] = [slot for slot in self.slots if slot not in fixed]
+        return self._open_slots[key]
+    
+    def open_periods(self, grade, cls, day):
+        """학급의 해당 요일에서 수업을 배치할 수 있는 교시 목록 (고정 시간 제외)"""
+        key = (grade, cls, day)
+        if key not in self._open_periods:
+            self._open_periods[key] = [period for d, period in self.open_slots(grade, cls) if d == day]
+        return self._open_periods[key]
+    
+    def to_mask(self, slots):
+        """(요일, 교시) 목록을 비트마스크로 변환"""
+        mask = 0
+        for slot in slots:
+            mask |= self.slot_bit[slot]
+        return mask
+    
+    def from_mask(self, mask):
+        """비트마스크를 (요일, 교시) 목록으로 변환 (slots 순서 유지)"""
+        return [slot for slot in self.slots if mask & self.slot_bit[slot]]
+    
+    def blocked_mask(self, unavailable):
+        """
+        교사 불가 시간 목록을 비트마스크로 변환
+        
+        Args:
+            unavailable: [(요일, 교시)] 목록 (교시는 고정 시간처럼 1부터 시작, None이면 그 요일 전체)
+                요일 문자열만 적으면 그 요일 전체로 처리합니다.
+                
+        Returns:
+            int: 수업할 수 없는 시간대 비트마스크
+        """
+        mask = 0
+        for entry in unavailable or []:
+            day, period = (entry, None) if isinstance(entry, str) else entry
+            if period is None:
+                mask |= self.day_mask.get(day, 0)
+            else:
+                mask |= self.slot_bit.get((day, int(period) - 1), 0)
+        return mask
+    
+    def is_fixed(self, grade, cls, day, period):
+        """해당 학급의 (요일, 교시)가 고정 시간인지 여부"""
+        return (day, period) in self.fixed.get((grade, cls), {})
+
+# -----------------------------
+# 탐색 기억 모듈
+# -----------------------------
+class NogoodMemory:
+    """
+    실패한 시도에서 찾은 충돌 배치 기억 (nogood)
+    
+    시수를 채우지 못한 수업을 혼자 막고 있던 배치 (배치 단위, 요일, 교시)에 가중치를 쌓고,
+    시도마다 감쇠시켜 오래된 기억은 사라지게 합니다. 가중치가 기준 이상인 시간대는
+    다음 시도에서 그 배치 단위의 후보에서 빼므로, 재시작이 같은 막다른 배치를 반복하지 않습니다.
+    배치 단위는 선택 그룹 (학년, 그룹 이름), 일반 선택 과목명, 개별 수업 (교사, 학년, 반, 과목)입니다.
+    """
+    
+    def __init__(self, decay=0.98, threshold=2.0, floor=0.1):
+        """
+        Args:
+            decay: 시도마다 곱하는 감쇠율 (0~1)
+            threshold: 후보에서 뺄 가중치 기준
+            floor: 이보다 작아진 기억은 삭제
+        """
+        self.decay = decay
+        self.threshold = threshold
+        self.floor = floor
+        self.conflicts = defaultdict(lambda: defaultdict(float))  # 배치 단위 -> {(요일, 교시): 가중치}
+        self.failures = defaultdict(float)  # 시수를 채우지 못한 (과목, 학년, 반) -> 가중치
+    
+    def clear(self):
+        """기억 모두 지우기 (새 실행 시작)"""
+        self.conflicts.clear()
+        self.failures.clear()
+    
+    def record(self, conflicts, failed):
+        """
+        실패한 시도 하나의 결과를 기억에 더하기 (기존 기억은 먼저 감쇠)
+        
+        Args:
+            conflicts: 충돌 배치 [(배치 단위, 요일, 교시)] (ScheduleManager.find_conflicts)
+            failed: 시수를 채우지 못한 (과목, 학년, 반) 목록
+        """
+        self.step()
+        for unit, day, period in conflicts:
+            self.conflicts[unit][(day, period)] += 1
+        for key in failed:
+            self.failures[key] += 1
+    
+    def step(self):
+        """모든 기억 감쇠 (floor보다 작아지면 삭제)"""
+        for unit in list(self.conflicts):
+            slots = self.conflicts[unit]
+            for slot in list(slots):
+                slots[slot] *= self.decay
+                if slots[slot] < self.floor:
+                    del slots[slot]
+            if not slots:
+                del self.conflicts[unit]
+        for key in list(self.failures):
+            self.failures[key] *= self.decay
+            if self.failures[key] < self.floor:
+                del self.failures[key]
+    
+    def filter(self, unit, slots):
+        """
+        배치 단위의 후보 시간대에서 기억된 충돌 시간대 빼기
+        
+        Returns:
+            남은 후보 리스트 (모두 빠지면 원래 후보를 그대로 반환)
+        """
+        remembered = self.conflicts.get(unit)
+        if not remembered:
+            return slots
+        kept = [slot for slot in slots if remembered.get(slot, 0) < self.threshold]
+        return kept or slots
+    
+    def failure_count(self, key):
+        """(과목, 학년, 반)이 최근 시도들에서 시수를 채우지 못한 정도 (감쇠된 횟수)"""
+        return self.failures.get(key, 0)
+    
+    def entries(self):
+        """
+        기억 내용 (가중치가 큰 순서)
+        
+        Returns:
+            list: [(가중치, 배치 단위, 요일, 교시)]
+        """
+        return sorted(((weight, unit, day, period)
+                       for unit, slots in self.conflicts.items()
+                       for (day, period), weight in slots.items()),
+                      key=lambda entry: (-entry[0], repr(entry[1:])))
+
+class PheromoneMatrix:
+    """
+    좋은 시도의 배치에서 배우는 시간대 선호도 (개미 집단 최적화의 페로몬)
+    
+    (배치 단위, 요일, 교시)마다 선호도를 두고, 시도가 끝날 때마다 한 번에 갱신합니다.
+    모든 선호도는 기본값 쪽으로 증발하고, 지금까지 배치 실패가 가장 적었던 시도와 같거나 더 좋은 시도의
+    배치에만 선호도를 더합니다. 후보 시간대는 선호도에 비례한 확률로 고릅니다.
+    기본값과 다른 선호도만 저장하므로 크기는 실제로 배치된 (배치 단위, 시간대) 수를 넘지 않습니다.
+    """
+    
+    def __init__(self, evaporation=0.1, deposit=1.0, initial=1.0, maximum=10.0):
+        """
+        Args:
+            evaporation: 시도마다 기본값 쪽으로 줄어드는 비율 (0~1)
+            deposit: 좋은 시도의 배치에 더하는 양 (배치 실패 수 + 1로 나눔)
+            initial: 기록이 없는 시간대의 선호도
+            maximum: 선호도 상한 (한 시간대로만 몰리지 않도록)
+        """
+        self.evaporation = evaporation
+        self.deposit = deposit
+        self.initial = initial
+        self.maximum = maximum
+        self.trails = defaultdict(dict)  # 배치 단위 -> {(요일, 교시): 선호도}
+        self.best_failed = float('inf')  # 지금까지 가장 적은 배치 실패 수
+    
+    def clear(self):
+        """선호도 모두 지우기 (새 실행 시작)"""
+        self.trails.clear()
+        self.best_failed = float('inf')
+    
+    def update(self, placements, failed):
+        """
+        시도 하나가 끝난 뒤 증발과 강화를 한 번에 적용
+        
+        Args:
+            placements: 이번 시도의 배치 {(요일, 교시): [(배치 단위, 수업 목록)]} (ScheduleManager.placements)
+            failed: 이번 시도에서 배치하지 못한 블록 수
+        """
+        keep = 1 - self.evaporation
+        for unit in list(self.trails):
+            slots = self.trails[unit]
+            for slot, value in list(slots.items()):
+                value = self.initial + (value - self.initial) * keep
+                if abs(value - self.initial) < 1e-3:
+                    del slots[slot]
+                else:
+                    slots[slot] = value
+            if not slots:
+                del self.trails[unit]
+        
+        if failed > self.best_failed:
+            return
+        self.best_failed = failed
+        amount = self.deposit / (failed + 1)
+        for slot, placed in placements.items():
+            for unit, _ in placed:
+                slots = self.trails[unit]
+                slots[slot] = min(self.maximum, slots.get(slot, self.initial) + amount)
+    
+    def weights(self, unit, slots):
+        """후보 시간대별 선호도 리스트 (slots와 같은 순서)"""
+        trail = self.trails.get(unit, {})
+        return [trail.get(slot, self.initial) for slot in slots]
 
 # -----------------------------
 # 시간표 배치 모듈 (우선순위 큐 활용)
@@ -161,49 +553,224 @@ class ScheduleManager:
     시수가 많은 과목을 우선적으로 여러 요일에 분산 배치합니다.
     """
     
-    def __init__(self, settings, fixed_slots):
+    def __init__(self, settings, fixed_slots, placement_order="constrained", teacher_limits=None,
+                 teacher_unavailable=None, subject_rooms=None, group_index=None):
         """
         초기화: 시간표 설정과 고정 시간 정보 저장
         
         Args:
             settings: 시간표 설정 (요일, 교시 수, 제약조건 등)
             fixed_slots: 고정 시간 슬롯 (조회, 종례, 점심시간 등)
+            placement_order: 배치 순서 전략
+                - "constrained": 남은 가능 시간대가 가장 적은 수업부터 배치 (기본값)
+                - "hours": 시수가 많은 수업부터 배치
+            teacher_limits: 교사별 주간 최대 시수 {교사명: 시수}
+                (settings['teacher_max_hours_mode']가 "hard"이면 초과 배치 금지)
+            teacher_unavailable: 교사별 수업 불가 시간 {교사명: [(요일, 교시)]}
+                (SchoolCalendar.blocked_mask 형식, 한 번만 비트마스크로 변환하여 모든 후보 검사에 사용)
+            subject_rooms: 과목별 필요한 특별실 종류 {과목명: 특별실 종류}
+                (settings['rooms']의 {특별실 종류: 개수}에 있는 종류만 적용)
+            group_index: 특별 선택 그룹 조회표 (SelectionGroupIndex, 그룹별 담당 교사 조회에 사용)
         """
         self.settings = settings
+        self.group_index = group_index
         self.fixed_slots = fixed_slots
+        self.placement_order = placement_order
+        self.teacher_limits = teacher_limits or {}
+        self.max_hours_hard = settings.get('teacher_max_hours_mode', 'soft') == 'hard'
+        self.teacher_load = defaultdict(int)  # 교사별 현재 주간 수업 시수 (_assign이 갱신)
+        self.calendar = SchoolCalendar(settings, fixed_slots)  # 학급별 배치 가능 시간
+        self.teacher_blocked = {}  # 교사별 수업 불가 시간 비트마스크
+        for teacher, unavailable in (teacher_unavailable or {}).items():
+            mask = self.calendar.blocked_mask(unavailable)
+            if mask:
+                self.teacher_blocked[teacher] = mask
+        
+        # 특별실: 교사 한 명의 수업 한 시간이 특별실 하나를 사용 (선택 그룹에서 여러 반이 함께 들어도 한 곳)
+        self.room_capacity = dict(settings.get('rooms', {}))  # 특별실 종류 -> 개수
+        self.subject_rooms = {subject: room for subject, room in (subject_rooms or {}).items()
+                              if room in self.room_capacity}
+        self.room_used = defaultdict(int)  # (특별실 종류, 요일, 교시) -> 사용 중인 수 (_assign이 갱신)
+        self.room_full = defaultdict(int)  # 특별실 종류 -> 모두 사용 중인 시간대 비트마스크
+        self._label_rooms = {}  # 교사 일정 라벨 -> 특별실 종류 (캐시)
+        self.rng = random.Random()  # 배치에 쓰는 난수 생성기 (TimetableManager가 시도별 시드 지정)
+        self.trace = None  # 배치 기록 리스트 (None이면 기록하지 않음, replay_trace로 재현)
+        
+        # 되돌리기 기록: _assign마다 바뀌기 전 값을 쌓아 두고 checkpoint/rollback으로 되돌림
+        # 시도마다 새로 만들지 않도록 처음 만든 시간표와 교사 일정을 재사용 (initialize_timetable 참고)
+        self.trail = []  # [(학년, 반, 요일, 교시, 이전 반 시간표 값, 교사, 이전 교사 일정 값)]
+        self._grids = None  # 재사용하는 (시간표, 교사 일정)
+        self._base_rows = None  # 고정 시간만 채운 학급별 [요일][교시] (초기화 기준)
+        
+        # 탐색 기억: 후보 시간대를 고를 때 기억된 충돌 시간대를 빼고 (NogoodMemory, None이면 사용 안 함),
+        # 실패 원인을 찾을 수 있도록 이번 시도에서 고른 배치를 (요일, 교시)별로 기록
+        self.nogoods = None
+        self.pheromone = None  # 학습 모드의 시간대 선호도 (PheromoneMatrix, None이면 균등하게 고름)
+        self.placements = defaultdict(list)  # (요일, 교시) -> [(배치 단위, [(학년, 반, 교사, 교사 일정 값)])]
+        
+        # (교사, 학급)별 배치 가능 시간대 캐시 (initialize_timetable마다 초기화)
+        # 배치가 일어나면 _assign이 해당 (교사, 요일)과 (학급, 요일)의 버전만 올려서 그 캐시만 무효화
+        self._teacher_version = defaultdict(int)
+        self._class_version = defaultdict(int)
+        self._pair_masks = {}  # (교사, 학년, 반, 요일) -> (교사 버전, 학급 버전, 비트마스크)
         
     def initialize_timetable(self):
         """
-        빈 시간표와 교사 일정 초기화
+        시도를 시작할 빈 시간표와 교사 일정 준비
         
-        모든 학년, 반에 대한 빈 시간표와 모든 교사에 대한 빈 일정을 생성합니다.
-        고정 시간 슬롯(조회, 종례, 점심시간 등)은 미리 채워 놓습니다.
+        처음 호출할 때 모든 학년, 반에 대한 빈 시간표와 교사 일정을 만들고 고정 시간 슬롯
+        (조회, 종례, 점심시간 등)을 채워 둡니다. 이후 호출에서는 같은 리스트를 제자리에서
+        고정 시간만 남은 상태로 되돌려 재사용하므로, 반환된 시간표는 다음 시도에서 바뀝니다.
+        시도가 끝난 뒤에도 남겨야 하는 결과는 snapshot으로 저장해야 합니다.
+        
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        if self._grids is None:
+            self._grids = self.new_timetable()
+            self._base_rows = {key: [list(row) for row in grid] for key, grid in self._grids[0].items()}
+        else:
+            timetable, teacher_schedule = self._grids
+            for key, grid in timetable.items():
+                base = self._base_rows.get(key)
+                for day_idx, row in enumerate(grid):
+                    row[:] = base[day_idx] if base else [""] * len(row)
+            for schedule in teacher_schedule.values():
+                for periods in schedule.values():
+                    periods[:] = [""] * len(periods)
+        
+        # 새 시도이므로 되돌리기 기록, 배치 기록, 배치 가능 시간대 캐시, 교사 시수, 특별실 사용 현황 초기화
+        self.trail.clear()
+        self.placements.clear()
+        self.teacher_load.clear()
+        self.room_used.clear()
+        self.room_full.clear()
+        self._teacher_version.clear()
+        self._class_version.clear()
+        self._pair_masks.clear()
+        
+        return self._grids
+    
+    def new_timetable(self):
+        """
+        고정 시간만 채운 새 시간표와 교사 일정 생성 (재사용하는 시간표와 별개)
         
         Returns:
             tuple: (시간표, 교사 일정)
         """
-        # 빈 시간표 생성 - 각 (학년, 반)마다 요일별, 교시별 빈 DataFrame 생성
-        timetable = defaultdict(lambda: pd.DataFrame(
-            [["" for _ in range(7)] for _ in range(len(self.settings['days']))],
-            index=self.settings['days'],
-            columns=[f"{i+1}교시" for i in range(7)]
-        ))
+        days = self.calendar.days
+        max_periods = self.calendar.max_periods  # 가장 긴 요일의 교시 수
+        
+        # 빈 시간표 생성 - 각 (학년, 반)마다 [요일][교시] 빈 문자열 2차원 리스트
+        # (pandas 없이 동작하며, 화면 표시용 DataFrame 변환은 presentation 모듈에서 담당)
+        timetable = defaultdict(lambda: [["" for _ in range(max_periods)] for _ in range(len(days))])
         
         # 빈 교사 일정 생성 - 각 교사마다 요일별, 교시별 빈 문자열 배열
         teacher_schedule = defaultdict(lambda: {
-            day: ["" for _ in range(7)] for day in self.settings['days']
+            day: ["" for _ in range(max_periods)] for day in days
         })
         
         # 고정 슬롯 적용 (조회, 종례, 점심시간 등)
-        for (grade, cls, day, period, label) in self.fixed_slots:
-            key = (grade, cls)  # (학년, 반)을 키로 사용
-            day_idx = self.settings['days'].index(day)  # 요일 인덱스
-            period_idx = period - 1  # 교시 인덱스 (1교시는 인덱스 0)
+        self.fill_fixed_slots_in_timetable(timetable)
+        
+        return timetable, teacher_schedule
+    
+    def checkpoint(self):
+        """되돌리기 기준점 (rollback에 전달)"""
+        return len(self.trail)
+    
+    def rollback(self, mark, timetable, teacher_schedule):
+        """
+        기준점 이후의 배치/제거를 역순으로 되돌리기
+        
+        교사 시수, 특별실 사용 현황, 배치 가능 시간대 캐시도 _assign과 같은 경로로 함께 되돌립니다.
+        
+        Args:
+            mark: checkpoint()가 반환한 기준점
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+        """
+        while len(self.trail) > mark:
+            self._write(timetable, teacher_schedule, *self.trail.pop())
+    
+    def _allowed_slots(self, unit, slots):
+        """배치 단위의 후보 시간대 (탐색 기억이 있으면 기억된 충돌 시간대 제외)"""
+        return self.nogoods.filter(unit, slots) if self.nogoods is not None else slots
+    
+    def _choose_slot(self, unit, slots):
+        """후보 시간대 중 하나를 무작위로 고르기 (학습 모드이면 선호도에 비례한 확률)"""
+        if self.pheromone is None:
+            return self.rng.choice(slots)
+        return self.rng.choices(slots, weights=self.pheromone.weights(unit, slots))[0]
+    
+    def _record_placement(self, unit, day, period, members):
+        """
+        이번 시도에서 고른 배치 기록 (find_conflicts에서 실패 원인을 찾는 데 사용)
+        
+        Args:
+            unit: 배치 단위
+            day, period: 고른 시간대
+            members: 함께 배치한 수업 [(학년, 반, 교사, 교사 일정 값)]
+        """
+        self.placements[(day, period)].append((unit, members))
+    
+    def find_conflicts(self, lessons, timetable, teacher_schedule):
+        """
+        시수를 채우지 못한 수업을 혼자 막고 있는 배치 찾기 (탐색 기억용)
+        
+        수업의 학급과 교사가 모두 가능한 시간대마다, 학급 칸이나 교사 칸을 차지한 배치가
+        하나뿐이면 그 배치를 충돌 원인으로 봅니다 (그 배치만 다른 시간에 있었다면 들어갈 수 있었음).
+        연쇄 이동 등으로 이미 옮겨진 배치는 제외합니다.
+        
+        Args:
+            lessons: 시수를 채우지 못한 수업 [(교사, 학년, 반)]
+            timetable: 시간표
+            teacher_schedule: 교사 일정
             
-            # 해당 (학년, 반)이 시간표에 있으면 해당 위치에 라벨 설정
-            if key in timetable:
-                timetable[key].iat[day_idx, period_idx] = label
+        Returns:
+            list: [(배치 단위, 요일, 교시)]
+        """
+        conflicts = []
+        for teacher, grade, cls in lessons:
+            grid = timetable[(grade, cls)]
+            for day, period in self.calendar.open_slots(grade, cls):
+                if self._is_blocked(teacher, day, period):
+                    continue
+                class_busy = grid[self.calendar.day_index[day]][period] != ""
+                teacher_busy = teacher_schedule[teacher][day][period] != ""
+                if not class_busy and not teacher_busy:
+                    continue
+                blockers = {unit for unit, members in self.placements.get((day, period), ())
+                            if teacher_schedule[members[0][2]][day][period] == members[0][3]
+                            and any((class_busy and (g, c) == (grade, cls)) or (teacher_busy and t == teacher)
+                                    for g, c, t, _ in members)}
+                if len(blockers) == 1:
+                    conflicts.append((blockers.pop(), day, period))
+        return conflicts
+    
+    def snapshot(self, timetable, teacher_schedule):
+        """
+        시간표를 바꿀 수 없는 튜플로 저장 (재사용하는 시간표가 다음 시도에서 바뀌어도 유지)
+        
+        Returns:
+            tuple: (((학년, 반), 요일별 교시 튜플), ...), ((교사, ((요일, 교시 튜플), ...)), ...))
+        """
+        return (tuple((key, tuple(map(tuple, grid))) for key, grid in timetable.items()),
+                tuple((teacher, tuple((day, tuple(periods)) for day, periods in schedule.items()))
+                      for teacher, schedule in teacher_schedule.items()))
+    
+    def restore(self, snapshot):
+        """
+        snapshot으로 저장한 시간표를 새 시간표와 교사 일정으로 복원
         
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        timetable, teacher_schedule = self.new_timetable()
+        for key, grid in snapshot[0]:
+            timetable[key] = [list(row) for row in grid]
+        for teacher, schedule in snapshot[1]:
+            teacher_schedule[teacher] = {day: list(periods) for day, periods in schedule}
         return timetable, teacher_schedule
     
     def find_common_available_slots(self, blocks, timetable, teacher_schedule):
@@ -220,74 +787,151 @@ class ScheduleManager:
         Returns:
             가능한 시간대 리스트 [(요일, 교시), ...]
         """
-        possible_slots = []  # 가능한 시간대를 저장할 리스트
+        return self.calendar.from_mask(self._common_mask(blocks, timetable, teacher_schedule) & self._room_mask(blocks))
+    
+    def _common_mask(self, blocks, timetable, teacher_schedule):
+        """
+        여러 블록이 동시에 배치될 수 있는 시간대의 비트마스크
         
-        # 각 요일에 대해 검사
-        for day in self.settings['days']:
-            # 요일별 최대 교시 수 가져오기
-            max_period = self.settings['periods_per_day_by_day'][day]
-            
-            # 특정 요일(월/수/금)은 7교시 배정 제한
-            if day in ['월', '수', '금']:
-                max_period = min(max_period, 6)  # 최대 6교시까지만 허용
+        블록의 (교사, 학급) 쌍마다 캐시된 배치 가능 시간대를 & 연산으로 교집합합니다.
+        """
+        mask = -1 if blocks else 0
+        for block in blocks:
+            for cls in block['classes']:
+                mask &= self._pair_mask(block['teacher'], block['grade'], cls, timetable, teacher_schedule)
+                if not mask:
+                    return 0
+        return mask if mask != -1 else 0
+    
+    def _pair_mask(self, teacher, grade, cls, timetable, teacher_schedule, relocating=False):
+        """
+        교사가 학급에 수업할 수 있는 시간대의 비트마스크
+        
+        학급의 고정 시간과 교사의 수업 불가 시간이 아니고, 교사와 학급이 모두 비어 있으며,
+        배치해도 교사의 연속 수업 제한을 넘지 않는 시간대를 모읍니다.
+        요일별로 캐시하며, 배치로 바뀐 (교사, 요일)/(학급, 요일)의 캐시만 다시 계산합니다.
+        
+        Args:
+            teacher: 교사명
+            grade: 학년
+            cls: 반
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            relocating: 이미 배치된 수업을 옮기는 경우 True (주간 시수가 늘지 않으므로 최대 시수 확인 생략)
             
-            # 각 교시에 대해 검사
-            for period in range(max_period):
-                slot_ok = True  # 현재 시간대가 가능한지 여부
-                
-                # 각 블록에 대해 가능 여부 확인
-                for block in blocks:
-                    for cls in block['classes']:  # 블록의 각 반 검사
-                        # 1. 고정 시간과 겹치는지 확인 (조회, 종례 등)
-                        is_fixed_slot = any((block['grade'] == fixed[0] and cls == fixed[1] and 
-                                           day == fixed[2] and (period+1) == fixed[3]) 
-                                          for fixed in self.fixed_slots)
-                        if is_fixed_slot:
-                            slot_ok = False
-                            break
-                        
-                        # 2. 교사가 이미 다른 수업이 있는지 확인
-                        if teacher_schedule[block['teacher']][day][period] != "":
-                            slot_ok = False
-                            break
-                        
-                        # 3. 해당 반의 시간표에 이미 과목이 배정되어 있는지 확인
-                        key = (block['grade'], cls)
-                        if timetable[key].iat[self.settings['days'].index(day), period] != "":
-                            slot_ok = False
-                            break
-                        
-                        # 4. 교사의 연속 수업 시간 제한 확인
-                        # 4-1. 이전 교시들에서 연속된 수업 수 세기
-                        consecutive_count = 0
-                        for p in range(period-1, -1, -1):
-                            if teacher_schedule[block['teacher']][day][p] != "":
-                                consecutive_count += 1
-                            else:
-                                break
-                        
-                        # 4-2. 다음 교시들에서 연속될 수업 수 세기
-                        next_count = 0
-                        for p in range(period+1, max_period):
-                            if teacher_schedule[block['teacher']][day][p] != "":
-                                next_count += 1
-                            else:
-                                break
-                        
-                        # 4-3. 이 시간에 수업을 배정하면 교사의 연속 수업 제한을 초과하는지 확인
-                        if consecutive_count + next_count + 1 > self.settings['max_consecutive_teaching_hours']:
-                            slot_ok = False
-                            break
-                    
-                    # 하나의 블록이라도 배치 불가능하면 검사 중단
-                    if not slot_ok:
-                        break
-                
-                # 모든 블록 배치 가능한 시간대면 추가
-                if slot_ok:
-                    possible_slots.append((day, period))
+        Returns:
+            int: 배치 가능 시간대 비트마스크
+        """
+        if not relocating and not self._has_capacity(teacher):
+            return 0
+        
+        mask = 0
+        for day in self.calendar.days:
+            key = (teacher, grade, cls, day)
+            versions = (self._teacher_version[(teacher, day)], self._class_version[(grade, cls, day)])
+            cached = self._pair_masks.get(key)
+            if cached is None or cached[:2] != versions:
+                cached = versions + (self._pair_day_mask(teacher, grade, cls, day, timetable, teacher_schedule),)
+                self._pair_masks[key] = cached
+            mask |= cached[2]
+        return mask
+    
+    def _has_capacity(self, teacher):
+        """교사에게 수업을 더 배치할 수 있는지 여부 (hard 모드에서 주간 최대 시수 도달 시 False)"""
+        if not self.max_hours_hard or teacher not in self.teacher_limits:
+            return True
+        return self.teacher_load[teacher] < self.teacher_limits[teacher]
+    
+    def _is_blocked(self, teacher, day, period):
+        """교사의 수업 불가 시간인지 여부"""
+        return bool(self.teacher_blocked.get(teacher, 0) & self.calendar.slot_bit[(day, period)])
+    
+    def _pair_day_mask(self, teacher, grade, cls, day, timetable, teacher_schedule):
+        """한 요일에 대해 _pair_mask의 조건을 직접 검사한 비트마스크"""
+        limit = self.settings['max_consecutive_teaching_hours']
+        max_period = self.calendar.periods_per_day[day]
+        teacher_day = teacher_schedule[teacher][day]
+        class_day = timetable[(grade, cls)][self.calendar.day_index[day]]
+        blocked = self.teacher_blocked.get(teacher, 0)
+        
+        # 교시별 앞/뒤로 이어지는 교사 수업 수 (_count_consecutive_classes를 한 번에 계산)
+        before = [0] * max_period
+        after = [0] * max_period
+        for p in range(1, max_period):
+            before[p] = before[p - 1] + 1 if teacher_day[p - 1] != "" else 0
+        for p in range(max_period - 2, -1, -1):
+            after[p] = after[p + 1] + 1 if teacher_day[p + 1] != "" else 0
+        
+        mask = 0
+        for period in self.calendar.open_periods(grade, cls, day):
+            bit = self.calendar.slot_bit[(day, period)]
+            if bit & blocked:  # 교사 수업 불가 시간은 다른 검사 전에 제외
+                continue
+            if teacher_day[period] != "" or class_day[period] != "":
+                continue
+            if before[period] + 1 + after[period] > limit:
+                continue
+            mask |= bit
+        return mask
+    
+    def _room_mask(self, blocks):
+        """
+        블록들이 동시에 배치될 때 필요한 특별실이 남아 있는 시간대의 비트마스크 (특별실이 필요 없으면 -1)
+        
+        같은 교사의 블록은 한 곳만 사용하며, 특별실 하나만 필요하면 사용 현황 비트마스크(room_full)로
+        바로 계산합니다.
+        """
+        needs = defaultdict(set)  # 특별실 종류 -> 사용하는 교사
+        for block in blocks:
+            room = self.subject_rooms.get(block['subject'])
+            if room is not None:
+                needs[room].add(block['teacher'])
+        
+        mask = -1
+        for room, room_teachers in needs.items():
+            need = len(room_teachers)
+            if need == 1:
+                mask &= ~self.room_full[room]
+            else:
+                capacity = self.room_capacity[room]
+                mask &= self.calendar.to_mask(slot for slot in self.calendar.slots
+                                              if self.room_used[(room,) + slot] + need <= capacity)
+        return mask
+    
+    def _has_room(self, subject, day, period):
+        """과목에 필요한 특별실이 (요일, 교시)에 남아 있는지 여부 (특별실이 필요 없으면 True)"""
+        room = self.subject_rooms.get(subject)
+        return room is None or self.room_used[(room, day, period)] < self.room_capacity[room]
+    
+    def _label_room(self, label):
+        """교사 일정 라벨("과목 (학년-반)")의 과목이 사용하는 특별실 종류 (없으면 None)"""
+        if label not in self._label_rooms:
+            self._label_rooms[label] = self.subject_rooms.get(label.rsplit(" (", 1)[0]) if label else None
+        return self._label_rooms[label]
+    
+    def _use_room(self, room, day, period, change):
+        """특별실 사용 현황 갱신 (change: +1 사용, -1 반납)"""
+        key = (room, day, period)
+        self.room_used[key] += change
+        if self.room_used[key] >= self.room_capacity[room]:
+            self.room_full[room] |= self.calendar.slot_bit[(day, period)]
+        else:
+            self.room_full[room] &= ~self.calendar.slot_bit[(day, period)]
+    
+    def _unit_mask(self, info, timetable, teacher_schedule, relocating=False):
+        """
+        개별 수업 하나를 배치할 수 있는 시간대의 비트마스크
         
-        return possible_slots
+        교사-학급 배치 가능 시간대에서 같은 과목이 이미 있는 요일을 뺍니다 (하루 1시간 제한).
+        """
+        mask = self._pair_mask(info['teacher'], info['grade'], info['class'], timetable, teacher_schedule,
+                               relocating)
+        mask &= self._room_mask([info])
+        grid = timetable[(info['grade'], info['class'])]
+        for day in self.calendar.days:
+            if info['subject'] in grid[self.calendar.day_index[day]]:
+                mask &= ~self.calendar.day_mask[day]
+        return mask
     
     def assign_selection_group_blocks(self, selection_group_blocks, timetable, teacher_schedule):
         """
@@ -295,9 +939,10 @@ class ScheduleManager:
         
         같은 시간대에 여러 선택 과목이 동시에 진행되는 블록을 배치합니다.
         예: 선택A 시간에 "일본어", "중국어", "프랑스어" 등이 동시에 다른 교실에서 진행
+        모든 학년의 그룹을 함께 다루며, 반 시간표에는 데이터의 그룹 이름을 기록합니다.
         
         Args:
-            selection_group_blocks: 특별 선택 그룹 블록 딕셔너리
+            selection_group_blocks: 특별 선택 그룹 블록 딕셔너리 {(학년, 그룹 이름): [블록]}
             timetable: 시간표
             teacher_schedule: 교사 일정
             
@@ -308,20 +953,26 @@ class ScheduleManager:
         
         # 특별 선택 그룹을 시수가 많은 순으로 정렬
         sorted_groups = []
-        for group_name, all_blocks in selection_group_blocks.items():
+        for group_key, all_blocks in selection_group_blocks.items():
             if all_blocks:
                 # 그룹 내 첫 번째 과목의 시수 기준으로 정렬
                 first_subject = all_blocks[0]['subject']
                 hours = all_blocks[0]['hours']
-                sorted_groups.append((-hours, group_name))  # 음수로 저장하여 높은 시수부터 처리
+                sorted_groups.append((-hours, group_key))  # 음수로 저장하여 높은 시수부터 처리
         
         # 시수 기준으로 정렬
         heapq.heapify(sorted_groups)
         
-        # 시수가 많은 그룹부터 처리
+        # 시수가 많은 그룹부터 처리 (constrained: 공통 가능 시간대가 가장 적은 그룹부터)
         while sorted_groups:
-            _, group_name = heapq.heappop(sorted_groups)
-            all_blocks = selection_group_blocks[group_name]
+            _, group_key = self._pop_next(sorted_groups, lambda key: self.find_common_available_slots(
+                selection_group_blocks[key], timetable, teacher_schedule))
+            all_blocks = selection_group_blocks[group_key]
+            group_name = group_key[1]  # 반 시간표에 기록할 그룹 이름 (예: '선택A')
+            if self.group_index is not None:
+                group_teachers = self.group_index.teachers_of(*group_key)
+            else:
+                group_teachers = {block['teacher'] for block in all_blocks}
             
             # 과목별로 블록 분류
             subject_blocks = {}
@@ -335,46 +986,48 @@ class ScheduleManager:
             first_subject = list(subject_blocks.keys())[0]
             total_hours = subject_blocks[first_subject][0]['hours']
             
-            # 필요한 시수만큼 배치 시도
+            # 필요한 시수만큼 배치 (가능한 시간대가 없어지면 중단)
             placed_times = 0
-            attempts = 0
-            max_attempts = 100
             
             # 시수별로 가능한 요일에 분산 배치하기 위한 요일 관리
             used_days = set()  # 이미 사용한 요일
             available_days = list(self.settings['days'])  # 사용 가능한 요일 목록
             
-            while placed_times < total_hours and attempts < max_attempts:
-                attempts += 1
+            while placed_times < total_hours:
+                # 주간 최대 시수가 찬 교사가 있으면 어느 시간대에도 배치할 수 없으므로 바로 실패 처리
+                if not all(self._has_capacity(teacher) for teacher in group_teachers):
+                    print(f"⚠️ 선택그룹 '{group_name}': 주간 최대 시수가 찬 교사가 있어 배치 중단")
+                    failed_blocks.extend(all_blocks)
+                    break
                 
                 # 모든 과목이 동시에 배치 가능한 시간대 찾기
                 all_possible_slots = []
                 all_subjects_possible = True
                 
-                # 각 과목별로 가능한 시간대 찾기
+                # 각 과목별로 가능한 시간대 찾기 (비트마스크)
+                common_mask = -1
                 for subject, blocks in subject_blocks.items():
-                    possible_slots = self.find_common_available_slots(blocks, timetable, teacher_schedule)
+                    possible_mask = self._common_mask(blocks, timetable, teacher_schedule)
                     
                     # 가능한 시간대가 없는 과목이 있으면 실패
-                    if not possible_slots:
-                        print(f"⚠️ 시도 {attempts}: '{subject}' 과목의 선택그룹 '{group_name}' 배치 불가")
+                    if not possible_mask:
+                        print(f"⚠️ '{subject}' 과목의 선택그룹 '{group_name}' 배치 불가")
                         for block in blocks:
                             failed_blocks.append(block)
                         all_subjects_possible = False
                         break
                     
-                    # 첫 과목이면 그대로 사용, 아니면 교집합 구하기
-                    if not all_possible_slots:
-                        all_possible_slots = possible_slots
-                    else:
-                        all_possible_slots = [slot for slot in all_possible_slots if slot in possible_slots]
+                    # 과목별 가능 시간대의 교집합
+                    common_mask &= possible_mask
+                
+                if all_subjects_possible:
+                    all_possible_slots = self._allowed_slots(
+                        group_key, self.calendar.from_mask(common_mask & self._room_mask(all_blocks)))
                 
-                # 공통 가능 시간대가 없으면 다시 시도
+                # 공통 가능 시간대가 없으면 중단 (시간표가 그대로이므로 다시 찾아도 결과가 같음)
                 if not all_subjects_possible or not all_possible_slots:
-                    if attempts >= max_attempts:
-                        print(f"⚠️ 최대 시도 횟수 도달: 선택그룹 '{group_name}' 배치 실패")
-                        break
-                    continue
+                    print(f"⚠️ 공통 가능 시간대 없음: 선택그룹 '{group_name}' 배치 실패")
+                    break
                 
                 # 아직 사용하지 않은 요일 우선 선택하여 분산 배치
                 preferred_slots = []
@@ -388,19 +1041,20 @@ class ScheduleManager:
                     preferred_slots = all_possible_slots
                 
                 # 가능한 시간대 중 선호하는 시간대에서 랜덤 선택
-                day, period = random.choice(preferred_slots)
+                day, period = self._choose_slot(group_key, preferred_slots)
                 used_days.add(day)  # 사용한 요일 기록
                 
                 # 모든 과목 및 반을 동시에 배치 (같은 시간대에 여러 과목 진행)
+                members = []
                 for subject, blocks in subject_blocks.items():
                     for block in blocks:
                         for cls in block['classes']:
-                            # 교사 일정에 과목 추가
-                            teacher_schedule[block['teacher']][day][period] = f"{subject} ({block['grade']}-{cls})"
-                            
-                            # 반 시간표에 그룹명 추가 (예: '선택A')
-                            key = (block['grade'], cls)
-                            timetable[key].iat[self.settings['days'].index(day), period] = group_name
+                            # 교사 일정에 과목, 반 시간표에 그룹명 추가 (예: '선택A')
+                            label = f"{subject} ({block['grade']}-{cls})"
+                            self._assign(timetable, teacher_schedule, block['grade'], cls, day, period,
+                                         group_name, block['teacher'], label)
+                            members.append((block['grade'], cls, block['teacher'], label))
+                self._record_placement(group_key, day, period, members)
                 
                 # 배치 성공 카운트 증가
                 placed_times += 1
@@ -438,46 +1092,41 @@ class ScheduleManager:
         # 우선순위 큐로 변환
         heapq.heapify(sorted_subjects)
         
-        # 시수가 많은 과목부터 처리
+        # 시수가 많은 과목부터 처리 (constrained: 가능 시간대가 가장 적은 과목부터)
         while sorted_subjects:
-            _, subject = heapq.heappop(sorted_subjects)
+            _, subject = self._pop_next(sorted_subjects, lambda name: self.find_common_available_slots(
+                choice_group_blocks[name], timetable, teacher_schedule))
             blocks = choice_group_blocks[subject]
             
             # 시수 정보 확인
             total_hours = blocks[0].get('hours', 0)
             placed_times = 0
             
-            # 필요한 시수만큼 배치 시도
-            attempts = 0
-            max_attempts = 100
-            
             # 요일별 배치 관리를 위한 변수
             used_days = set()  # 이미 사용한 요일
             available_days = list(self.settings['days'])  # 사용 가능한 요일 목록
             
-            while placed_times < total_hours and attempts < max_attempts:
-                attempts += 1
-                
-                # 가능한 시간대 찾기
-                possible_slots = self.find_common_available_slots(blocks, timetable, teacher_schedule)
+            # 필요한 시수만큼 배치 (가능한 시간대가 없어지면 중단)
+            while placed_times < total_hours:
+                # 가능한 시간대 찾기 (탐색 기억의 충돌 시간대 제외)
+                possible_slots = self._allowed_slots(
+                    subject, self.find_common_available_slots(blocks, timetable, teacher_schedule))
                 
-                # 가능한 시간대가 없으면 다시 시도 또는 실패 처리
+                # 가능한 시간대가 없으면 실패 처리 (시간표가 그대로이므로 다시 찾아도 결과가 같음)
                 if not possible_slots:
-                    if attempts >= max_attempts:
-                        print(f"⚠️ 최대 시도 횟수 도달: '{subject}' 선택 과목 배치 실패")
-                        # 실패 목록에 추가
-                        for block in blocks:
-                            for cls in block['classes']:
-                                failed_blocks.append({
-                                    "teacher": block['teacher'],
-                                    "subject": block['subject'],
-                                    "grade": block['grade'],
-                                    "class": cls,
-                                    "label": f"{block['subject']} ({block['grade']}-{cls})",
-                                    "required": block['required']
-                                })
-                        break
-                    continue
+                    print(f"⚠️ 가능한 시간대 없음: '{subject}' 선택 과목 배치 실패")
+                    # 실패 목록에 추가
+                    for block in blocks:
+                        for cls in block['classes']:
+                            failed_blocks.append({
+                                "teacher": block['teacher'],
+                                "subject": block['subject'],
+                                "grade": block['grade'],
+                                "class": cls,
+                                "label": f"{block['subject']} ({block['grade']}-{cls})",
+                                "required": block['required']
+                            })
+                    break
                 
                 # 아직 사용하지 않은 요일 우선 선택하여 분산 배치
                 preferred_slots = []
@@ -491,18 +1140,19 @@ class ScheduleManager:
                     preferred_slots = possible_slots
                 
                 # 가능한 시간대 중 선호하는 시간대에서 랜덤 선택
-                day, period = random.choice(preferred_slots)
+                day, period = self._choose_slot(subject, preferred_slots)
                 used_days.add(day)  # 사용한 요일 기록
                 
                 # 모든 반에 과목 배치
+                members = []
                 for block in blocks:
                     for cls in block['classes']:
-                        # 교사 일정에 과목 추가
-                        teacher_schedule[block['teacher']][day][period] = f"{block['subject']} ({block['grade']}-{cls})"
-                        
-                        # 반 시간표에 과목명 추가
-                        key = (block['grade'], cls)
-                        timetable[key].iat[self.settings['days'].index(day), period] = block['subject']
+                        # 교사 일정 및 반 시간표에 과목 추가
+                        label = f"{block['subject']} ({block['grade']}-{cls})"
+                        self._assign(timetable, teacher_schedule, block['grade'], cls, day, period,
+                                     block['subject'], block['teacher'], label)
+                        members.append((block['grade'], cls, block['teacher'], label))
+                self._record_placement(subject, day, period, members)
                 
                 # 배치 성공 카운트 증가
                 placed_times += 1
@@ -528,6 +1178,9 @@ class ScheduleManager:
         Returns:
             배치 실패한 블록 리스트
         """
+        if self.placement_order == "constrained":
+            return self._assign_individual_blocks_constrained(blocks, timetable, teacher_schedule)
+        
         # 1. 블록을 과목별로 그룹화하고 시수 정보 수집
         subject_blocks = defaultdict(list)
         
@@ -591,117 +1244,227 @@ class ScheduleManager:
                             print(f"⚠️ 배치 실패: {subject} ({grade}-{class_num}) 시간 {hour_idx+1}/{total_hours}")
         
         return failed_blocks
-
-    def _try_place_block_distributed(self, block, timetable, teacher_schedule, day_assigned, available_days, max_attempts=50):
+    
+    def _pop_next(self, queue, find_slots):
         """
-        단일 블록을 시간표에 분산 배치 시도
+        우선순위 큐에서 다음에 배치할 항목 꺼내기
         
-        같은 과목이 서로 다른 요일에 배치되도록 분산 배치합니다.
+        "hours" 전략이면 시수 순서대로, "constrained" 전략이면 현재 가능한 시간대가
+        가장 적은 항목(동률이면 시수 순서)을 꺼냅니다.
         
         Args:
-            block: 배치할 블록 정보
-            timetable: 시간표
-            teacher_schedule: 교사 일정
-            day_assigned: 요일별 이미 배치된 시간 수 {요일: 배치된 시간 수}
-            available_days: 배치 가능한 요일 목록
-            max_attempts: 최대 시도 횟수
+            queue: (-시수, 이름) 튜플의 힙
+            find_slots: 이름 -> 현재 가능한 시간대 리스트를 반환하는 함수
             
         Returns:
-            bool: 배치 성공 여부
+            (-시수, 이름) 튜플
         """
-        attempts = 0
-        placed = False
-        
-        while not placed and attempts < max_attempts:
-            attempts += 1
-            
-            # 1. 모든 요일을 확인하여 가능한 시간대 찾기
-            day_slots = defaultdict(list)  # 요일별 가능한 시간대 {요일: [(요일, 교시), ...]}
-            
-            for day in self.settings['days']:
-                # 요일별 최대 교시 수
-                max_period = self.settings['periods_per_day_by_day'][day]
-                if day in ['월', '수', '금']:  # 특정 요일 7교시 제한
-                    max_period = min(max_period, 6)
-                
-                # 각 교시별 확인
-                for period in range(max_period):
-                    # 배치 가능 여부 확인
-                    if self._is_slot_available(block, day, period, timetable, teacher_schedule):
-                        day_slots[day].append((day, period))
-            
-            # 2. 요일 선택 전략 적용
-            # 2-1. 아직 사용하지 않은 요일 우선
-            unused_days = [day for day in available_days if day_assigned.get(day, 0) == 0]
-            
-            # 2-2. 사용하지 않은 요일이 있으면 해당 요일 중에서 선택
-            if unused_days and any(day in day_slots for day in unused_days):
-                candidate_days = [day for day in unused_days if day in day_slots]
-                selected_day = random.choice(candidate_days)
-                possible_slots = day_slots[selected_day]
-            # 2-3. 모든 요일이 이미 사용되었으면, 가장 적게 사용된 요일 선택
-            elif day_slots:
-                # 사용 횟수가 적은 요일 우선
-                candidate_days = sorted(day_slots.keys(), key=lambda d: day_assigned.get(d, 0))
-                selected_day = candidate_days[0]  # 가장 적게 사용된 요일
-                possible_slots = day_slots[selected_day]
-            else:
-                # 가능한 시간대가 없음
-                possible_slots = []
-            
-            # 3. 가능한 시간대가 있으면 랜덤 선택 후 배치
-            if possible_slots:
-                day, period = random.choice(possible_slots)  # 교시는 랜덤 선택
-                
-                # 교사 일정 및 시간표에 과목 추가
-                teacher_schedule[block['teacher']][day][period] = block['label']
-                timetable[(block['grade'], block['class'])].iat[self.settings['days'].index(day), period] = block['subject']
-                
-                # 해당 요일 사용 카운트 증가
-                day_assigned[day] = day_assigned.get(day, 0) + 1
-                
-                placed = True
-                break
-        
-        return placed
+        if self.placement_order != "constrained" or len(queue) == 1:
+            return heapq.heappop(queue)
+        
+        idx = min(range(len(queue)), key=lambda i: (len(find_slots(queue[i][1])), queue[i]))
+        item = queue[idx]
+        queue[idx] = queue[-1]
+        queue.pop()
+        heapq.heapify(queue)
+        return item
     
-    def _is_slot_available(self, block, day, period, timetable, teacher_schedule):
+    def _assign_individual_blocks_constrained(self, blocks, timetable, teacher_schedule):
         """
-        특정 시간대에 블록 배치 가능 여부 확인
+        개별 블록을 가능한 시간대가 가장 적은 수업부터 배치 (most-constrained-first)
+        
+        (교사, 학년, 반, 과목)마다 남은 시수와 현재 배치 가능한 시간대 집합을 유지합니다.
+        항상 여유(가능 시간대 수 - 남은 시수)가 가장 적은 수업을 먼저 배치하고,
+        배치 후에는 같은 교사나 같은 반, 같은 특별실을 쓰는 수업의 시간대만 다시 계산합니다.
         
         Args:
-            block: 배치할 블록 정보
-            day: 요일
-            period: 교시
+            blocks: 일반 과목 블록 리스트
             timetable: 시간표
             teacher_schedule: 교사 일정
             
         Returns:
-            bool: 배치 가능 여부
+            배치 실패한 블록 리스트
         """
-        # 1. 고정 시간대 확인
-        is_fixed = any((block['grade'] == f[0] and block['class'] == f[1] and 
-                      day == f[2] and (period + 1) == f[3]) 
-                     for f in self.fixed_slots)
-        if is_fixed:
-            return False
+        # 1. 배치 단위 생성: (교사, 학년, 반, 과목) -> 남은 시수
+        units = {}
+        for block in blocks:
+            for class_num in block['classes']:
+                key = (block['teacher'], block['grade'], class_num, block['subject'])
+                units[key] = {
+                    "info": {
+                        "teacher": block['teacher'],
+                        "subject": block['subject'],
+                        "grade": block['grade'],
+                        "class": class_num,
+                        "label": f"{block['subject']} ({block['grade']}-{class_num})",
+                        "required": block['required']
+                    },
+                    "hours": block['hours'],
+                    "remaining": block['hours']
+                }
+        
+        # 2. 교사/반/특별실 -> 배치 단위 색인 (배치 후 영향을 받는 수업만 갱신하기 위함)
+        by_teacher = defaultdict(list)
+        by_class = defaultdict(list)
+        by_room = defaultdict(list)
+        for key in units:
+            teacher, grade, class_num, subject = key
+            by_teacher[teacher].append(key)
+            by_class[(grade, class_num)].append(key)
+            if subject in self.subject_rooms:
+                by_room[self.subject_rooms[subject]].append(key)
+        
+        # 3. 배치 단위별 현재 가능한 시간대 (비트마스크)와 그 개수
+        candidates = {}
+        counts = {}
+        for key, unit in units.items():
+            candidates[key] = self._unit_mask(unit["info"], timetable, teacher_schedule)
+            counts[key] = bin(candidates[key]).count("1")
+        
+        failed_blocks = []
+        pending = set(units)
+        
+        while pending:
+            # 4. 여유가 가장 적은 수업 선택 (동률이면 시수가 많은 수업 먼저)
+            key = min(pending, key=lambda k: (counts[k] - units[k]["remaining"],
+                                              counts[k], -units[k]["hours"], k))
+            unit = units[key]
+            info = unit["info"]
+            hour_idx = unit["hours"] - unit["remaining"]
+            
+            # 5. 가능한 시간대가 없으면 남은 시수를 모두 실패 처리
+            if not candidates[key]:
+                for idx in range(hour_idx, unit["hours"]):
+                    failed_blocks.append(dict(info, hour_index=idx))
+                    print(f"⚠️ 배치 실패: {info['subject']} ({info['grade']}-{info['class']}) 시간 {idx+1}/{unit['hours']}")
+                pending.discard(key)
+                continue
+            
+            # 6. 요일을 먼저 무작위로 고른 뒤 해당 요일의 교시를 무작위 선택 (탐색 기억의 충돌 시간대 제외)
+            day_slots = defaultdict(list)
+            for slot in self._allowed_slots(key, self.calendar.from_mask(candidates[key])):
+                day_slots[slot[0]].append(slot)
+            if self.pheromone is None:
+                day = self.rng.choice(sorted(day_slots, key=self.calendar.day_index.get))
+                day, period = self.rng.choice(day_slots[day])
+            else:
+                # 학습 모드: 요일을 먼저 고르는 것과 같은 기본 확률(요일의 후보 수로 나눔)에 선호도를 곱해 선택
+                slots = [slot for day in sorted(day_slots, key=self.calendar.day_index.get) for slot in day_slots[day]]
+                weights = [weight / len(day_slots[slot[0]])
+                           for slot, weight in zip(slots, self.pheromone.weights(key, slots))]
+                day, period = self.rng.choices(slots, weights=weights)[0]
+            
+            self._assign(timetable, teacher_schedule, info['grade'], info['class'], day, period,
+                         info['subject'], info['teacher'], info['label'])
+            self._record_placement(key, day, period, [(info['grade'], info['class'], info['teacher'], info['label'])])
+            
+            unit["remaining"] -= 1
+            if unit["remaining"] == 0:
+                pending.discard(key)
+            
+            # 7. 같은 교사나 같은 반, 같은 특별실을 쓰는 수업만 다시 계산 (바뀐 요일 외에는 캐시 사용)
+            affected = set(by_teacher[info['teacher']]) | set(by_class[(info['grade'], info['class'])])
+            if info['subject'] in self.subject_rooms:
+                affected |= set(by_room[self.subject_rooms[info['subject']]])
+            for other in affected & pending:
+                candidates[other] = self._unit_mask(units[other]["info"], timetable, teacher_schedule)
+                counts[other] = bin(candidates[other]).count("1")
         
-        # 2. 교사 일정 확인
-        if teacher_schedule[block['teacher']][day][period] != "":
-            return False
+        return failed_blocks
+    
+    def _try_place_block_distributed(self, block, timetable, teacher_schedule, day_assigned, available_days):
+        """
+        단일 블록을 시간표에 분산 배치 시도
+        
+        같은 과목이 서로 다른 요일에 배치되도록 분산 배치합니다.
+        가능한 시간대가 없으면 바로 실패를 반환합니다 (배치하지 않으면 시간표가 바뀌지 않으므로
+        같은 블록을 다시 시도해도 결과가 같음).
+        
+        Args:
+            block: 배치할 블록 정보
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            day_assigned: 요일별 이미 배치된 시간 수 {요일: 배치된 시간 수}
+            available_days: 배치 가능한 요일 목록
+            
+        Returns:
+            bool: 배치 성공 여부
+        """
+        # 1. 가능한 시간대 찾기 (캐시된 비트마스크 사용, 바뀐 것이 없으면 다시 검사하지 않음)
+        mask = self._unit_mask(block, timetable, teacher_schedule)
+        day_slots = defaultdict(list)  # 요일별 가능한 시간대 {요일: [(요일, 교시), ...]}
+        for day, period in self.calendar.from_mask(mask):
+            day_slots[day].append((day, period))
+        
+        # 가능한 시간대가 없음
+        if not day_slots:
+            return False
+        
+        # 2. 요일 선택 전략 적용
+        # 2-1. 아직 사용하지 않은 요일 우선
+        unused_days = [day for day in available_days if day_assigned.get(day, 0) == 0]
+        
+        # 2-2. 사용하지 않은 요일이 있으면 해당 요일 중에서 선택
+        if unused_days and any(day in day_slots for day in unused_days):
+            candidate_days = [day for day in unused_days if day in day_slots]
+            selected_day = self.rng.choice(candidate_days)
+        # 2-3. 모든 요일이 이미 사용되었으면, 가장 적게 사용된 요일 선택
+        else:
+            # 사용 횟수가 적은 요일 우선
+            candidate_days = sorted(day_slots.keys(), key=lambda d: day_assigned.get(d, 0))
+            selected_day = candidate_days[0]  # 가장 적게 사용된 요일
+        possible_slots = day_slots[selected_day]
+        
+        # 3. 랜덤 선택 후 배치 (탐색 기억의 충돌 시간대 제외)
+        unit = (block['teacher'], block['grade'], block['class'], block['subject'])
+        day, period = self._choose_slot(unit, self._allowed_slots(unit, possible_slots))  # 교시는 랜덤 선택
+        
+        # 교사 일정 및 시간표에 과목 추가
+        self._assign(timetable, teacher_schedule, block['grade'], block['class'], day, period,
+                     block['subject'], block['teacher'], block['label'])
+        self._record_placement(unit, day, period, [(block['grade'], block['class'], block['teacher'], block['label'])])
+        
+        # 해당 요일 사용 카운트 증가
+        day_assigned[day] = day_assigned.get(day, 0) + 1
+        
+        return True
+    
+    def _is_slot_available(self, block, day, period, timetable, teacher_schedule):
+        """
+        특정 시간대에 블록 배치 가능 여부 확인
         
-        # 3. 해당 반 시간표 확인
+        고정 시간은 검사하지 않으므로 calendar.open_slots에 포함된 시간대만 전달해야 합니다.
+        
+        Args:
+            block: 배치할 블록 정보
+            day: 요일
+            period: 교시
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            
+        Returns:
+            bool: 배치 가능 여부
+        """
+        # 1. 교사 수업 불가 시간, 교사 일정 및 주간 최대 시수 확인
+        if self._is_blocked(block['teacher'], day, period):
+            return False
+        if teacher_schedule[block['teacher']][day][period] != "" or not self._has_capacity(block['teacher']):
+            return False
+        if not self._has_room(block['subject'], day, period):
+            return False
+        
+        # 2. 해당 반 시간표 확인
         key = (block['grade'], block['class'])
-        if timetable[key].iat[self.settings['days'].index(day), period] != "":
+        if timetable[key][self.calendar.day_index[day]][period] != "":
             return False
         
-        # 4. 교사 연속 수업 시간 제한 확인
-        max_period = self.settings['periods_per_day_by_day'][day]
+        # 3. 교사 연속 수업 시간 제한 확인
+        max_period = self.calendar.periods_per_day[day]
         consecutive = self._count_consecutive_classes(teacher_schedule, block['teacher'], day, period, max_period)
         if consecutive > self.settings['max_consecutive_teaching_hours']:
             return False
         
-        # 5. 하루에 같은 과목 제한 확인
+        # 4. 하루에 같은 과목 제한 확인
         day_classes = self._count_same_subject_in_day(timetable, block, day)
         if day_classes >= 1:  # 같은 요일에는 최대 1시간만 배치 (더 엄격하게 제한)
             return False
@@ -754,26 +1517,27 @@ class ScheduleManager:
             해당 요일에 같은 과목이 등장하는 수
         """
         key = (block['grade'], block['class'])
-        day_idx = self.settings['days'].index(day)
+        day_idx = self.calendar.day_index[day]
         
         # 해당 요일의 모든 교시를 확인하여 같은 과목 수 세기
-        count = 0
-        for p in range(len(timetable[key].columns)):
-            if timetable[key].iat[day_idx, p] == block['subject']:
-                count += 1
-        
-        return count
+        return timetable[key][day_idx].count(block['subject'])
     
-    def fill_empty_slots(self, timetable, teacher_schedule, failed_blocks):
+    def fill_empty_slots(self, timetable, teacher_schedule, failed_blocks, movable_lessons=None):
         """
         빈 교시에 배치하지 못한 블록 재시도
         
         시간표에 남아있는 빈 시간과 배치 실패한 블록을 매칭하여 최대한 배치합니다.
+        맞는 빈 교시가 없으면 방해하는 개별 수업을 다른 시간으로 옮기는 연쇄 이동
+        (ejection chain)으로 자리를 만들어 배치를 시도합니다.
+        여러 반이 같은 시간에 들어야 하는 묶음 블록('classes')은 빈 교시 하나로 채울 수 없으므로
+        재배치하지 않고 그대로 실패 목록에 남깁니다.
         
         Args:
             timetable: 시간표
             teacher_schedule: 교사 일정
             failed_blocks: 배치 실패한 블록 리스트
+            movable_lessons: 옮길 수 있는 개별 수업 {(학년, 반, 과목): 교사명}
+                (None이면 연쇄 이동을 사용하지 않음)
             
         Returns:
             여전히 배치 실패한 블록 리스트
@@ -783,22 +1547,20 @@ class ScheduleManager:
         
         # 빈 교시 찾기
         empty_slots = []
-        for (grade, cls), df in timetable.items():
-            for day_idx, day in enumerate(self.settings['days']):
-                max_period = self.settings['periods_per_day_by_day'][day]
-                if day in ['월', '수', '금']:
-                    max_period = min(max_period, 6)  # 월/수/금 7교시 제한
-                
-                for period in range(max_period):
-                    # 빈 교시이고 고정 시간대가 아닌 경우 추가
-                    if df.iat[day_idx, period] == "" and not any(
-                            (grade == f[0] and cls == f[1] and day == f[2] and (period+1) == f[3]) 
-                            for f in self.fixed_slots):
-                        empty_slots.append((grade, cls, day, period))
+        for (grade, cls), grid in timetable.items():
+            # 학급의 배치 가능 시간(고정 시간 제외) 중 빈 교시 추가
+            for day, period in self.calendar.open_slots(grade, cls):
+                if grid[self.calendar.day_index[day]][period] == "":
+                    empty_slots.append((grade, cls, day, period))
+        
+        # 묶음 블록은 재배치 대상에서 제외 (한 반 단위 블록만 빈 교시에 배치)
+        still_failed = [block for block in failed_blocks if 'class' not in block]
         
         # 실패한 블록을 우선순위별로 정렬 (선택 과목 우선)
         priority_failed = []
         for block in failed_blocks:
+            if 'class' not in block:
+                continue
             # 필수 과목이 더 낮은 우선순위를 가지도록 함 (1이 선택, 0이 필수)
             priority = (1 if block.get('required', False) else 0, block['grade'], block['subject'])
             priority_failed.append((priority, block))
@@ -806,9 +1568,7 @@ class ScheduleManager:
         # 우선순위별로 정렬 - 튜플의 첫 번째 요소(priority)로만 정렬
         priority_failed.sort(key=lambda x: x[0])
         
-        # 우선순위 순서대로 재배치 시도
-        still_failed = []  # 여전히 배치 실패한 블록 리스트
-        
+        # 우선순위 순서대로 재배치 시도 (여전히 배치 실패한 블록은 still_failed에 추가)
         for _, block in priority_failed:
             placed = False  # 배치 성공 여부
             valid_slots = []  # 이 블록에 적합한 빈 교시 리스트
@@ -818,12 +1578,18 @@ class ScheduleManager:
                 # 블록의 학년, 반과 일치하는지 확인
                 if block['grade'] == grade and block['class'] == cls:
                     
-                    # 교사 일정 확인
-                    if teacher_schedule[block['teacher']][day][period] != "":
+                    # 교사 수업 불가 시간 확인
+                    if self._is_blocked(block['teacher'], day, period):
+                        continue
+                    
+                    # 교사 일정, 주간 최대 시수, 특별실 확인
+                    if teacher_schedule[block['teacher']][day][period] != "" or not self._has_capacity(block['teacher']):
+                        continue
+                    if not self._has_room(block['subject'], day, period):
                         continue
                     
                     # 연속 수업 제한 확인
-                    max_period = self.settings['periods_per_day_by_day'][day]
+                    max_period = self.calendar.periods_per_day[day]
                     consecutive = self._count_consecutive_classes(teacher_schedule, block['teacher'], day, period, max_period)
                     if consecutive > self.settings['max_consecutive_teaching_hours']:
                         continue
@@ -838,22 +1604,371 @@ class ScheduleManager:
             
             # 적합한 빈 교시가 있으면 랜덤 선택 후 배치
             if valid_slots:
-                day, period = random.choice(valid_slots)
+                day, period = self.rng.choice(valid_slots)
                 
                 # 교사 일정 및 시간표에 과목 추가
-                teacher_schedule[block['teacher']][day][period] = block.get('label', f"{block['subject']} ({block['grade']}-{block['class']})")
-                timetable[(block['grade'], block['class'])].iat[self.settings['days'].index(day), period] = block['subject']
+                self._assign(timetable, teacher_schedule, block['grade'], block['class'], day, period,
+                             block['subject'], block['teacher'],
+                             block.get('label', f"{block['subject']} ({block['grade']}-{block['class']})"))
                 
                 # 사용한 빈 교시 제거
                 empty_slots.remove((block['grade'], block['class'], day, period))
                 placed = True  # 배치 성공
             
+            # 빈 교시가 없으면 방해하는 수업을 옮겨 자리 만들기
+            elif movable_lessons is not None:
+                placed = self.place_with_ejection_chain(block, timetable, teacher_schedule, movable_lessons)
+                if placed:
+                    # 수업이 옮겨졌으므로 빈 교시 목록 다시 계산
+                    empty_slots = [(grade, cls, day, period) for (grade, cls), grid in timetable.items()
+                                   for day, period in self.calendar.open_slots(grade, cls)
+                                   if grid[self.calendar.day_index[day]][period] == ""]
+            
             # 배치 실패한 경우 계속 실패 목록에 유지
             if not placed:
                 still_failed.append(block)
         
         return still_failed
     
+    def place_with_ejection_chain(self, block, timetable, teacher_schedule, movable_lessons):
+        """
+        연쇄 이동(ejection chain)으로 블록 배치
+        
+        블록이 들어갈 시간대를 막고 있는 개별 수업(같은 반의 수업 또는 같은 교사의 수업)을
+        그 수업의 다른 빈 시간대로 옮기고 블록을 배치합니다. 옮길 수업도 바로 들어갈 곳이
+        없으면 같은 방법으로 한 단계 더 옮기며, 최대 깊이(settings의 'repair_chain_depth',
+        기본값 2)와 탐색 한도('repair_chain_budget', 기본값 300)까지만 시도합니다.
+        실패하면 시간표는 시도 전 상태로 되돌려집니다.
+        
+        Args:
+            block: 배치할 블록 정보 (teacher, subject, grade, class)
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            movable_lessons: 옮길 수 있는 개별 수업 {(학년, 반, 과목): 교사명}
+            
+        Returns:
+            bool: 배치 성공 여부
+        """
+        depth = self.settings.get('repair_chain_depth', 2)
+        budget = [self.settings.get('repair_chain_budget', 300)]  # 남은 탐색 횟수
+        
+        # 교사 일정 라벨 -> 수업 색인 (교사가 맡은 수업을 찾기 위함)
+        label_index = {(teacher, f"{subject} ({grade}-{cls})"): (grade, cls, subject)
+                       for (grade, cls, subject), teacher in movable_lessons.items()}
+        
+        lesson = self._make_lesson(block['grade'], block['class'], block['subject'], block['teacher'])
+        mark = self.checkpoint()  # 실패 시 되돌릴 기준점
+        if self._eject_and_place(lesson, timetable, teacher_schedule, movable_lessons, label_index,
+                                 depth, {self._lesson_key(lesson)}, budget):
+            return True
+        
+        self.rollback(mark, timetable, teacher_schedule)
+        return False
+    
+    def _eject_and_place(self, lesson, timetable, teacher_schedule, movable_lessons, label_index,
+                         depth, moved, budget):
+        """
+        수업을 빈 시간대에 배치하고, 없으면 방해하는 수업을 옮긴 뒤 배치 (재귀)
+        
+        Args:
+            lesson: 배치할 수업
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            movable_lessons: 옮길 수 있는 개별 수업 {(학년, 반, 과목): 교사명}
+            label_index: {(교사명, 라벨): (학년, 반, 과목)}
+            depth: 남은 연쇄 이동 깊이
+            moved: 이번 연쇄에서 이미 다룬 수업 (순환 방지)
+            budget: 남은 탐색 횟수 [int]
+            
+        Returns:
+            bool: 배치 성공 여부
+        """
+        slots = list(self.calendar.open_slots(lesson['grade'], lesson['class']))
+        self.rng.shuffle(slots)
+        
+        # 1. 바로 배치 가능한 시간대가 있으면 배치
+        for day, period in slots:
+            if self._is_slot_available(lesson, day, period, timetable, teacher_schedule):
+                self._write_lesson(lesson, day, period, timetable, teacher_schedule)
+                return True
+        
+        if depth == 0:
+            return False
+        
+        # 2. 방해하는 수업을 빼고 배치한 뒤, 뺀 수업을 다른 시간대로 옮기기
+        for day, period in slots:
+            if budget[0] <= 0:
+                return False
+            budget[0] -= 1
+            
+            occupants = self._find_occupants(lesson, day, period, timetable, teacher_schedule,
+                                             movable_lessons, label_index)
+            if not occupants or any(self._lesson_key(occ) in moved for occ in occupants):
+                continue
+            
+            mark = self.checkpoint()
+            for occ in occupants:
+                self._erase_lesson(occ, day, period, timetable, teacher_schedule)
+            
+            if self._is_slot_available(lesson, day, period, timetable, teacher_schedule):
+                self._write_lesson(lesson, day, period, timetable, teacher_schedule)
+                next_moved = moved | {self._lesson_key(occ) for occ in occupants}
+                if all(self._eject_and_place(occ, timetable, teacher_schedule, movable_lessons, label_index,
+                                             depth - 1, next_moved, budget)
+                       for occ in occupants):
+                    return True
+            
+            self.rollback(mark, timetable, teacher_schedule)
+        
+        return False
+    
+    def _find_occupants(self, lesson, day, period, timetable, teacher_schedule, movable_lessons, label_index):
+        """
+        수업이 (요일, 교시)에 들어가지 못하게 막고 있는 옮길 수 있는 수업 목록
+        
+        Returns:
+            방해하는 수업 리스트 (옮길 수 없는 수업이 막고 있으면 None)
+        """
+        occupants = []
+        
+        # 1. 같은 반에 이미 배치된 수업
+        subject = timetable[(lesson['grade'], lesson['class'])][self.calendar.day_index[day]][period]
+        if subject != "":
+            teacher = movable_lessons.get((lesson['grade'], lesson['class'], subject))
+            occupant = self._make_lesson(lesson['grade'], lesson['class'], subject, teacher)
+            # 선택 그룹 등 개별 수업이 아니면 옮길 수 없음
+            if teacher is None or teacher_schedule[teacher][day][period] != occupant['label']:
+                return None
+            occupants.append(occupant)
+        
+        # 2. 같은 교사가 이 시간에 맡은 다른 반 수업
+        label = teacher_schedule[lesson['teacher']][day][period]
+        if label != "" and not any(occ['label'] == label and occ['teacher'] == lesson['teacher'] for occ in occupants):
+            key = label_index.get((lesson['teacher'], label))
+            if key is None:
+                return None
+            grade, cls, other_subject = key
+            occupants.append(self._make_lesson(grade, cls, other_subject, lesson['teacher']))
+        
+        return occupants
+    
+    def _make_lesson(self, grade, cls, subject, teacher):
+        """연쇄 이동에서 다루는 수업 정보 생성"""
+        return {"teacher": teacher, "subject": subject, "grade": grade, "class": cls,
+                "label": f"{subject} ({grade}-{cls})"}
+    
+    def _lesson_key(self, lesson):
+        """수업 식별 키 (학년, 반, 과목)"""
+        return (lesson['grade'], lesson['class'], lesson['subject'])
+    
+    def _write_lesson(self, lesson, day, period, timetable, teacher_schedule):
+        """수업을 시간표와 교사 일정에 기록 (rollback으로 되돌릴 수 있음)"""
+        self._assign(timetable, teacher_schedule, lesson['grade'], lesson['class'], day, period,
+                     lesson['subject'], lesson['teacher'], lesson['label'])
+    
+    def _erase_lesson(self, lesson, day, period, timetable, teacher_schedule):
+        """수업을 시간표와 교사 일정에서 제거 (rollback으로 되돌릴 수 있음)"""
+        self._assign(timetable, teacher_schedule, lesson['grade'], lesson['class'], day, period,
+                     "", lesson['teacher'], "")
+    
+    def improve_timetable(self, timetable, teacher_schedule, movable_lessons, score_manager, max_moves):
+        """
+        지역 탐색으로 시간표 품질 점수 개선
+        
+        옮길 수 있는 개별 수업 하나를 무작위로 골라 다른 요일의 빈 시간대로 옮기거나
+        같은 반의 다른 개별 수업과 시간을 맞바꾸는 이동을 반복하며, 점수가 나빠지지 않는 이동만 적용합니다.
+        필수 조건(교사/학급 충돌, 연속 수업 제한, 하루 과목 제한)을 만족하는 이동만 후보로 삼고,
+        점수 변화는 score_manager.delta로 바뀌는 부분만 계산합니다.
+        
+        Args:
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            movable_lessons: 옮길 수 있는 개별 수업 {(학년, 반, 과목): 교사명}
+            score_manager: ScoreManager
+            max_moves: 시도할 이동 횟수
+            
+        Returns:
+            점수 변화의 합 (음수이면 개선)
+        """
+        # 옮길 수 있는 수업의 현재 위치 [(수업 정보, 요일, 교시)]
+        positions = []
+        for (grade, cls, subject), teacher in sorted(movable_lessons.items()):
+            lesson = self._make_lesson(grade, cls, subject, teacher)
+            grid = timetable[(grade, cls)]
+            for day in self.calendar.days:
+                for period in self.calendar.open_periods(grade, cls, day):
+                    if (grid[self.calendar.day_index[day]][period] == subject
+                            and teacher_schedule[teacher][day][period] == lesson['label']):
+                        positions.append((lesson, day, period))
+        if not positions:
+            return 0
+        by_class = defaultdict(list)  # (학년, 반) -> positions 색인
+        for idx, (lesson, _, _) in enumerate(positions):
+            by_class[(lesson['grade'], lesson['class'])].append(idx)
+        
+        total = 0
+        for _ in range(max_moves):
+            idx = self.rng.randrange(len(positions))
+            lesson, day, period = positions[idx]
+            grade, cls = lesson['grade'], lesson['class']
+            
+            if self.rng.random() < 0.5:
+                # 1-a. 옮기기: 같은 과목이 없는 다른 요일의 배치 가능한 빈 시간대 중 하나 선택
+                mask = self._unit_mask(lesson, timetable, teacher_schedule, relocating=True)
+                if not mask:
+                    continue
+                new_day, new_period = self.rng.choice(self.calendar.from_mask(mask))
+                changes = [(grade, cls, day, period, "", lesson['teacher'], ""),
+                           (grade, cls, new_day, new_period, lesson['subject'], lesson['teacher'], lesson['label'])]
+                moved = {idx: (lesson, new_day, new_period)}
+            else:
+                # 1-b. 맞바꾸기: 같은 반의 다른 개별 수업과 시간 교환
+                other_idx = self.rng.choice(by_class[(grade, cls)])
+                other, other_day, other_period = positions[other_idx]
+                if not self._can_swap(positions[idx], positions[other_idx], timetable, teacher_schedule):
+                    continue
+                changes = [(grade, cls, day, period, "", lesson['teacher'], ""),
+                           (grade, cls, other_day, other_period, "", other['teacher'], ""),
+                           (grade, cls, other_day, other_period, lesson['subject'], lesson['teacher'], lesson['label']),
+                           (grade, cls, day, period, other['subject'], other['teacher'], other['label'])]
+                moved = {idx: (lesson, other_day, other_period), other_idx: (other, day, period)}
+            
+            # 2. 점수가 나빠지지 않으면 이동 적용
+            delta = score_manager.delta(timetable, teacher_schedule, changes)
+            if delta <= 0:
+                for change in changes:
+                    self._assign(timetable, teacher_schedule, *change)
+                for moved_idx, position in moved.items():
+                    positions[moved_idx] = position
+                total += delta
+        
+        return total
+    
+    def _can_swap(self, first, second, timetable, teacher_schedule):
+        """
+        같은 반의 두 개별 수업의 시간을 맞바꿔도 필수 조건을 만족하는지 여부
+        
+        Args:
+            first, second: (수업 정보, 요일, 교시)
+        """
+        (lesson, day, period), (other, other_day, other_period) = first, second
+        if lesson['subject'] == other['subject']:
+            return False
+        
+        # 1. 하루 같은 과목 제한 (요일이 바뀌는 경우)
+        grid = timetable[(lesson['grade'], lesson['class'])]
+        if day != other_day and (lesson['subject'] in grid[self.calendar.day_index[other_day]]
+                                 or other['subject'] in grid[self.calendar.day_index[day]]):
+            return False
+        
+        # 2. 교사가 다르면 상대 시간에 수업할 수 있고 연속 수업 제한을 넘지 않아야 함
+        # (같은 요일 안의 교환은 원래 자리를 비우기 전 기준으로 세므로 보수적으로 판단)
+        if lesson['teacher'] != other['teacher']:
+            limit = self.settings['max_consecutive_teaching_hours']
+            for teacher, target_day, target_period in ((lesson['teacher'], other_day, other_period),
+                                                       (other['teacher'], day, period)):
+                if self._is_blocked(teacher, target_day, target_period):
+                    return False
+                if teacher_schedule[teacher][target_day][target_period] != "":
+                    return False
+                max_period = self.calendar.periods_per_day[target_day]
+                if self._count_consecutive_classes(teacher_schedule, teacher, target_day, target_period,
+                                                   max_period) > limit:
+                    return False
+        
+        # 3. 특별실: 상대 시간에 같은 종류의 특별실이 비지 않으면 남은 자리가 있어야 함
+        lesson_room = self.subject_rooms.get(lesson['subject'])
+        other_room = self.subject_rooms.get(other['subject'])
+        if lesson_room != other_room:
+            if lesson_room is not None and not self._has_room(lesson['subject'], other_day, other_period):
+                return False
+            if other_room is not None and not self._has_room(other['subject'], day, period):
+                return False
+        
+        return True
+    
+    def _assign(self, timetable, teacher_schedule, grade, cls, day, period, cell, teacher, label):
+        """
+        반 시간표 한 칸과 교사 일정 한 칸을 함께 기록 (모든 배치/제거가 이 함수를 거침)
+        
+        바뀌기 전 값은 되돌리기 기록(self.trail)에 쌓아 rollback으로 되돌릴 수 있게 합니다.
+        배치 기록(self.trace)이 켜져 있으면 기록 내용을 튜플 하나로 남겨
+        replay_trace로 탐색 없이 같은 시간표를 다시 만들 수 있게 합니다.
+        """
+        self.trail.append((grade, cls, day, period, timetable[(grade, cls)][self.calendar.day_index[day]][period],
+                           teacher, teacher_schedule[teacher][day][period]))
+        self._write(timetable, teacher_schedule, grade, cls, day, period, cell, teacher, label)
+    
+    def _write(self, timetable, teacher_schedule, grade, cls, day, period, cell, teacher, label):
+        """_assign과 rollback이 공유하는 기록 (교사 시수, 특별실, 캐시 버전, 배치 기록 갱신)"""
+        teacher_day = teacher_schedule[teacher][day]
+        self.teacher_load[teacher] += (label != "") - (teacher_day[period] != "")  # 주간 시수 증감
+        if self.subject_rooms:  # 특별실 반납/사용
+            old_room, new_room = self._label_room(teacher_day[period]), self._label_room(label)
+            if old_room != new_room:
+                if old_room is not None:
+                    self._use_room(old_room, day, period, -1)
+                if new_room is not None:
+                    self._use_room(new_room, day, period, 1)
+        timetable[(grade, cls)][self.calendar.day_index[day]][period] = cell
+        teacher_day[period] = label
+        self._teacher_version[(teacher, day)] += 1  # 이 교사와 학급의 해당 요일 캐시만 무효화
+        self._class_version[(grade, cls, day)] += 1
+        if self.trace is not None:
+            self.trace.append((grade, cls, day, period, cell, teacher, label))
+    
+    def replay_trace(self, trace):
+        """
+        배치 기록을 순서대로 적용하여 시간표 재현 (탐색과 난수 사용 없음)
+        
+        Args:
+            trace: _assign이 남긴 (학년, 반, 요일, 교시, 반 시간표 값, 교사, 교사 일정 값) 리스트
+        
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        timetable, teacher_schedule = self.new_timetable()
+        for grade, cls, day, period, cell, teacher, label in trace:
+            timetable[(grade, cls)][self.calendar.day_index[day]][period] = cell
+            teacher_schedule[teacher][day][period] = label
+        return timetable, teacher_schedule
+    
+    def build_room_schedule(self, teacher_schedule):
+        """
+        교사 일정에서 특별실 배정표 만들기
+        
+        특별실 종류마다 개수만큼 방을 만들고(2개 이상이면 "체육관 1", "체육관 2"),
+        각 시간대의 수업을 교사 이름 순서대로 빈 방에 배정합니다.
+        방이 모자라는 수업은 "(특별실 종류) 초과" 행에 표시합니다.
+        
+        Args:
+            teacher_schedule: 교사 일정
+            
+        Returns:
+            dict: {방 이름: {요일: [교시별 "과목 (학년-반) / 교사명"]}}
+        """
+        days = self.calendar.days
+        room_schedule = {}
+        rooms = {}  # 특별실 종류 -> 방 이름 목록
+        for room, capacity in self.room_capacity.items():
+            rooms[room] = [room] if capacity == 1 else [f"{room} {i + 1}" for i in range(capacity)]
+            for name in rooms[room]:
+                room_schedule[name] = {day: ["" for _ in range(self.calendar.max_periods)] for day in days}
+        
+        for teacher in sorted(teacher_schedule):
+            for day in days:
+                for period, label in enumerate(teacher_schedule[teacher][day]):
+                    room = self._label_room(label)
+                    if room is None:
+                        continue
+                    name = next((name for name in rooms[room] if room_schedule[name][day][period] == ""), None)
+                    if name is None:
+                        name = f"{room} 초과"
+                        room_schedule.setdefault(name, {d: ["" for _ in range(self.calendar.max_periods)] for d in days})
+                    room_schedule[name][day][period] = f"{label} / {teacher}"
+        
+        return room_schedule
+    
     def fill_empty_slots_with_study(self, timetable):
         """
         빈 교시를 '자습'으로 채우기
@@ -867,20 +1982,12 @@ class ScheduleManager:
             자습으로 채워진 시간표
         """
         # 모든 학년, 반의 시간표에 대해 처리
-        for (grade, cls), df in timetable.items():
-            for day_idx, day in enumerate(self.settings['days']):
-                max_period = self.settings['periods_per_day_by_day'][day]
-                
-                # 금요일의 경우 창체 시간 고려
-                if day == "금" and grade in self.settings["grades"]:
-                    max_check = min(max_period, 5)  # 금요일은 5교시까지만 확인
-                else:
-                    max_check = max_period
-                
-                # 빈 교시를 '자습'으로 채우기
-                for period in range(max_check):
-                    if df.iat[day_idx, period] == "":
-                        df.iat[day_idx, period] = "자습"
+        for (grade, cls), grid in timetable.items():
+            # 배치 가능 시간(고정 시간 제외)의 빈 교시를 '자습'으로 채우기
+            for day, period in self.calendar.open_slots(grade, cls):
+                day_idx = self.calendar.day_index[day]
+                if grid[day_idx][period] == "":
+                    grid[day_idx][period] = "자습"
         
         return timetable
     
@@ -893,30 +2000,229 @@ class ScheduleManager:
         Args:
             timetable: 시간표
         """
-        for (grade, cls, day, period, label) in self.fixed_slots:
-            key = (grade, cls)
+        for key, fixed in self.calendar.fixed.items():
             if key in timetable:
-                day_idx = self.settings['days'].index(day)
-                period_idx = period - 1
-                timetable[key].iat[day_idx, period_idx] = label
+                for (day, period), label in fixed.items():
+                    timetable[key][self.calendar.day_index[day]][period] = label
 
 # -----------------------------
 # 검증 모듈
 # -----------------------------
+class ValidationReport:
+    """
+    시간표 검증 결과를 담는 클래스
+    ValidationManager.validate가 한 번의 계산으로 모든 지표를 채워 반환합니다.
+    """
+    
+    def __init__(self, missing_hours, daily_limit_ok, consecutive_ok, max_consecutive, teacher_hours,
+                 overloaded=None, max_hours_hard=False, room_overflow=None):
+        """
+        Args:
+            missing_hours: 부족한 시수 정보 {(과목, 학년, 반): (필요 시수, 실제 시수)}
+            daily_limit_ok: 하루 같은 과목 제한 만족 여부
+            consecutive_ok: 교사 연속 수업 제한 만족 여부
+            max_consecutive: 교사별 최대 연속 수업 시간 {교사명: 시간}
+            teacher_hours: 교사별 주간 수업 시수 {교사명: 시수}
+            overloaded: 주간 최대 시수를 넘은 교사 {교사명: (주간 시수, 최대 시수)}
+            max_hours_hard: True이면 최대 시수 초과도 조건 위반으로 판단 (settings의 "hard" 모드)
+            room_overflow: 특별실 개수를 넘은 시간대 {(특별실 종류, 요일, 교시): (사용 수, 개수)}
+        """
+        self.missing_hours = missing_hours
+        self.daily_limit_ok = daily_limit_ok
+        self.consecutive_ok = consecutive_ok
+        self.max_consecutive = max_consecutive
+        self.teacher_hours = teacher_hours
+        self.overloaded = overloaded or {}
+        self.max_hours_hard = max_hours_hard
+        self.room_overflow = room_overflow or {}
+    
+    @property
+    def teacher_max_ok(self):
+        """모든 교사가 주간 최대 시수 이내인지 여부"""
+        return not self.overloaded
+    
+    @property
+    def room_ok(self):
+        """모든 시간대에서 특별실 사용 수가 개수 이내인지 여부"""
+        return not self.room_overflow
+    
+    @property
+    def is_valid(self):
+        """모든 조건(시수, 하루 과목 제한, 연속 수업 제한, 특별실 개수, hard 모드의 최대 시수)을 만족하는지 여부"""
+        return (not self.missing_hours and self.daily_limit_ok and self.consecutive_ok and self.room_ok
+                and (self.teacher_max_ok or not self.max_hours_hard))
+    
+    def failures(self):
+        """
+        만족하지 못한 조건 설명 목록 (is_valid이면 빈 리스트)
+        
+        Returns:
+            list: 예) ["부족 시수 2개", "하루 과목 제한 초과"]
+        """
+        failures = []
+        if self.missing_hours:
+            failures.append(f"부족 시수 {len(self.missing_hours)}개")
+        if not self.daily_limit_ok:
+            failures.append("하루 과목 제한 초과")
+        if not self.consecutive_ok:
+            failures.append("연속 수업 제한 초과")
+        if not self.room_ok:
+            failures.append(f"특별실 개수 초과 {len(self.room_overflow)}개 시간대")
+        if self.max_hours_hard and not self.teacher_max_ok:
+            failures.append(f"주간 최대 시수 초과 {len(self.overloaded)}명")
+        return failures
+
 class ValidationManager:
     """
     시간표 검증을 담당하는 클래스
     생성된 시간표가 제약 조건을 만족하는지 검증합니다.
     """
     
-    def __init__(self, settings):
+    def __init__(self, settings, subject_rooms=None):
         """
         초기화: 시간표 설정 저장
         
         Args:
             settings: 시간표 설정
+            subject_rooms: 과목별 필요한 특별실 종류 {과목명: 특별실 종류}
+                (settings['rooms']에 있는 종류만 개수를 검사)
         """
         self.settings = settings
+        self.room_capacity = dict(settings.get('rooms', {}))
+        self.subject_rooms = {subject: room for subject, room in (subject_rooms or {}).items()
+                              if room in self.room_capacity}
+    
+    def validate(self, timetable, teacher_schedule, teachers, selection_groups, max_per_day=1,
+                 teacher_load=None):
+        """
+        모든 검증 지표를 한 번에 계산
+        
+        시간표를 정수 텐서(학급 x 요일 x 교시의 과목 ID, 교사 x 요일 x 교시의 수업 여부)로
+        변환한 뒤 NumPy 집계 연산으로 시수, 하루 과목 제한, 연속 수업, 교사 시수, 특별실 사용 수를 계산합니다.
+        check_subject_hours_completed 등 개별 검증 함수와 같은 결과를 반환합니다.
+        
+        Args:
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            teachers: 교사 정보
+            selection_groups: 선택 그룹 정보 (딕셔너리 또는 SelectionGroupIndex)
+            max_per_day: 하루 최대 과목 수 (기본값: 1)
+            teacher_load: 배치 중에 세어 둔 교사별 주간 시수 (ScheduleManager.teacher_load,
+                있으면 교사 시수를 다시 세지 않음)
+            
+        Returns:
+            ValidationReport: 검증 결과
+        """
+        max_consecutive_limit = self.settings['max_consecutive_teaching_hours']
+        group_index = SelectionGroupIndex.of(selection_groups)
+        
+        # 1. 학급 시간표 텐서: (학급, 요일, 교시) -> 셀 값 ID
+        class_keys = list(timetable.keys())
+        class_index = {key: i for i, key in enumerate(class_keys)}
+        if class_keys:
+            cells = np.array([timetable[key] for key in class_keys], dtype=object)
+        else:
+            cells = np.empty((0, len(self.settings['days']), 0), dtype=object)
+        labels, subject_ids = np.unique(cells, return_inverse=True)
+        subject_ids = subject_ids.reshape(cells.shape)
+        label_index = {label: i for i, label in enumerate(labels)}
+        n_classes, n_days, n_periods = cells.shape
+        n_labels = len(labels)
+        
+        # 빈 시간, 창체, 자습은 집계에서 제외
+        ignored = np.zeros(n_labels, dtype=bool)
+        for label in ["", "창체", "자습"]:
+            if label in label_index:
+                ignored[label_index[label]] = True
+        
+        # 2. 학급 x 요일 x 과목 등장 횟수 (하루 과목 제한)
+        day_rows = np.repeat(np.arange(n_classes * n_days), n_periods)
+        day_counts = np.bincount(day_rows * n_labels + subject_ids.ravel(),
+                                 minlength=n_classes * n_days * n_labels).reshape(n_classes * n_days, n_labels)
+        day_counts[:, ignored] = 0
+        daily_limit_ok = not (day_counts > max_per_day).any()
+        
+        # 3. 학급 x 과목 주간 시수
+        week_counts = day_counts.reshape(n_classes, n_days, n_labels).sum(axis=1)
+        
+        # 4. 필요 시수 목록과, 각 항목의 시수에 기여하는 (학급, 셀 값) 쌍
+        required_hours = {}
+        for teacher, info in teachers.items():
+            for subject_info in info["subjects"]:
+                for cls in subject_info["classes"]:
+                    required_hours[(subject_info["subject"], subject_info["grade"], cls)] = subject_info["hours"]
+        
+        required_keys = list(required_hours.keys())
+        pair_key, pair_class, pair_label = [], [], []
+        for k, (subject, grade, cls) in enumerate(required_keys):
+            c = class_index.get((grade, cls))
+            if c is None:
+                continue
+            contributing = [subject, *group_index.groups_of(grade, subject)]
+            for label in contributing:
+                if label in label_index:
+                    pair_key.append(k)
+                    pair_class.append(c)
+                    pair_label.append(label_index[label])
+        
+        assigned = np.bincount(np.array(pair_key, dtype=np.int64),
+                               weights=week_counts[pair_class, pair_label] if pair_key else None,
+                               minlength=len(required_keys))
+        required = np.array([required_hours[key] for key in required_keys], dtype=np.int64)
+        
+        missing_hours = {required_keys[k]: (int(required[k]), int(assigned[k]))
+                         for k in np.flatnonzero(assigned < required)}
+        
+        # 5. 교사 텐서: (교사, 요일, 교시) -> 수업 여부
+        teacher_names = list(teacher_schedule.keys())
+        if teacher_names:
+            teacher_cells = np.array([[schedule[day] for day in schedule]
+                                      for schedule in teacher_schedule.values()], dtype=object)
+        else:
+            teacher_cells = np.zeros((0, 0, 0), dtype=object)
+        occupied = teacher_cells != ""
+        
+        # 6. 교사별 시수와 최대 연속 수업 시간 (교시 방향으로 연속 길이를 누적)
+        if teacher_load is not None:
+            teacher_hours = {t: teacher_load.get(t, 0) for t in teacher_names}
+        else:
+            teacher_hours = {t: int(v) for t, v in zip(teacher_names, occupied.sum(axis=(1, 2)))}
+        run = np.zeros(occupied.shape[:2], dtype=np.int64)
+        longest = np.zeros(occupied.shape[:2], dtype=np.int64)
+        for p in range(occupied.shape[2]):
+            run = (run + 1) * occupied[:, :, p]
+            np.maximum(longest, run, out=longest)
+        teacher_longest = longest.max(axis=1, initial=0)
+        
+        # 7. 주간 최대 시수를 넘은 교사
+        overloaded = {t: (hours, teachers[t]['max']) for t, hours in teacher_hours.items()
+                      if 'max' in teachers.get(t, {}) and hours > teachers[t]['max']}
+        
+        # 8. 특별실 종류 x 요일 x 교시 사용 수 (교사 한 명이 한 시간에 방 하나 사용)
+        room_overflow = {}
+        if self.subject_rooms and teacher_cells.size:
+            room_names = list(self.room_capacity)
+            teacher_labels, label_ids = np.unique(teacher_cells, return_inverse=True)
+            label_rooms = np.array([room_names.index(self.subject_rooms[label.rsplit(" (", 1)[0]])
+                                    if label and label.rsplit(" (", 1)[0] in self.subject_rooms else -1
+                                    for label in teacher_labels], dtype=np.int64)
+            slot_rooms = label_rooms[label_ids.reshape(teacher_cells.shape)]  # (교사, 요일, 교시) -> 특별실 번호
+            days = list(next(iter(teacher_schedule.values())))
+            for r, room in enumerate(room_names):
+                used = (slot_rooms == r).sum(axis=0)
+                for d, p in zip(*np.nonzero(used > self.room_capacity[room])):
+                    room_overflow[(room, days[d], int(p))] = (int(used[d, p]), self.room_capacity[room])
+        
+        return ValidationReport(
+            missing_hours=missing_hours,
+            daily_limit_ok=daily_limit_ok,
+            consecutive_ok=not (teacher_longest > max_consecutive_limit).any(),
+            max_consecutive={t: int(v) for t, v in zip(teacher_names, teacher_longest)},
+            teacher_hours=teacher_hours,
+            overloaded=overloaded,
+            max_hours_hard=self.settings.get('teacher_max_hours_mode', 'soft') == 'hard',
+            room_overflow=room_overflow
+        )
     
     def check_subject_hours_completed(self, timetable, teachers, selection_groups):
         """
@@ -925,11 +2231,13 @@ class ValidationManager:
         Args:
             timetable: 시간표
             teachers: 교사 정보
-            selection_groups: 선택 그룹 정보
+            selection_groups: 선택 그룹 정보 (딕셔너리 또는 SelectionGroupIndex)
             
         Returns:
             부족한 시수 정보 딕셔너리 (없으면 빈 딕셔너리)
         """
+        group_index = SelectionGroupIndex.of(selection_groups)
+        
         # 1. 각 과목별 필요 시수 정보 수집
         required_hours = {}  # (과목, 학년, 반) -> 필요 시수
         assigned_hours = {}  # (과목, 학년, 반) -> 실제 배치된 시수
@@ -948,21 +2256,19 @@ class ValidationManager:
                     assigned_hours[key] = 0  # 초기값 0
         
         # 2. 시간표에서 실제 배치된 시수 계산
-        for (grade, cls), df in timetable.items():
-            for day in self.settings['days']:
-                day_idx = self.settings['days'].index(day)
-                
-                for period in range(len(df.columns)):
-                    subject = df.iat[day_idx, period]
+        for (grade, cls), grid in timetable.items():
+            for day_idx, day in enumerate(self.settings['days']):
+                for period in range(len(grid[day_idx])):
+                    subject = grid[day_idx][period]
                     
                     # 빈 시간이거나 특수 항목(창체, 자습)이면 건너뛰기
                     if not subject or subject in ["창체", "자습"]:
                         continue
                     
-                    # 선택A, 선택B 등 특별 선택 그룹인 경우
-                    if subject in ["선택A", "선택B", "선택C", "선택D"]:
+                    # 선택A, 선택B 등 특별 선택 그룹인 경우 (그룹 이름은 학년별 selection_groups에서 확인)
+                    if group_index.is_group(grade, subject):
                         # 그룹 내 모든 해당 과목의 시수 증가
-                        for group_subject in selection_groups.get(grade, {}).get(subject, []):
+                        for group_subject in group_index.subjects_of(grade, subject):
                             key = (group_subject, grade, cls)
                             if key in required_hours:
                                 assigned_hours[key] = assigned_hours.get(key, 0) + 1
@@ -1021,10 +2327,9 @@ class ValidationManager:
         Returns:
             bool: 모든 과목이 제한을 지키면 True, 아니면 False
         """
-        for (grade), df in timetable.items():
-            for day in df.index:
+        for (grade), grid in timetable.items():
+            for subjects in grid:
                 # 해당 요일의 각 교시 과목 확인
-                subjects = df.loc[day].values
                 
                 # 과목별 등장 횟수 세기
                 subject_counts = {}
@@ -1099,16 +2404,578 @@ class ValidationManager:
         
         return teacher_hours
 
+# -----------------------------
+# 품질 점수 모듈
+# -----------------------------
+# 부드러운 제약 조건의 기본 가중치 (settings['soft_weights']로 항목별 변경, 0이면 무시)
+DEFAULT_SOFT_WEIGHTS = {
+    "teacher_gap": 1,       # 교사의 하루 첫 수업과 마지막 수업 사이 빈 시간(공강) 1시간마다
+    "core_afternoon": 1,    # 핵심 과목(settings['core_subjects'])이 오전 교시 밖에 배치된 1시간마다
+    "subject_adjacent": 1,  # 같은 과목이 이웃한 두 요일에 연달아 배치된 경우마다
+}
+
+class ScoreManager:
+    """
+    시간표 품질 점수(부드러운 제약 조건)를 계산하는 클래스
+    필수 조건(시수, 연속 수업, 하루 과목 제한)처럼 만족/위반으로 나누지 않고 위반 정도에
+    가중치를 곱해 합산하며, 점수가 낮을수록 좋은 시간표입니다.
+    모든 항목이 (교사, 요일) 또는 (학년, 반) 단위로 나뉘어 계산되므로, 수업 이동의 점수 변화는
+    이동으로 바뀌는 교사-요일과 학급만 다시 계산하여 구합니다 (delta).
+    """
+    
+    def __init__(self, settings, calendar):
+        """
+        Args:
+            settings: 시간표 설정 (soft_weights, core_subjects, morning_periods 사용)
+            calendar: SchoolCalendar (요일별 교시 수, 학급별 배치 가능 시간)
+        """
+        self.settings = settings
+        self.calendar = calendar
+        self.weights = dict(DEFAULT_SOFT_WEIGHTS, **settings.get('soft_weights', {}))
+        self.core_subjects = set(settings.get('core_subjects', []))
+        self.morning_periods = settings.get('morning_periods', 4)  # 오전 교시 수 (0부터 이 값 미만)
+    
+    def breakdown(self, timetable, teacher_schedule):
+        """
+        항목별 위반 횟수 (가중치 적용 전)
+        
+        Args:
+            timetable: 시간표 {(학년, 반): [요일][교시] 리스트}
+            teacher_schedule: 교사 일정 {교사명: {요일: [교시별 수업]}}
+            
+        Returns:
+            dict: {항목 이름: 위반 횟수}
+        """
+        result = dict.fromkeys(DEFAULT_SOFT_WEIGHTS, 0)
+        for schedule in teacher_schedule.values():
+            for day in self.calendar.days:
+                result["teacher_gap"] += self._teacher_gaps(schedule[day], day)
+        for (grade, cls), grid in timetable.items():
+            core_late, adjacent = self._class_counts(grade, cls, grid)
+            result["core_afternoon"] += core_late
+            result["subject_adjacent"] += adjacent
+        return result
+    
+    def score(self, timetable, teacher_schedule):
+        """전체 시간표의 가중 점수 (낮을수록 좋음)"""
+        counts = self.breakdown(timetable, teacher_schedule)
+        return sum(self.weights.get(name, 0) * count for name, count in counts.items())
+    
+    def local_score(self, timetable, teacher_schedule, teacher_days, classes):
+        """
+        일부 교사-요일과 학급에 해당하는 점수만 계산
+        
+        Args:
+            teacher_days: (교사명, 요일) 집합
+            classes: (학년, 반) 집합
+        """
+        gap = sum(self._teacher_gaps(teacher_schedule[teacher][day], day) for teacher, day in teacher_days)
+        core_late = adjacent = 0
+        for grade, cls in classes:
+            counts = self._class_counts(grade, cls, timetable[(grade, cls)])
+            core_late += counts[0]
+            adjacent += counts[1]
+        return (self.weights["teacher_gap"] * gap + self.weights["core_afternoon"] * core_late
+                + self.weights["subject_adjacent"] * adjacent)
+    
+    def delta(self, timetable, teacher_schedule, changes):
+        """
+        변경을 적용했을 때의 점수 변화 (시간표는 바꾸지 않음)
+        
+        바뀌는 교사-요일과 학급의 점수만 변경 전후로 계산하므로,
+        전체 점수를 다시 계산하지 않고 후보 이동 하나를 평가할 수 있습니다.
+        
+        Args:
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            changes: 배치 기록과 같은 형식의 변경 목록
+                [(학년, 반, 요일, 교시, 반 시간표 값, 교사, 교사 일정 값)]
+            
+        Returns:
+            점수 변화 (음수이면 개선)
+        """
+        teacher_days = {(teacher, day) for _, _, day, _, _, teacher, _ in changes}
+        classes = {(grade, cls) for grade, cls, *_ in changes}
+        before = self.local_score(timetable, teacher_schedule, teacher_days, classes)
+        
+        # 임시로 적용하여 계산한 뒤 역순으로 되돌리기
+        saved = []
+        for grade, cls, day, period, cell, teacher, label in changes:
+            row = timetable[(grade, cls)][self.calendar.day_index[day]]
+            teacher_day = teacher_schedule[teacher][day]
+            saved.append((row, teacher_day, period, row[period], teacher_day[period]))
+            row[period] = cell
+            teacher_day[period] = label
+        after = self.local_score(timetable, teacher_schedule, teacher_days, classes)
+        for row, teacher_day, period, cell, label in reversed(saved):
+            row[period] = cell
+            teacher_day[period] = label
+        
+        return after - before
+    
+    def _teacher_gaps(self, teacher_day, day):
+        """교사의 하루 일정에서 첫 수업과 마지막 수업 사이의 빈 교시 수"""
+        busy = [period for period in range(self.calendar.periods_per_day[day]) if teacher_day[period] != ""]
+        return busy[-1] - busy[0] + 1 - len(busy) if len(busy) > 1 else 0
+    
+    def _class_counts(self, grade, cls, grid):
+        """
+        학급 시간표 하나의 (오전 밖 핵심 과목 수, 이웃한 요일에 연달아 있는 과목 수)
+        
+        고정 시간과 빈 교시, '자습'은 세지 않습니다.
+        """
+        core_late = 0
+        subject_days = defaultdict(set)
+        for day in self.calendar.days:
+            day_idx = self.calendar.day_index[day]
+            row = grid[day_idx]
+            for period in self.calendar.open_periods(grade, cls, day):
+                cell = row[period]
+                if cell == "" or cell == "자습":
+                    continue
+                subject_days[cell].add(day_idx)
+                if period >= self.morning_periods and cell in self.core_subjects:
+                    core_late += 1
+        adjacent = sum(1 for day_idxs in subject_days.values() for day_idx in day_idxs if day_idx + 1 in day_idxs)
+        return core_late, adjacent
+
+# -----------------------------
+# 사전 점검 모듈
+# -----------------------------
+class FeasibilityAnalyzer:
+    """
+    시간표 생성 전에 입력 데이터만으로 확인할 수 있는 불가능 조건을 찾는 클래스
+    교사별/학급별 필요 시수를 주간 최대 시수와 배치 가능한 시간 수(고정 시간과 교사 불가 시간 제외)에
+    비교하여 여러 번 시도해도 만족할 수 없는 조건을 생성 전에 알려줍니다.
+    """
+    
+    def __init__(self, settings, teachers, selection_groups, calendar, subject_rooms=None):
+        """
+        Args:
+            settings: 시간표 설정
+            teachers: 교사 정보
+            selection_groups: 선택 그룹 정보 (딕셔너리 또는 SelectionGroupIndex)
+            calendar: SchoolCalendar (학급별 배치 가능 시간)
+            subject_rooms: 과목별 필요한 특별실 종류 {과목명: 특별실 종류}
+        """
+        self.settings = settings
+        self.teachers = teachers
+        self.selection_groups = selection_groups
+        self.calendar = calendar
+        self.subject_rooms = subject_rooms or {}
+        self.teacher_blocked = {teacher: calendar.blocked_mask(info.get('unavailable'))
+                                for teacher, info in teachers.items()}
+    
+    def _open_mask(self, teacher, grade, cls):
+        """교사가 학급에 수업할 수 있는 시간대 (학급 고정 시간과 교사 불가 시간 제외)"""
+        return self.calendar.to_mask(self.calendar.open_slots(grade, cls)) & ~self.teacher_blocked.get(teacher, 0)
+    
+    def compute_demand(self):
+        """
+        교사별/학급별 주간 필요 시수 계산
+        
+        선택 그룹과 일반 선택 그룹은 여러 반이 같은 시간에 수업하므로 그룹 시수를 한 번만 셉니다.
+        
+        Returns:
+            tuple: (교사별 필요 시수 {교사명: 시수}, 학급별 필요 시수 {(학년, 반): 시수},
+                    개별 과목 {(학년, 반, 과목): (시수, 교사명)},
+                    그룹 {그룹 이름: (시수, [(교사명, 학년, 반, 과목)])})
+        """
+        grouped_blocks = DataManager.group_lesson_blocks(DataManager.generate_lesson_blocks(self.teachers))
+        selection_group_blocks, choice_group_blocks, individual_blocks = DataManager.classify_blocks(
+            grouped_blocks, self.selection_groups)
+        
+        teacher_demand = defaultdict(int)
+        class_demand = defaultdict(int)
+        lesson_hours = {}
+        group_needs = {}
+        
+        # 1. 같은 시간에 함께 배치되는 그룹: 교사는 블록마다, 학급은 그룹마다 한 번
+        for groups in (selection_group_blocks, choice_group_blocks):
+            for key, blocks in groups.items():
+                name = f"{key[0]}학년 {key[1]}" if isinstance(key, tuple) else key
+                hours = blocks[0]['hours']
+                group_needs[name] = (hours, [(block['teacher'], block['grade'], cls, block['subject'])
+                                             for block in blocks for cls in block['classes']])
+                for block in blocks:
+                    teacher_demand[block['teacher']] += hours
+                for key in {(block['grade'], cls) for block in blocks for cls in block['classes']}:
+                    class_demand[key] += hours
+        
+        # 2. 개별 과목: 반마다 따로 수업
+        for block in individual_blocks:
+            teacher_demand[block['teacher']] += block['hours'] * len(block['classes'])
+            for cls in block['classes']:
+                class_demand[(block['grade'], cls)] += block['hours']
+                lesson_hours[(block['grade'], cls, block['subject'])] = (block['hours'], block['teacher'])
+        
+        return teacher_demand, class_demand, lesson_hours, group_needs
+    
+    def analyze(self):
+        """
+        불가능하거나 주의가 필요한 조건 목록
+        
+        Returns:
+            list: [{"level": "error"|"warning", "kind": 종류, "target": 대상,
+                    "required": 필요 시수, "available": 가능 시수, "message": 설명}]
+        """
+        teacher_demand, class_demand, lesson_hours, group_needs = self.compute_demand()
+        max_hours_hard = self.settings.get('teacher_max_hours_mode', 'soft') == 'hard'
+        issues = []
+        
+        def add(level, kind, target, required, available, message):
+            issues.append({"level": level, "kind": kind, "target": target,
+                           "required": required, "available": available, "message": message})
+        
+        # 1. 교사 주간 최대 시수
+        for teacher, demand in teacher_demand.items():
+            limit = self.teachers[teacher].get('max')
+            if limit is not None and demand > limit:
+                add("error" if max_hours_hard else "warning", "teacher_max", teacher, demand, limit,
+                    f"{teacher}: 담당 시수 {demand}시간이 주간 최대 시수 {limit}시간을 넘습니다.")
+        
+        # 2. 교사가 수업할 수 있는 시간 수 (담당 학급 중 하나라도 비어 있고 교사 불가 시간이 아닌 시간대)
+        teacher_classes = defaultdict(set)
+        for teacher, info in self.teachers.items():
+            for subject_info in info['subjects']:
+                for cls in subject_info['classes']:
+                    teacher_classes[teacher].add((subject_info['grade'], cls))
+        for teacher, demand in teacher_demand.items():
+            mask = 0
+            for grade, cls in teacher_classes[teacher]:
+                mask |= self._open_mask(teacher, grade, cls)
+            available = bin(mask).count("1")
+            if demand > available:
+                add("error", "teacher_slots", teacher, demand, available,
+                    f"{teacher}: 담당 시수 {demand}시간이 수업 가능한 시간 {available}시간보다 많습니다.")
+        
+        # 3. 학급의 배치 가능 시간 (고정 시간 제외)
+        for (grade, cls), demand in sorted(class_demand.items()):
+            available = len(self.calendar.open_slots(grade, cls))
+            if demand > available:
+                add("error", "class_slots", f"{grade}-{cls}", demand, available,
+                    f"{grade}학년 {cls}반: 필요 시수 {demand}시간이 배치 가능한 시간 {available}시간보다 많습니다.")
+        
+        # 4. 하루 같은 과목 1시간 제한 (과목 시수가 수업 가능한 요일 수보다 많으면 불가능)
+        for (grade, cls, subject), (hours, teacher) in sorted(lesson_hours.items()):
+            days = len({day for day, _ in self.calendar.from_mask(self._open_mask(teacher, grade, cls))})
+            if hours > days:
+                add("error", "daily_limit", f"{grade}-{cls} {subject}", hours, days,
+                    f"{grade}학년 {cls}반 {subject}: 주 {hours}시간을 하루 1시간씩 배치할 요일({days}일)이 부족합니다.")
+        
+        # 5. 그룹 수업: 모든 교사와 학급이 동시에 수업할 수 있는 시간 수
+        for name, (hours, members) in group_needs.items():
+            mask = -1
+            for teacher, grade, cls, _ in members:
+                mask &= self._open_mask(teacher, grade, cls)
+            available = bin(mask).count("1") if mask != -1 else 0
+            if hours > available:
+                add("error", "group_slots", name, hours, available,
+                    f"{name}: 그룹 시수 {hours}시간을 모든 교사와 학급이 함께 수업할 수 있는 시간이 "
+                    f"{available}시간뿐입니다.")
+        
+        # 6. 특별실: 교사 수업 한 시간이 특별실 하나를 사용
+        rooms = self.settings.get('rooms', {})
+        room_demand = defaultdict(int)
+        for subject, room in sorted(self.subject_rooms.items()):
+            if room not in rooms:
+                add("warning", "room_unknown", subject, 0, 0,
+                    f"{subject}: 특별실 '{room}'이(가) 설정(rooms)에 없어 특별실 제한을 적용하지 않습니다.")
+        for (grade, cls, subject), (hours, teacher) in lesson_hours.items():
+            if self.subject_rooms.get(subject) in rooms:
+                room_demand[self.subject_rooms[subject]] += hours
+        for name, (hours, members) in group_needs.items():
+            group_rooms = defaultdict(set)  # 같은 시간에 필요한 특별실 {종류: {교사}} (교사 한 명은 한 곳만 사용)
+            for teacher, _, _, subject in members:
+                if self.subject_rooms.get(subject) in rooms:
+                    group_rooms[self.subject_rooms[subject]].add(teacher)
+            for room, lessons in group_rooms.items():
+                room_demand[room] += hours * len(lessons)
+                if len(lessons) > rooms[room]:
+                    add("error", "room_group", name, len(lessons), rooms[room],
+                        f"{name}: 같은 시간에 {room} {len(lessons)}곳이 필요하지만 {rooms[room]}곳뿐입니다.")
+        for room, demand in sorted(room_demand.items()):
+            available = rooms[room] * len(self.calendar.slots)
+            if demand > available:
+                add("error", "room_slots", room, demand, available,
+                    f"{room}: 필요한 사용 시간 {demand}시간이 사용 가능한 시간 {available}시간보다 많습니다.")
+        
+        return issues
+
 # -----------------------------
 # 시간표 생성 매니저
 # -----------------------------
+def derive_trial_seed(seed, trial):
+    """
+    실행 시드와 시도 번호로부터 시도별 시드 계산
+    
+    문자열 시드는 해시 무작위화(PYTHONHASHSEED)와 무관하게 항상 같은 값으로 변환되므로
+    프로세스나 실행 환경이 달라도 같은 시도는 같은 난수열을 사용합니다.
+    """
+    return random.Random(f"{seed}:{trial}").getrandbits(32)
+
+class RunRecord:
+    """
+    시간표 생성 한 번의 재현 정보를 담는 클래스
+    실행 시드, 시도별 시드, 결과를 만든 시도, (기록을 켠 경우) 배치 기록을 저장합니다.
+    """
+    
+    def __init__(self, seed):
+        """
+        Args:
+            seed: 실행 시드 (시도별 시드는 derive_trial_seed(seed, 시도 번호))
+        """
+        self.seed = seed
+        self.trial_seeds = []  # 실행한 시도 순서대로의 시드
+        self.trial_times = []  # 시도별 실행 시간(초)
+        self.trial_scores = []  # 시도별 품질 점수 (모든 조건을 만족한 시도만, 나머지는 None)
+        self.result_trial = None  # 반환한 결과를 만든 시도 번호 (1부터)
+        self.trace = None  # 반환한 결과의 배치 기록
+        self.components = None  # 독립된 묶음으로 나누어 생성한 경우 묶음별 RunRecord
+        self.strategy = None  # 포트폴리오 실행에서 결과를 만든 전략 이름
+        self.strategy_seed = None  # 포트폴리오 실행에서 그 전략의 실행 시드 (시도별 시드는 이 값에서 유도)
+        self.trial_missing = []  # 시도별 부족 시수 항목 수 (조건을 만족한 시도는 0)
+        self.phase_times = None  # settings['profile']이 켜져 있으면 {단계: [시도별 실행 시간(초)]}
+    
+    @property
+    def result_seed(self):
+        """반환한 결과를 만든 시도의 시드 (run_trial로 그 시도만 다시 실행 가능)"""
+        return self.trial_seeds[self.result_trial - 1] if self.result_trial else None
+    
+    @property
+    def result_score(self):
+        """반환한 결과의 품질 점수 (모든 조건을 만족한 결과가 없거나 묶음별로 생성한 경우 None)"""
+        if not self.result_trial or self.result_trial > len(self.trial_scores):
+            return None
+        return self.trial_scores[self.result_trial - 1]
+    
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 딕셔너리로 변환"""
+        return {
+            "seed": self.seed,
+            "trial_seeds": self.trial_seeds,
+            "trial_times": [round(t, 4) for t in self.trial_times],
+            "result_trial": self.result_trial,
+            "trial_scores": self.trial_scores,
+            "result_score": self.result_score,
+            "trace": [list(entry) for entry in self.trace] if self.trace is not None else None,
+            "components": [c.to_dict() for c in self.components] if self.components is not None else None,
+            "strategy": self.strategy,
+            "strategy_seed": self.strategy_seed,
+            "trial_missing": self.trial_missing,
+            "phase_times": ({phase: [round(t, 6) for t in times] for phase, times in self.phase_times.items()}
+                            if self.phase_times is not None else None),
+            "phase_summary": self.phase_summary(),
+        }
+    
+    def phase_summary(self):
+        """
+        단계별 실행 시간 요약 (단계를 측정한 경우만, 'trial'은 시도 전체)
+        
+        Returns:
+            dict: {단계: {"count": 측정 횟수, "total": 합계, "p50", "p90", "p99", "max": 시간(초)}}
+        """
+        if self.phase_times is None:
+            return {}
+        summary = {}
+        trial_times = self.trial_times or [t for c in self.components or [] for t in c.trial_times]
+        for phase, times in list(self.phase_times.items()) + [("trial", trial_times)]:
+            if not times:
+                continue
+            p50, p90, p99 = np.percentile(times, [50, 90, 99])
+            summary[phase] = {"count": len(times), "total": round(sum(times), 6), "p50": round(float(p50), 6),
+                              "p90": round(float(p90), 6), "p99": round(float(p99), 6), "max": round(max(times), 6)}
+        return summary
+
+class TrialHistory:
+    """
+    같은 입력 데이터로 실행한 기록을 바탕으로 시도 횟수를 정하는 클래스 (JSON 파일에 저장)
+    
+    시도 한 번은 항상 처음부터 다시 배치하므로 시도마다 비용이 거의 같고, 필요한 시도 횟수는
+    입력 데이터가 얼마나 어려운지(조건을 만족하는 시도의 비율)에 달려 있습니다.
+    이전 실행들에서 관찰한 비율로 quality_trials개를 모으는 데 필요한 시도 횟수를 계산하여,
+    쉬운 데이터는 일찍 멈추고 어려운 데이터는 고정된 100회보다 더 오래 시도하게 합니다.
+    """
+    
+    DEFAULT_PATH = "trial_history.json"  # 웹 화면에서 사용하는 기록 파일
+    MAX_RECORDS = 20  # 데이터별로 보관할 최근 실행 수
+    MIN_RECORDS = 3  # 시도 횟수를 계산하기 위해 필요한 실행 수
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: 기록 파일 경로 (없으면 빈 기록으로 시작)
+        """
+        self.path = path
+        self.records = {}  # 데이터 지문 -> [{"trials", "complete", "first"}]
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.records = json.load(f)
+    
+    @staticmethod
+    def fingerprint(settings, teachers, subjects, selection_groups, fixed_slots):
+        """입력 데이터 지문 (같은 데이터면 실행 환경과 무관하게 같은 값, 결과에 영향이 없는 'profile'은 제외)"""
+        settings = {key: value for key, value in settings.items() if key != 'profile'}
+        
+        def canonical(value):
+            # 집합과 딕셔너리는 순서가 실행마다 달라질 수 있으므로 정렬한 표현 사용
+            if isinstance(value, dict):
+                return sorted((repr(canonical(k)), canonical(v)) for k, v in value.items())
+            if isinstance(value, (set, frozenset)):
+                return sorted(repr(canonical(v)) for v in value)
+            if isinstance(value, (list, tuple)):
+                return [canonical(v) for v in value]
+            return value
+        data = repr(canonical((settings, teachers, subjects, selection_groups, fixed_slots)))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+    
+    def record(self, key, run):
+        """
+        실행 결과 기록 (묶음별로 나누어 생성한 실행은 시도 횟수가 묶음마다 달라 기록하지 않음)
+        
+        Args:
+            key: 데이터 지문
+            run: RunRecord
+        """
+        if not run.trial_seeds:
+            return
+        complete = [trial for trial, score in enumerate(run.trial_scores, 1) if score is not None]
+        entries = self.records.setdefault(key, [])
+        entries.append({"trials": len(run.trial_seeds), "complete": len(complete),
+                        "first": complete[0] if complete else None})
+        del entries[:-self.MAX_RECORDS]
+    
+    def suggest_trials(self, key, quality_trials, default=100):
+        """
+        기록에서 관찰한 조건 만족 비율로 시도 횟수 계산
+        
+        필요한 시도 수의 기댓값(quality_trials / 비율)에 여유 50%를 더하며,
+        기록이 부족하면 기본값, 조건을 만족한 적이 없으면 지금까지 가장 많이 시도한 횟수의 2배를 사용합니다.
+        
+        Args:
+            key: 데이터 지문
+            quality_trials: 모을 조건 만족 시간표 수 (settings['quality_trials'])
+            default: 기록이 부족할 때의 시도 횟수
+            
+        Returns:
+            int: 시도 횟수 (quality_trials 이상, default의 10배 이하)
+        """
+        entries = self.records.get(key, [])
+        if len(entries) < self.MIN_RECORDS:
+            return default
+        
+        complete = sum(entry["complete"] for entry in entries)
+        if complete == 0:
+            trials = 2 * max(entry["trials"] for entry in entries)
+        else:
+            rate = complete / sum(entry["trials"] for entry in entries)
+            trials = math.ceil(1.5 * quality_trials / rate)
+        return max(quality_trials, min(trials, 10 * default))
+    
+    def save(self):
+        """기록 파일 저장"""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+
+def solve_component(job):
+    """
+    독립된 묶음 하나의 시간표 생성 (별도 프로세스에서 실행할 수 있도록 모듈 수준 함수로 둠)
+    
+    Args:
+        job: (설정, 묶음의 교사 정보, 과목, 선택 그룹, 고정 시간, 배치 순서, 시드, 배치 기록 여부,
+              최대 시도 횟수, 최대 실행 시간)
+        
+    Returns:
+        tuple: (시간표, 교사 일정, 재현 정보 RunRecord)
+    """
+    (settings, teachers, subjects, selection_groups, fixed_slots,
+     placement_order, seed, record_trace, max_trials, time_limit) = job
+    manager = TimetableManager(settings, teachers, subjects, selection_groups, fixed_slots,
+                               placement_order, seed=seed, record_trace=record_trace)
+    timetable, teacher_schedule = manager.create_timetable(max_trials, time_limit)
+    
+    # 프로세스 간 전달을 위해 defaultdict를 일반 dict로 변환
+    return dict(timetable), dict(teacher_schedule), manager.last_run
+
+# 포트폴리오 실행 전략: 전략 이름 -> (배치 순서, 덮어쓸 설정)
+PORTFOLIO_STRATEGIES = {
+    "random": ("hours", {"nogood_memory": False}),  # 시수 순서 + 무작위 재시작
+    "constrained": ("constrained", {}),  # 가능 시간대가 적은 수업부터 + 탐색 기억
+    "learning": ("constrained", {"pheromone": True}),  # 좋은 시도의 시간대를 학습
+    "repair": ("constrained", {"repair_chain_depth": 3, "repair_chain_budget": 1000}),  # 깊은 연쇄 이동 복구
+}
+
+class SharedIncumbent:
+    """
+    포트폴리오 작업자 프로세스들이 공유하는 현재 최선 결과 (공유 메모리)
+    
+    모든 조건을 만족한 시간표의 가장 낮은 품질 점수와 그런 시간표의 수를 공유하여,
+    전체 작업자가 합쳐서 목표 수만큼 모았거나 더 낮출 수 없는 점수(0)가 나오면 새 시도를 멈추게 합니다.
+    조기 종료에만 사용하며, 진행 중인 시도를 최선 점수와 비교해 중간에 잘라내지는 않습니다.
+    """
+    
+    def __init__(self, target):
+        """
+        Args:
+            target: 모든 작업자가 합쳐서 모을 조건 만족 시간표 수 (settings['quality_trials'])
+        """
+        self.target = target
+        self.score = multiprocessing.Value('d', float('inf'))
+        self.complete = multiprocessing.Value('i', 0)
+    
+    def offer(self, score):
+        """조건을 만족한 시간표의 품질 점수 알리기 (더 낮으면 최선 점수 갱신)"""
+        with self.score.get_lock():
+            self.score.value = min(self.score.value, score)
+        with self.complete.get_lock():
+            self.complete.value += 1
+    
+    @property
+    def best(self):
+        """지금까지 모든 작업자 중 가장 낮은 품질 점수 (없으면 inf)"""
+        return self.score.value
+    
+    def done(self):
+        """작업자들이 멈춰도 되는지 여부"""
+        return self.complete.value >= self.target or self.score.value <= 0
+
+_incumbent = None  # 포트폴리오 작업자 프로세스의 SharedIncumbent (_init_portfolio_worker가 지정)
+
+def _init_portfolio_worker(incumbent):
+    """포트폴리오 작업자 프로세스 초기화 (공유 메모리는 프로세스 생성 시에만 전달 가능)"""
+    global _incumbent
+    _incumbent = incumbent
+
+def solve_strategy(job):
+    """
+    포트폴리오 전략 하나로 시간표 생성 (별도 프로세스에서 실행할 수 있도록 모듈 수준 함수로 둠)
+    
+    Args:
+        job: (전략 이름, 설정, 교사 정보, 과목, 선택 그룹, 고정 시간, 시드, 배치 기록 여부,
+              최대 시도 횟수, 최대 실행 시간)
+        
+    Returns:
+        tuple: (시간표, 교사 일정, 재현 정보 RunRecord, 검증 결과 ValidationReport)
+    """
+    (name, settings, teachers, subjects, selection_groups, fixed_slots,
+     seed, record_trace, max_trials, time_limit) = job
+    manager = TimetableManager.for_strategy(name, settings, teachers, subjects, selection_groups, fixed_slots,
+                                            seed=seed, record_trace=record_trace)
+    timetable, teacher_schedule = manager.create_timetable(max_trials, time_limit, incumbent=_incumbent)
+    report = manager.validation_manager.validate(timetable, teacher_schedule, teachers, manager.group_index)
+    manager.last_run.strategy = name
+    
+    # 프로세스 간 전달을 위해 defaultdict를 일반 dict로 변환
+    return dict(timetable), dict(teacher_schedule), manager.last_run, report
+
 class TimetableManager:
     """
     전체 시간표 생성 과정을 관리하는 클래스
     데이터 처리, 스케줄 배치, 검증 과정을 조율합니다.
     """
     
-    def __init__(self, settings, teachers, subjects, selection_groups, fixed_slots):
+    def __init__(self, settings, teachers, subjects, selection_groups, fixed_slots,
+                 placement_order="constrained", seed=None, record_trace=False):
         """
         초기화: 시간표 생성에 필요한 정보 저장 및 관리자 클래스 초기화
         
@@ -1118,137 +2985,532 @@ class TimetableManager:
             subjects: 과목 정보
             selection_groups: 선택 그룹 정보
             fixed_slots: 고정 시간 정보
+            placement_order: 배치 순서 전략 ("constrained" 또는 "hours", ScheduleManager 참고)
+            seed: 실행 시드 (None이면 create_timetable 호출마다 새로 뽑음)
+            record_trace: True이면 결과 시간표의 배치 기록을 last_run.trace에 저장
         """
         # 기본 데이터 저장
         self.settings = settings
         self.teachers = teachers
         self.subjects = subjects
         self.selection_groups = selection_groups
+        self.group_index = SelectionGroupIndex(selection_groups, teachers)  # 그룹 조회표 (한 번만 생성)
         self.fixed_slots = fixed_slots
+        self.seed = seed
+        self.record_trace = record_trace
+        self.last_run = None  # 마지막 create_timetable의 재현 정보 (RunRecord)
         
         # 각 관리자 클래스 초기화
         self.data_manager = DataManager()
-        self.schedule_manager = ScheduleManager(settings, fixed_slots)
-        self.validation_manager = ValidationManager(settings)
+        self.schedule_manager = ScheduleManager(
+            settings, fixed_slots, placement_order,
+            teacher_limits={t: info['max'] for t, info in teachers.items() if 'max' in info},
+            teacher_unavailable={t: info['unavailable'] for t, info in teachers.items() if info.get('unavailable')},
+            subject_rooms={s: info['room'] for s, info in subjects.items() if info.get('room')},
+            group_index=self.group_index)
+        self.validation_manager = ValidationManager(settings, self.schedule_manager.subject_rooms)
+        self.score_manager = ScoreManager(settings, self.schedule_manager.calendar)
+        
+        # 탐색 기억: 실패한 시도의 충돌 배치를 다음 시도에서 피함 (settings['nogood_memory']가 False이면 사용 안 함)
+        if settings.get('nogood_memory', True):
+            self.schedule_manager.nogoods = NogoodMemory(settings.get('nogood_decay', 0.98),
+                                                         settings.get('nogood_threshold', 2.0))
+        
+        # 학습 모드: 배치 실패가 적은 시도의 시간대를 다음 시도에서 더 자주 고름 (settings['pheromone']가 True일 때)
+        if settings.get('pheromone', False):
+            self.schedule_manager.pheromone = PheromoneMatrix(settings.get('pheromone_evaporation', 0.1),
+                                                              settings.get('pheromone_deposit', 1.0))
     
-    def create_timetable(self, max_trials=100):
+    def create_timetable(self, max_trials=100, time_limit=None, workers=1, incumbent=None):
         """
         시간표 생성 실행
         
         여러 번 시도하여 가장 좋은 결과를 찾는 알고리즘입니다.
+        모든 조건을 만족한 시간표는 지역 탐색으로 품질 점수(ScoreManager)를 개선한 뒤,
+        그런 시간표가 settings['quality_trials']개(기본값 5) 모이면 그중 점수가 가장 낮은 것을 반환합니다.
+        시도마다 실행 시드에서 유도한 시드를 사용하므로, 같은 시드로 실행하면 같은 결과가 나옵니다.
+        실패한 시도의 충돌 배치는 탐색 기억(NogoodMemory)에 쌓여 다음 시도의 후보 선택에 반영되므로,
+        특정 시도를 run_trial로 따로 다시 실행해 같은 결과를 얻으려면 탐색 기억을 끄거나
+        (settings['nogood_memory'] = False) 배치 기록(last_run.trace)을 replay로 재현합니다.
+        교사를 공유하지 않는 독립된 묶음이 여러 개이면 묶음별로 따로 생성하여 합칩니다.
         
         Args:
-            max_trials: 최대 시도 횟수 (기본값: 100)
+            max_trials: 최대 시도 횟수 (기본값: 100, 묶음별로 적용)
+            time_limit: 최대 실행 시간(초). 초과하면 새 시도를 시작하지 않고
+                최선의 결과를 반환합니다 (기본값: None, 제한 없음)
+            workers: 독립된 묶음을 동시에 생성할 프로세스 수 (기본값: 1)
+            incumbent: 포트폴리오 실행에서 다른 작업자와 공유하는 최선 결과 (SharedIncumbent,
+                조건을 만족한 시간표마다 점수를 알리고, 작업자 전체가 목표에 도달하면 새 시도를 시작하지 않음)
             
         Returns:
             tuple: (완성된 시간표, 교사 일정)
+            
+        Raises:
+            ValueError: max_trials가 1보다 작은 경우
         """
+        if max_trials < 1:
+            raise ValueError(f"최대 시도 횟수는 1 이상이어야 합니다 (max_trials={max_trials})")
+        
+        # 실행 시드 결정 (지정하지 않으면 전역 난수에서 뽑아 기록)
+        seed = self.seed if self.seed is not None else random.getrandbits(32)
+        
+        # 독립된 묶음이 여러 개이면 묶음별로 생성 (한 묶음의 실패가 다른 묶음을 다시 시작시키지 않음)
+        components = self.find_components()
+        if len(components) > 1:
+            return self._create_by_components(components, seed, max_trials, time_limit, workers)
+        
+        # 입력만으로 알 수 있는 불가능 조건을 먼저 알림
+        for issue in self.check_feasibility():
+            print(f"{'❌' if issue['level'] == 'error' else '⚠️'} 사전 점검: {issue['message']}")
+        
         trial = 0  # 현재 시도 횟수
         best_result = None  # 최선의 결과 저장 변수
         best_missing = float('inf')  # 최선의 결과의 부족 시수 개수
+        best_complete = None  # 모든 조건을 만족한 결과 중 점수가 가장 낮은 결과
+        best_score = float('inf')
+        complete_count = 0  # 모든 조건을 만족한 시도 수
+        quality_trials = self.settings.get('quality_trials', 5)
+        start_time = time.perf_counter()
+        run = RunRecord(seed)
+        if self.settings.get('profile', False):
+            run.phase_times = {}
+        self.last_run = run
+        nogoods = self.schedule_manager.nogoods
+        if nogoods is not None:
+            nogoods.clear()  # 같은 시드로 실행하면 같은 결과가 나오도록 실행마다 새로 학습
+        if self.schedule_manager.pheromone is not None:
+            self.schedule_manager.pheromone.clear()
         
         # 최대 시도 횟수까지 반복하며 최선의 결과 찾기
         while trial < max_trials:
+            # 실행 시간 제한 확인 (최소 한 번은 시도)
+            if time_limit is not None and trial > 0 and time.perf_counter() - start_time >= time_limit:
+                print(f"⏱️ 실행 시간 제한 도달 ({time_limit}초, 시도 {trial}/{max_trials})")
+                break
+            
+            # 포트폴리오 실행: 다른 전략과 합쳐 목표만큼 모였으면 중단 (최소 한 번은 시도)
+            if incumbent is not None and trial > 0 and incumbent.done():
+                print(f"🏁 다른 전략과 함께 목표에 도달하여 중단 (최선 점수 {incumbent.best}, 시도 {trial}/{max_trials})")
+                break
+            
             trial += 1  # 시도 횟수 증가
             
-            # 1. 시간표 초기화
-            timetable, teacher_schedule = self.schedule_manager.initialize_timetable()
+            # 1~5. 시도별 시드로 한 번의 배치 실행
+            trial_seed = derive_trial_seed(seed, trial)
+            trial_start = time.perf_counter()
+            timetable, teacher_schedule = self.run_trial(trial_seed)
+            run.trial_seeds.append(trial_seed)
+            
+            # 6. 시간표 검증 (시수, 연속 수업 제한, 하루 과목 제한을 한 번에 계산)
+            with self._measure("validation"):
+                report = self.validation_manager.validate(
+                    timetable, teacher_schedule, self.teachers, self.group_index,
+                    teacher_load=self.schedule_manager.teacher_load)
+            missing_hours = report.missing_hours
+            run.trial_missing.append(len(missing_hours))
+            consecutive_ok = report.consecutive_ok
+            daily_limit_ok = report.daily_limit_ok
+            
+            # 7. 모든 조건을 만족하면 품질 점수 개선 후 점수가 가장 낮은 결과 보관
+            if report.is_valid:
+                with self._measure("improve"):
+                    score = self.improve(timetable, teacher_schedule)
+                if incumbent is not None:
+                    incumbent.offer(score)
+                run.trial_scores.append(score)
+                run.trial_times.append(time.perf_counter() - trial_start)
+                complete_count += 1
+                if score < best_score:
+                    best_score = score
+                    best_complete = self.schedule_manager.snapshot(timetable, teacher_schedule)
+                    run.result_trial = trial
+                    run.trace = self.schedule_manager.trace
+                    print(f"✓ 조건 만족, 품질 점수 {score} (시도 {trial}/{max_trials})")
+                
+                # 8. 조건을 만족한 시간표가 충분히 모이면 종료
+                if complete_count >= quality_trials:
+                    break
+                continue
             
-            # 2. 수업 블록 생성 및 그룹화
-            blocks = self.data_manager.generate_lesson_blocks(self.teachers)
-            grouped_blocks = self.data_manager.group_lesson_blocks(blocks)
+            run.trial_scores.append(None)
+            run.trial_times.append(time.perf_counter() - trial_start)
             
-            # 3. 블록 분류: 특별 선택 그룹, 일반 선택 그룹, 일반 선택 과목, 필수 과목
-            # 3-1. 특별 선택 그룹(선택A, B, C 등) 추출
-            selection_group_blocks = self.data_manager.get_selection_group_blocks(
-                grouped_blocks, self.selection_groups, grade=2)
+            # 9. 최선의 결과 갱신 (부족 시수가 더 적은 결과 선택)
+            if best_complete is None and len(missing_hours) < best_missing:
+                best_missing = len(missing_hours)
+                best_result = self.schedule_manager.snapshot(timetable, teacher_schedule)
+                run.result_trial = trial
+                run.trace = self.schedule_manager.trace
+                print(f"✓ 현재까지 최선의 결과: 부족 시수 {best_missing}개 (시도 {trial}/{max_trials})")
             
-            # 3-2. 일반 선택 그룹('선택' 그룹) 추출
-            choice_group_blocks = self.data_manager.get_choice_groups(grouped_blocks)
+            # 10. 실패 원인 출력
+            self._print_failure_reasons(missing_hours, daily_limit_ok, consecutive_ok, trial, max_trials)
+        
+        # 11. 조건을 만족한 결과가 있으면 점수가 가장 낮은 결과 반환
+        if best_complete:
+            timetable, teacher_schedule = self.schedule_manager.restore(best_complete)
+            self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
+            print(f"✅ 조건 만족, 배치 성공 (품질 점수 {best_score}, 조건 만족 {complete_count}회, "
+                  f"시도 횟수: {trial}/{max_trials})")
+            return timetable, teacher_schedule
+        
+        # 12. 최대 시도 횟수 도달 시 최선의 결과 반환
+        if best_result:
+            timetable, teacher_schedule = self.schedule_manager.restore(best_result)
+            self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
             
-            # 3-3. 일반 과목을 선택 과목과 필수 과목으로 분리
-            # 특별 선택 또는 일반 선택 그룹에 속하지 않은 과목들
-            individual_blocks = [b for b in grouped_blocks 
-                            if b['group'] != '선택'
-                            and not any(b['subject'] in subjects
-                                        for subjects in self.selection_groups.get(b['grade'], {}).values())]
+            if best_missing > 0:
+                print(f"❌ 조건을 만족하는 배치에 실패했습니다. 가장 좋은 결과 반환 (부족 시수: {best_missing}개)")
+            else:
+                print("✅ 모든 과목이 필요한 시수만큼 정확히 배치되었습니다.")
             
-            # 일반 선택 과목 (required=False)
-            optional_blocks = [b for b in individual_blocks if not b['required']]
+            return timetable, teacher_schedule
+        else:
+            # 모든 시도가 실패한 경우 마지막 시도 결과 반환 (다음 실행에서 재사용되는 시간표 대신 복사본)
+            timetable, teacher_schedule = self.schedule_manager.restore(
+                self.schedule_manager.snapshot(timetable, teacher_schedule))
+            self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
+            return timetable, teacher_schedule
+    
+    def improve(self, timetable, teacher_schedule):
+        """
+        모든 조건을 만족한 시간표의 품질 점수를 지역 탐색으로 개선
+        
+        개별 수업만 옮기며(선택 그룹은 고정), 이동 횟수는 settings['local_search_moves'](기본값 10000)입니다.
+        
+        Returns:
+            개선 후 품질 점수
+        """
+        _, _, individual_blocks = self.data_manager.classify_blocks(
+            self.data_manager.group_lesson_blocks(self.data_manager.generate_lesson_blocks(self.teachers)),
+            self.group_index)
+        movable_lessons = {(b['grade'], cls, b['subject']): b['teacher']
+                           for b in individual_blocks for cls in b['classes']}
+        score = self.score_manager.score(timetable, teacher_schedule)
+        score += self.schedule_manager.improve_timetable(
+            timetable, teacher_schedule, movable_lessons, self.score_manager,
+            self.settings.get('local_search_moves', 10000))
+        return score
+    
+    def room_schedule(self, teacher_schedule):
+        """
+        특별실 배정 결과 (ScheduleManager.build_room_schedule 참고, 특별실 설정이 없으면 빈 딕셔너리)
+        
+        Returns:
+            dict: {방 이름: {요일: [교시별 수업]}}
+        """
+        return self.schedule_manager.build_room_schedule(teacher_schedule)
+    
+    def check_feasibility(self):
+        """
+        생성 전 사전 점검 (FeasibilityAnalyzer 참고)
+        
+        Returns:
+            list: 문제 목록 [{"level", "kind", "target", "required", "available", "message"}]
+        """
+        return FeasibilityAnalyzer(self.settings, self.teachers, self.group_index,
+                                   self.schedule_manager.calendar,
+                                   {s: info['room'] for s, info in self.subjects.items() if info.get('room')}).analyze()
+    
+    def find_components(self):
+        """
+        교사를 공유하지 않는 독립된 묶음(교사-학급 그래프의 연결 요소) 찾기
+        
+        Returns:
+            연결 요소 리스트 [{"teachers": [교사명], "classes": [(학년, 반)]}]
+        """
+        blocks = self.data_manager.generate_lesson_blocks(self.teachers)
+        grouped_blocks = self.data_manager.group_lesson_blocks(blocks)
+        return self.data_manager.find_components(grouped_blocks, self.group_index,
+                                                 self.schedule_manager.subject_rooms)
+    
+    def _create_by_components(self, components, seed, max_trials, time_limit, workers):
+        """
+        독립된 묶음마다 따로 시간표를 생성한 뒤 하나로 합치기
+        
+        묶음마다 실행 시드에서 유도한 시드와 자체 재시도 횟수를 사용하며,
+        workers가 2 이상이면 묶음들을 별도 프로세스에서 동시에 생성합니다.
+        
+        Args:
+            components: find_components의 결과
+            seed: 실행 시드
+            max_trials: 묶음별 최대 시도 횟수
+            time_limit: 묶음별 최대 실행 시간(초)
+            workers: 동시에 실행할 프로세스 수
             
-            # 필수 과목 (required=True)
-            required_blocks = [b for b in individual_blocks if b['required']]
+        Returns:
+            tuple: (합쳐진 시간표, 교사 일정)
+        """
+        print(f"🧩 교사를 공유하지 않는 {len(components)}개 묶음으로 나누어 생성합니다.")
+        jobs = [(self.settings, {t: self.teachers[t] for t in component['teachers']},
+                 self.subjects, self.selection_groups, self.fixed_slots,
+                 self.schedule_manager.placement_order, derive_trial_seed(seed, f"component-{i}"),
+                 self.record_trace, max_trials, time_limit)
+                for i, component in enumerate(components)]
+        
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                results = list(executor.map(solve_component, jobs))
+        else:
+            results = [solve_component(job) for job in jobs]
+        
+        # 묶음별 결과 합치기 (묶음끼리 학급과 교사가 겹치지 않음)
+        timetable, teacher_schedule = self.schedule_manager.new_timetable()
+        run = RunRecord(seed)
+        run.components = []
+        for i, (component_timetable, component_schedule, component_run) in enumerate(results):
+            timetable.update(component_timetable)
+            teacher_schedule.update(component_schedule)
+            run.components.append(component_run)
+            print(f"  묶음 {i + 1}: 교사 {len(components[i]['teachers'])}명, "
+                  f"학급 {len(components[i]['classes'])}개, 시도 {len(component_run.trial_seeds)}회")
+        if self.record_trace:
+            run.trace = [entry for component_run in run.components for entry in component_run.trace or []]
+        if self.settings.get('profile', False):
+            # 묶음별 측정값을 단계별로 모음 (시도별 부족 시수는 묶음마다 components에 남음)
+            run.phase_times = {}
+            for component_run in run.components:
+                for phase, times in component_run.phase_times.items():
+                    run.phase_times.setdefault(phase, []).extend(times)
+        self.last_run = run
+        
+        return timetable, teacher_schedule
+    
+    def create_with_history(self, history_path=TrialHistory.DEFAULT_PATH, time_limit=None):
+        """
+        실행 기록으로 시도 횟수를 정해 시간표를 생성하고 이번 실행을 기록에 추가
+        
+        기록 파일을 읽거나 저장하지 못하면 기본 시도 횟수로 생성하고 기록은 남기지 않습니다.
+        
+        Args:
+            history_path: 실행 기록 파일 경로 (TrialHistory)
+            time_limit: 최대 실행 시간(초)
             
-            # 4. 시간표 배치 (우선순위 순서대로: 선택 -> 필수)
-            # 4-1. 특별 선택 그룹(선택A, B, C 등) 먼저 배치
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        key = TrialHistory.fingerprint(self.settings, self.teachers, self.subjects,
+                                       self.selection_groups, self.fixed_slots)
+        try:
+            history = TrialHistory(history_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 실행 기록 파일을 읽지 못해 기본 시도 횟수를 사용합니다: {e}")
+            return self.create_timetable(time_limit=time_limit)
+        
+        max_trials = history.suggest_trials(key, self.settings.get('quality_trials', 5))
+        print(f"📈 실행 기록으로 정한 최대 시도 횟수: {max_trials}")
+        result = self.create_timetable(max_trials, time_limit)
+        
+        history.record(key, self.last_run)
+        try:
+            history.save()
+        except OSError as e:
+            print(f"⚠️ 실행 기록 파일 저장 중 오류가 발생했습니다: {e}")
+        return result
+    
+    @staticmethod
+    def _check_strategy(name):
+        """포트폴리오 전략 이름 확인 (없는 이름이면 ValueError)"""
+        if name not in PORTFOLIO_STRATEGIES:
+            raise ValueError(f"알 수 없는 전략: {name} (가능한 값: {', '.join(PORTFOLIO_STRATEGIES)})")
+    
+    @classmethod
+    def for_strategy(cls, name, settings, teachers, subjects, selection_groups, fixed_slots,
+                     seed=None, record_trace=False):
+        """
+        포트폴리오 전략 하나의 배치 순서와 설정으로 TimetableManager 만들기
+        
+        포트폴리오 결과를 다시 실행하려면 last_run.strategy와 last_run.strategy_seed를 넘깁니다.
+        
+        Args:
+            name: 전략 이름 (PORTFOLIO_STRATEGIES의 키)
+            settings, teachers, subjects, selection_groups, fixed_slots: 입력 데이터
+            seed: 전략의 실행 시드
+            record_trace: 배치 기록 여부
+            
+        Returns:
+            TimetableManager
+        """
+        cls._check_strategy(name)
+        placement_order, overrides = PORTFOLIO_STRATEGIES[name]
+        return cls(dict(settings, **overrides), teachers, subjects, selection_groups, fixed_slots,
+                   placement_order, seed=seed, record_trace=record_trace)
+    
+    def create_portfolio(self, strategies=None, max_trials=100, time_limit=None):
+        """
+        여러 배치 전략을 별도 프로세스에서 동시에 실행하고 가장 좋은 결과 선택 (포트폴리오 실행)
+        
+        전략마다 맞는 입력이 다르므로 함께 실행하면 어느 입력에서도 가장 나쁜 경우를 피할 수 있습니다.
+        작업자들은 SharedIncumbent로 조건을 만족한 시간표 수를 세어, 합쳐서 settings['quality_trials']개를
+        모으면(또는 점수 0인 시간표가 나오면) 모두 새 시도를 멈춥니다 (조기 종료만 하며 시도 중간에 잘라내지는 않음).
+        어느 작업자가 먼저 끝나는지에 따라 결과가 달라지므로 실행마다 같은 결과가 나오지는 않습니다.
+        last_run.seed는 지정한 실행 시드 그대로이고, 결과를 만든 전략과 그 전략의 시드는
+        last_run.strategy, last_run.strategy_seed에 따로 남으므로 for_strategy로 그 전략만 다시 실행할 수 있습니다.
+        
+        Args:
+            strategies: 실행할 전략 이름 목록 (PORTFOLIO_STRATEGIES의 키, 기본값: 전체)
+            max_trials: 전략별 최대 시도 횟수
+            time_limit: 전략별 최대 실행 시간(초)
+            
+        Returns:
+            tuple: (시간표, 교사 일정, 검증 결과 ValidationReport)
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        strategies = list(strategies or PORTFOLIO_STRATEGIES)
+        for name in strategies:
+            self._check_strategy(name)
+        
+        seed = self.seed if self.seed is not None else random.getrandbits(32)
+        incumbent = SharedIncumbent(self.settings.get('quality_trials', 5))
+        jobs = [(name, self.settings, self.teachers, self.subjects, self.selection_groups, self.fixed_slots,
+                 derive_trial_seed(seed, f"portfolio-{name}"), self.record_trace, max_trials, time_limit)
+                for name in strategies]
+        
+        print(f"🏇 {len(strategies)}개 전략을 동시에 실행합니다: {', '.join(strategies)}")
+        with ProcessPoolExecutor(max_workers=len(jobs), initializer=_init_portfolio_worker,
+                                 initargs=(incumbent,)) as executor:
+            results = list(executor.map(solve_strategy, jobs))
+        
+        # 조건을 만족한 결과 중 품질 점수가 가장 낮은 것, 없으면 부족 시수가 가장 적은 것
+        def rank(result):
+            run, report = result[2], result[3]
+            score = run.result_score if run.result_score is not None else float('inf')
+            return (not report.is_valid, len(report.missing_hours), score)
+        
+        for _, _, run, report in results:
+            status = "완성" if report.is_valid else f"조건 미충족 ({', '.join(report.failures())})"
+            print(f"  {run.strategy}: {status}, 품질 점수 {run.result_score}, 시도 {len(run.trial_seeds)}회")
+        timetable, teacher_schedule, strategy_run, report = min(results, key=rank)
+        print(f"🏆 '{strategy_run.strategy}' 전략의 결과를 사용합니다.")
+        
+        # 지정한 실행 시드는 그대로 두고, 결과를 만든 전략과 그 전략의 시도 기록을 옮겨 담음
+        run = RunRecord(seed)
+        run.strategy, run.strategy_seed = strategy_run.strategy, strategy_run.seed
+        for field in ("trial_seeds", "trial_times", "trial_scores", "result_trial", "trace",
+                      "components", "trial_missing", "phase_times"):
+            setattr(run, field, getattr(strategy_run, field))
+        self.last_run = run
+        
+        return timetable, teacher_schedule, report
+    
+    def run_trial(self, trial_seed):
+        """
+        시도 한 번의 배치 실행 (검증 전 단계까지)
+        
+        같은 시드로 호출하면 항상 같은 시간표가 만들어지므로, 느리거나 결과가 나쁜 시도를
+        last_run.trial_seeds의 시드로 따로 재현해 볼 수 있습니다.
+        반환된 시간표는 ScheduleManager가 재사용하므로 다음 시도에서 바뀝니다 (남기려면 snapshot 사용).
+        
+        Args:
+            trial_seed: 시도별 시드 (derive_trial_seed로 계산)
+            
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        self.schedule_manager.rng.seed(trial_seed)
+        self.schedule_manager.trace = [] if self.record_trace else None
+        
+        # 1. 시간표 초기화
+        timetable, teacher_schedule = self.schedule_manager.initialize_timetable()
+        
+        # 2. 수업 블록 생성 및 그룹화
+        blocks = self.data_manager.generate_lesson_blocks(self.teachers)
+        grouped_blocks = self.data_manager.group_lesson_blocks(blocks)
+        
+        # 3. 블록 분류: 특별 선택 그룹(선택A, B, C 등), 일반 선택 그룹('선택' 그룹), 개별 과목
+        selection_group_blocks, choice_group_blocks, individual_blocks = self.data_manager.classify_blocks(
+            grouped_blocks, self.group_index)
+        
+        # 일반 선택 과목 (required=False)
+        optional_blocks = [b for b in individual_blocks if not b['required']]
+        
+        # 필수 과목 (required=True)
+        required_blocks = [b for b in individual_blocks if b['required']]
+        
+        # 4. 시간표 배치 (우선순위 순서대로: 선택 -> 필수)
+        # 4-1. 특별 선택 그룹(선택A, B, C 등) 먼저 배치
+        with self._measure("selection_groups"):
             selection_failed = self.schedule_manager.assign_selection_group_blocks(
                 selection_group_blocks, timetable, teacher_schedule)
-            
-            # 4-2. 일반 선택 그룹('선택' 그룹) 배치
+        
+        # 4-2. 일반 선택 그룹('선택' 그룹) 배치
+        with self._measure("choice_groups"):
             choice_failed = self.schedule_manager.assign_choice_group_blocks(
                 choice_group_blocks, timetable, teacher_schedule)
-            
-            # 4-3. 일반 선택 과목 배치 (필수가 아닌 과목)
+        
+        # 4-3. 일반 선택 과목 배치 (필수가 아닌 과목)
+        with self._measure("optional_blocks"):
             optional_failed = self.schedule_manager.assign_individual_blocks(
                 optional_blocks, timetable, teacher_schedule)
-            
-            # 4-4. 필수 과목 배치 (모든 선택 과목 배치 후)
+        
+        # 4-4. 필수 과목 배치 (모든 선택 과목 배치 후)
+        with self._measure("required_blocks"):
             required_failed = self.schedule_manager.assign_individual_blocks(
                 required_blocks, timetable, teacher_schedule)
-            
-            # 5. 실패한 블록 재시도 (빈 교시에 배치)
-            all_failed = selection_failed + choice_failed + optional_failed + required_failed
-            
+        
+        # 5. 실패한 블록 재시도 (빈 교시에 배치)
+        all_failed = selection_failed + choice_failed + optional_failed + required_failed
+        
+        with self._measure("learning"):
+            # 탐색 기억 갱신: 배치하지 못한 수업을 막은 배치를 다음 시도에서 피함 (재시도로 바뀌기 전에 기록)
+            if self.schedule_manager.nogoods is not None:
+                lessons, failed = {}, {}  # 중복 없이 순서 유지 (같은 수업의 여러 시간이 실패할 수 있음)
+                for block in all_failed:
+                    for cls in [block['class']] if 'class' in block else block['classes']:
+                        lessons[(block['teacher'], block['grade'], cls)] = None
+                        failed[(block['subject'], block['grade'], cls)] = None
+                self.schedule_manager.nogoods.record(
+                    self.schedule_manager.find_conflicts(list(lessons), timetable, teacher_schedule), list(failed))
+            
+            # 학습 모드: 이번 시도의 배치로 시간대 선호도 갱신 (증발 후 좋은 시도의 배치 강화)
+            if self.schedule_manager.pheromone is not None:
+                self.schedule_manager.pheromone.update(self.schedule_manager.placements, len(all_failed))
+        
+        with self._measure("fill_empty_slots"):
             if all_failed:
+                # 개별 수업은 연쇄 이동으로 옮길 수 있음
+                movable_lessons = {(b['grade'], cls, b['subject']): b['teacher']
+                                   for b in individual_blocks for cls in b['classes']}
                 still_failed = self.schedule_manager.fill_empty_slots(
-                    timetable, teacher_schedule, all_failed)
+                    timetable, teacher_schedule, all_failed, movable_lessons)
                 
                 if still_failed:
                     print(f"⚠️ 여전히 배치 실패한 블록: {len(still_failed)}개")
-            
-            # 6. 시간표 검증
-            # 6-1. 과목 시수 확인
-            missing_hours = self.validation_manager.check_subject_hours_completed(
-                timetable, self.teachers, self.selection_groups)
-            
-            # 6-2. 연속 수업 제한 확인
-            consecutive_ok = self.validation_manager.check_consecutive_teaching_limit(
-                teacher_schedule, max_consecutive=self.settings['max_consecutive_teaching_hours'])
-            
-            # 6-3. 하루 과목 제한 확인
-            daily_limit_ok = self.validation_manager.check_daily_subject_limit(timetable)
-            
-            # 7. 최선의 결과 갱신 (부족 시수가 더 적은 결과 선택)
-            if len(missing_hours) < best_missing:
-                best_missing = len(missing_hours)
-                best_result = (timetable.copy(), teacher_schedule.copy())
-                print(f"✓ 현재까지 최선의 결과: 부족 시수 {best_missing}개 (시도 {trial}/{max_trials})")
-            
-            # 8. 모든 조건 만족 시 종료 (완벽한 시간표 생성)
-            if not missing_hours and consecutive_ok and daily_limit_ok:
-                # 최종 결과에 고정 시간 적용
-                self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
-                print(f"✅ 조건 만족, 배치 성공 (시도 횟수: {trial}/{max_trials})")
-                return timetable, teacher_schedule
-            
-            # 9. 실패 원인 출력
-            self._print_failure_reasons(missing_hours, daily_limit_ok, consecutive_ok, trial, max_trials)
         
-        # 10. 최대 시도 횟수 도달 시 최선의 결과 반환
-        if best_result:
-            timetable, teacher_schedule = best_result
-            self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
-            
-            if best_missing > 0:
-                print(f"❌ 조건을 만족하는 배치에 실패했습니다. 가장 좋은 결과 반환 (부족 시수: {best_missing}개)")
-            else:
-                print("✅ 모든 과목이 필요한 시수만큼 정확히 배치되었습니다.")
+        return timetable, teacher_schedule
+    
+    @contextlib.contextmanager
+    def _measure(self, phase):
+        """
+        단계 실행 시간 측정 (settings['profile']이 켜져 있을 때만 last_run.phase_times에 기록)
+        
+        Args:
+            phase: 단계 이름 (예: "selection_groups", "validation")
+        """
+        run = self.last_run
+        if run is None or run.phase_times is None:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        run.phase_times.setdefault(phase, []).append(time.perf_counter() - start)
+    
+    def replay(self, trace):
+        """
+        배치 기록으로 시간표 재현 (탐색 없이 기록된 배치만 순서대로 적용)
+        
+        Args:
+            trace: last_run.trace (또는 RunRecord.to_dict()로 저장했던 'trace')
             
-            return timetable, teacher_schedule
-        else:
-            # 모든 시도가 실패한 경우 마지막 시도 결과 반환
-            self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
-            return timetable, teacher_schedule
+        Returns:
+            tuple: (시간표, 교사 일정)
+        """
+        timetable, teacher_schedule = self.schedule_manager.replay_trace(
+            [tuple(entry) for entry in trace])
+        self.schedule_manager.fill_fixed_slots_in_timetable(timetable)
+        return timetable, teacher_schedule
     
     def _print_failure_reasons(self, missing_hours, daily_limit_ok, consecutive_ok, trial, max_trials):
         """
@@ -0,0 +1,371 @@
+"""
+명령줄 시간표 생성 프로그램
+
+Streamlit 없이 시간표를 생성하고 결과(학급/교사 시간표, 검증 결과)를 JSON 또는 엑셀 파일로 저장합니다.
+야간 일괄 재생성이나 벤치마크처럼 웹 화면이 필요 없는 환경에서 사용합니다.
+
+사용 예:
+    python cli.py --output 시간표.xlsx
+    python cli.py --input 설정.xlsx --seed 7 --trials 200 --workers 4 --time-budget 120 --output 결과.json
+    python cli.py --seed 7 --trace --output 결과.json       # 배치 기록 저장
+    python cli.py --replay 결과.json --output 재현.xlsx     # 배치 기록으로 탐색 없이 재현
+    python cli.py --input 설정.xlsx --check                 # 생성 전 입력 데이터 사전 점검
+    python cli.py --portfolio random,learning --output 결과.json  # 여러 전략을 동시에 실행
+    python cli.py --history 기록.json --output 결과.json   # 이전 실행 기록으로 시도 횟수 결정
+    python cli.py --profile --output 결과.json            # 단계별 실행 시간 측정
+
+종료 코드:
+    0: 모든 조건을 만족하는 시간표 생성
+    1: 시간표는 생성했지만 부족 시수 또는 제약 조건 위반이 남음 (--check: 사전 점검 오류)
+    2: 입력 데이터 또는 출력 파일 오류
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_INCOMPLETE = 1
+EXIT_INPUT_ERROR = 2
+
+DEFAULT_TRIALS = 100  # --trials와 실행 기록이 없을 때의 작업자별 최대 시도 횟수
+
+
+def positive_int(value):
+    """1 이상의 정수 인자 (argparse type)"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1 이상의 정수가 필요합니다: {value}")
+    return number
+
+
+def positive_float(value):
+    """0보다 큰 실수 인자 (argparse type)"""
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"0보다 큰 값이 필요합니다: {value}")
+    return number
+
+
+def parse_args(argv=None):
+    """명령줄 인자 해석"""
+    parser = argparse.ArgumentParser(description="고등학교 시간표 자동 생성 (명령줄 실행)")
+    parser.add_argument("-i", "--input", help="시간표 설정 엑셀 파일 (생략하면 data.py의 기본 데이터 사용)")
+    parser.add_argument("-o", "--output", default="timetable.json", help="결과 파일 경로 (기본값: timetable.json)")
+    parser.add_argument("-f", "--format", choices=["json", "xlsx"],
+                        help="결과 파일 형식 (생략하면 출력 파일 확장자로 판단)")
+    parser.add_argument("--seed", type=int, default=None, help="실행 시드 (작업자마다 seed+번호 사용)")
+    parser.add_argument("--trials", type=positive_int, default=None,
+                        help="작업자별 최대 시도 횟수 (기본값: 100, --history가 있으면 기록에서 계산)")
+    parser.add_argument("--workers", type=positive_int, default=1, help="동시에 실행할 작업자 프로세스 수 (기본값: 1)")
+    parser.add_argument("--time-budget", type=positive_float, default=None, help="작업자별 최대 실행 시간(초)")
+    parser.add_argument("--no-fill-empty", action="store_true", help="빈 교시를 '자습'으로 채우지 않음")
+    parser.add_argument("-q", "--quiet", action="store_true", help="시도별 진행 메시지 출력 안 함")
+    parser.add_argument("--trace", action="store_true", help="결과 시간표의 배치 기록을 JSON 결과에 저장")
+    parser.add_argument("--replay", metavar="JSON", help="JSON 결과의 배치 기록으로 탐색 없이 시간표 재현")
+    parser.add_argument("--portfolio", nargs="?", const="all", metavar="STRATEGIES",
+                        help="여러 배치 전략을 동시에 실행하고 가장 좋은 결과 사용 "
+                             "(쉼표로 구분한 전략 이름, 생략하면 전체: random, constrained, learning, repair)")
+    parser.add_argument("--history", metavar="JSON",
+                        help="실행 기록 파일 (같은 데이터의 이전 실행으로 시도 횟수를 정하고 이번 실행을 추가)")
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별 실행 시간을 측정하여 요약을 출력하고 JSON 결과에 저장")
+    parser.add_argument("--check", action="store_true",
+                        help="시간표를 만들지 않고 입력 데이터 사전 점검만 실행 (오류가 있으면 종료 코드 1)")
+    return parser.parse_args(argv)
+
+
+def load_data(path):
+    """엑셀 파일 또는 data.py에서 (settings, subjects, teachers, selection_groups, fixed_slots) 읽기"""
+    if path:
+        from loader import load_excel_data
+        return load_excel_data(path)
+    
+    from data import settings, subjects, teachers, selection_groups, fixed_slots
+    return settings, subjects, teachers, selection_groups, fixed_slots
+
+
+def run_worker(job):
+    """
+    작업자 하나의 시간표 생성 실행 (별도 프로세스에서 실행 가능)
+    
+    Args:
+        job: (데이터, 실행 시드, 최대 시도 횟수, 최대 실행 시간, 메시지 숨김 여부, 배치 기록 여부)
+    
+    Returns:
+        tuple: (재현 정보 RunRecord, 시간표, 교사 일정, 검증 결과)
+    """
+    from algorithm import TimetableManager
+    
+    data, seed, trials, time_limit, quiet, record_trace = job
+    settings, subjects, teachers, selection_groups, fixed_slots = data
+    
+    manager = TimetableManager(settings, teachers, subjects, selection_groups, fixed_slots,
+                               seed=seed, record_trace=record_trace)
+    with contextlib.redirect_stdout(open(os.devnull, "w") if quiet else sys.stdout):
+        timetable, teacher_schedule = manager.create_timetable(max_trials=trials, time_limit=time_limit)
+    report = manager.validation_manager.validate(timetable, teacher_schedule, teachers, selection_groups)
+    
+    # 프로세스 간 전달을 위해 defaultdict를 일반 dict로 변환
+    return manager.last_run, dict(timetable), dict(teacher_schedule), report
+
+
+def replay(data, path):
+    """
+    JSON 결과 파일의 배치 기록으로 시간표 재현 (탐색 없음)
+    
+    --portfolio로 만든 결과는 결과를 만든 전략의 배치 순서와 설정으로 재현하며,
+    배치 기록이 없으면 그 전략의 시드로 같은 수의 시도를 다시 실행합니다 (같은 결과가 나옴).
+    
+    Returns:
+        tuple: (재현 정보 RunRecord, 시간표, 교사 일정, 검증 결과)
+    """
+    from algorithm import TimetableManager, RunRecord
+    
+    settings, subjects, teachers, selection_groups, fixed_slots = data
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)["run"]
+    strategy = saved.get("strategy")
+    if not saved.get("trace") and strategy is None:
+        raise ValueError(f"{path}에 배치 기록이 없습니다 (--trace 또는 --portfolio로 생성한 결과가 필요합니다)")
+    
+    if strategy is not None:
+        manager = TimetableManager.for_strategy(strategy, settings, teachers, subjects, selection_groups,
+                                                fixed_slots, seed=saved["strategy_seed"])
+    else:
+        manager = TimetableManager(settings, teachers, subjects, selection_groups, fixed_slots)
+    if saved.get("trace"):
+        timetable, teacher_schedule = manager.replay(saved["trace"])
+    else:
+        # 전략이 실제로 실행한 시도 수만큼 다시 실행 (묶음별 생성이면 가장 많이 시도한 묶음 기준)
+        trials = max([len(saved["trial_seeds"])] +
+                     [len(component["trial_seeds"]) for component in saved.get("components") or []])
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            timetable, teacher_schedule = manager.create_timetable(max_trials=trials)
+    report = manager.validation_manager.validate(timetable, teacher_schedule, teachers, selection_groups)
+    
+    run = RunRecord(saved["seed"])
+    run.trial_seeds = saved["trial_seeds"]
+    run.result_trial = saved["result_trial"]
+    run.trial_scores = saved.get("trial_scores", [])
+    run.trial_missing = saved.get("trial_missing", [])
+    run.strategy = strategy
+    run.strategy_seed = saved.get("strategy_seed")
+    run.trace = [tuple(entry) for entry in saved["trace"]] if saved.get("trace") else None
+    return run, dict(timetable), dict(teacher_schedule), report
+
+
+def check(data):
+    """입력 데이터 사전 점검 결과 출력 (오류가 없으면 EXIT_OK)"""
+    from algorithm import TimetableManager
+    
+    settings, subjects, teachers, selection_groups, fixed_slots = data
+    issues = TimetableManager(settings, teachers, subjects, selection_groups, fixed_slots).check_feasibility()
+    for issue in issues:
+        print(f"{'❌' if issue['level'] == 'error' else '⚠️'} {issue['message']}")
+    if not issues:
+        print("✅ 사전 점검에서 발견된 문제가 없습니다.")
+    return EXIT_INCOMPLETE if any(issue['level'] == 'error' for issue in issues) else EXIT_OK
+
+
+def solve(data, seed, trials, workers, time_limit, quiet, record_trace=False):
+    """
+    작업자들을 실행하고 가장 좋은 결과 선택
+    
+    모든 조건을 만족하는 결과가 나오면 나머지 작업자를 중단하고 바로 반환하며,
+    그렇지 않으면 부족 시수가 가장 적은 결과를 반환합니다.
+    """
+    jobs = [(data, seed + i, trials, time_limit, quiet, record_trace) for i in range(workers)]
+    
+    if workers == 1:
+        return run_worker(jobs[0])
+    
+    best = None
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(run_worker, jobs):
+            report = result[3]
+            if best is None or len(report.missing_hours) < len(best[3].missing_hours):
+                best = result
+            if report.is_valid:
+                pool.terminate()  # 완성된 시간표가 나오면 나머지 작업자 중단
+                break
+    return best
+
+
+def solve_portfolio(data, seed, strategies, trials, time_limit, quiet, record_trace=False):
+    """
+    배치 전략들을 동시에 실행하고 가장 좋은 결과 선택 (TimetableManager.create_portfolio)
+    
+    Returns:
+        tuple: (재현 정보 RunRecord, 시간표, 교사 일정, 검증 결과)
+    """
+    from algorithm import TimetableManager
+    
+    settings, subjects, teachers, selection_groups, fixed_slots = data
+    manager = TimetableManager(settings, teachers, subjects, selection_groups, fixed_slots,
+                               seed=seed, record_trace=record_trace)
+    with contextlib.redirect_stdout(open(os.devnull, "w") if quiet else sys.stdout):
+        timetable, teacher_schedule, report = manager.create_portfolio(
+            None if strategies == "all" else strategies.split(","), max_trials=trials, time_limit=time_limit)
+    return manager.last_run, timetable, teacher_schedule, report
+
+
+def print_profile(run):
+    """단계별 실행 시간 요약 출력 (RunRecord.phase_summary)"""
+    summary = run.phase_summary()
+    if not summary:
+        print("⏱️ 단계별 실행 시간 정보가 없습니다.", file=sys.stderr)
+        return
+    print("⏱️ 단계별 실행 시간", file=sys.stderr)
+    print(f"   {'phase':<18}{'count':>6}{'total(s)':>10}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}", file=sys.stderr)
+    for phase, stats in summary.items():
+        print(f"   {phase:<18}{stats['count']:>6}{stats['total']:>10.3f}{stats['p50'] * 1000:>10.2f}"
+              f"{stats['p90'] * 1000:>10.2f}{stats['p99'] * 1000:>10.2f}", file=sys.stderr)
+
+
+def report_to_dict(report):
+    """검증 결과를 JSON으로 저장할 수 있는 딕셔너리로 변환"""
+    return {
+        "complete": report.is_valid,
+        "daily_limit_ok": report.daily_limit_ok,
+        "consecutive_ok": report.consecutive_ok,
+        "teacher_max_ok": report.teacher_max_ok,
+        "room_ok": report.room_ok,
+        "missing_hours": [
+            {"subject": subject, "grade": grade, "class": cls,
+             "required": required, "assigned": assigned}
+            for (subject, grade, cls), (required, assigned) in report.missing_hours.items()
+        ],
+        "teacher_hours": report.teacher_hours,
+        "max_consecutive": report.max_consecutive,
+        "overloaded": {teacher: {"hours": hours, "max": limit}
+                       for teacher, (hours, limit) in report.overloaded.items()},
+        "room_overflow": [{"room": room, "day": day, "period": period + 1, "used": used, "capacity": capacity}
+                          for (room, day, period), (used, capacity) in report.room_overflow.items()],
+    }
+
+
+def write_json(path, settings, run, timetable, teacher_schedule, report, room_schedule=None):
+    """결과를 JSON 파일로 저장 (재현 정보, 특별실 배정 포함)"""
+    days = settings['days']
+    result = {
+        "seed": run.seed,
+        "run": run.to_dict(),
+        "classes": {
+            f"{grade}-{cls}": {day: list(grid[day_idx]) for day_idx, day in enumerate(days)}
+            for (grade, cls), grid in sorted(timetable.items())
+        },
+        "teachers": {teacher: {day: list(schedule[day]) for day in days}
+                     for teacher, schedule in teacher_schedule.items()},
+        "rooms": {room: {day: list(schedule[day]) for day in days}
+                  for room, schedule in (room_schedule or {}).items()},
+        "report": report_to_dict(report),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def write_xlsx(path, settings, timetable, teacher_schedule, report, room_schedule=None, selection_groups=None):
+    """결과를 엑셀 파일로 저장 (학년별 시트, 교사 시트, 특별실 시트, 검증 결과 시트)"""
+    from export import ExportManager
+    from visualization import VisualizationManager
+    
+    ExportManager(settings, VisualizationManager(settings, selection_groups)).export_workbook(
+        timetable, teacher_schedule, path, report, room_schedule)
+
+
+def main(argv=None):
+    """명령줄 실행 진입점 (종료 코드 반환)"""
+    args = parse_args(argv)
+    output_format = args.format or ("xlsx" if args.output.lower().endswith(".xlsx") else "json")
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    
+    try:
+        data = load_data(args.input)
+    except Exception as e:
+        print(f"❌ 입력 데이터 처리 중 오류가 발생했습니다: {e}", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+    
+    settings = data[0]
+    if args.check:
+        return check(data)
+    
+    history = history_key = None
+    trials = args.trials if args.trials is not None else DEFAULT_TRIALS
+    if args.history and not args.replay:
+        from algorithm import TrialHistory
+        try:
+            history = TrialHistory(args.history)
+        except (OSError, ValueError) as e:
+            print(f"❌ 실행 기록 파일을 읽는 중 오류가 발생했습니다: {e}", file=sys.stderr)
+            return EXIT_INPUT_ERROR
+        _, subjects, teachers, selection_groups, fixed_slots = data
+        # 웹 화면(create_with_history)과 같은 기록을 쓰도록 fingerprint의 인자 순서로 전달
+        history_key = TrialHistory.fingerprint(settings, teachers, subjects, selection_groups, fixed_slots)
+        if args.trials is None:
+            trials = history.suggest_trials(history_key, settings.get('quality_trials', 5), DEFAULT_TRIALS)
+            print(f"📈 실행 기록으로 정한 작업자별 최대 시도 횟수: {trials}", file=sys.stderr)
+    
+    if args.profile:
+        data = (dict(settings, profile=True),) + tuple(data[1:])
+    
+    start_time = time.perf_counter()
+    if args.replay:
+        try:
+            run, timetable, teacher_schedule, report = replay(data, args.replay)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ 배치 기록을 읽는 중 오류가 발생했습니다: {e}", file=sys.stderr)
+            return EXIT_INPUT_ERROR
+    elif args.portfolio:
+        try:
+            run, timetable, teacher_schedule, report = solve_portfolio(
+                data, seed, args.portfolio, trials, args.time_budget, args.quiet, args.trace)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return EXIT_INPUT_ERROR
+    else:
+        run, timetable, teacher_schedule, report = solve(
+            data, seed, trials, max(1, args.workers), args.time_budget, args.quiet, args.trace)
+    elapsed = time.perf_counter() - start_time
+    
+    if args.profile:
+        print_profile(run)
+    
+    if history is not None:
+        history.record(history_key, run)
+        try:
+            history.save()
+        except OSError as e:
+            print(f"⚠️ 실행 기록 파일 저장 중 오류가 발생했습니다: {e}", file=sys.stderr)
+    
+    from algorithm import ScheduleManager
+    schedule_manager = ScheduleManager(settings, data[4], subject_rooms={
+        subject: info['room'] for subject, info in data[1].items() if info.get('room')})
+    room_schedule = schedule_manager.build_room_schedule(teacher_schedule)
+    if not args.no_fill_empty:
+        schedule_manager.fill_empty_slots_with_study(timetable)
+    
+    try:
+        if output_format == "xlsx":
+            write_xlsx(args.output, settings, timetable, teacher_schedule, report, room_schedule, data[3])
+        else:
+            write_json(args.output, settings, run, timetable, teacher_schedule, report, room_schedule)
+    except OSError as e:
+        print(f"❌ 결과 파일 저장 중 오류가 발생했습니다: {e}", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+    
+    status = "✅ 모든 조건 만족" if report.is_valid else f"❌ {', '.join(report.failures())}"
+    if run.result_score is not None:
+        status += f", 품질 점수 {run.result_score}"
+    if run.strategy is not None:
+        status += f", 전략 {run.strategy} (전략 시드 {run.strategy_seed})"
+    print(f"{status} (시드 {run.seed}, 시도 {run.result_trial}, {elapsed:.1f}초) -> {args.output}", file=sys.stderr)
+    return EXIT_OK if report.is_valid else EXIT_INCOMPLETE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
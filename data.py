@@ -7,6 +7,13 @@ settings = {
     "periods_per_day_by_day": {"월": 6, "화": 7, "수": 6, "목": 7, "금": 6},
     "grades": {1: 3, 2: 3, 3: 3},
     "max_consecutive_teaching_hours": 4,  # 연속 수업 시간 제한
+    "teacher_max_hours_mode": "soft",  # 교사 주간 최대 시수: "hard"(초과 배치 금지) / "soft"(배치 후 초과 표시)
+    "core_subjects": ["공통국어", "공통수학", "공통영어", "문학", "수학Ⅰ", "영어Ⅰ"],  # 오전 배치를 선호하는 핵심 과목
+    "morning_periods": 4,  # 오전 교시 수 (1~4교시)
+    "soft_weights": {"teacher_gap": 1, "core_afternoon": 1, "subject_adjacent": 1},  # 품질 점수 항목별 가중치
+    # 특별실 제한이 필요하면 종류별 개수를 지정하고 과목에 "room"을 추가 (기본값: 제한 없음)
+    # 예: "rooms": {"체육관": 1, "과학실": 2}, 과목 "체육": {..., "room": "체육관"}
+    "rooms": {},
     "selection_group_names": ["선택A", "선택B", "선택C","선택D"]  # 선택 그룹 이름 추가
 }
 
@@ -49,6 +56,12 @@ subjects = {
 # -----------------------------
 # 교사 데이터
 # -----------------------------
+# 수업 불가 시간이 있는 교사(예: 시간강사)는 "unavailable"에 (요일, 교시) 목록을 지정합니다.
+# 교시는 고정 시간처럼 1부터 시작하며, None이면 그 요일 전체를 비웁니다.
+#     "강사1": {
+#         "unavailable": [("월", None), ("수", 1)],  # 월요일 전체, 수요일 1교시
+#         "subjects": [...]
+#     },
 teachers = {
     # 국어 교사 분할 예시
     "국어교사1": {
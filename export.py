@@ -0,0 +1,182 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment, Border, Side
+
+# -----------------------------
+# 엑셀 내보내기 모듈
+# -----------------------------
+class ExportManager:
+    """
+    시간표 엑셀 내보내기를 담당하는 클래스
+    모든 학급 시간표와 교사별 시간표를 하나의 엑셀 파일로 저장합니다.
+    openpyxl의 write-only 모드로 행 단위 스트리밍 저장하므로
+    학급/교사 수가 많아도 메모리 사용량이 일정하게 유지됩니다.
+    """
+
+    # 셀 테두리 (모든 셀이 공유)
+    THIN_BORDER = Border(*(Side(style='thin', color='BFBFBF'),) * 4)
+
+    def __init__(self, settings, vis_manager):
+        """
+        초기화: 시간표 설정과 색상 정보를 가진 시각화 관리자 저장
+
+        Args:
+            settings: 시간표 설정 (요일, 학년별 학급 수 등)
+            vis_manager: 과목별 색상(subject_group_colors)을 제공하는 VisualizationManager
+        """
+        self.settings = settings
+        self.vis_manager = vis_manager
+
+    def export_workbook(self, timetable, teacher_schedule, output, report=None, room_schedule=None):
+        """
+        학년별 시트와 교사 시트로 구성된 엑셀 파일 저장
+
+        Args:
+            timetable: 시간표 {(학년, 반): [요일][교시] 리스트}
+            teacher_schedule: 교사 일정 {교사명: {요일: [교시별 수업]}}
+            output: 저장할 파일 경로 또는 파일 객체 (예: io.BytesIO)
+            report: 검증 결과 (ValidationReport, 있으면 '검증 결과' 시트 추가)
+            room_schedule: 특별실 배정 {방 이름: {요일: [교시별 수업]}} (있으면 '특별실별' 시트 추가)
+        """
+        workbook = Workbook(write_only=True)
+        style_names = {}  # CSS 문자열 -> 네임드 스타일 이름 (스타일 캐시)
+
+        days = self.settings['days']
+        period_labels = [f"{i+1}교시" for i in range(self._get_period_count(timetable))]
+
+        # 1. 학년별 시트: 반별 시간표를 위에서 아래로 이어서 기록
+        for grade, class_count in self.settings['grades'].items():
+            sheet = workbook.create_sheet(f"{grade}학년")
+            for cls in range(1, class_count + 1):
+                key = (grade, cls)
+                if key not in timetable:
+                    continue
+                grid = timetable[key]
+                rows = [[grid[day_idx][p] for day_idx in range(len(days))]
+                        for p in range(len(grid[0]))]
+                self._write_table(workbook, sheet, style_names, f"{grade}학년 {cls}반",
+                                  days, period_labels, rows)
+
+        # 2. 교사 시트: 교사별 시간표 (generate_teacher_timetable_view와 같은 교시 x 요일 배치)
+        sheet = workbook.create_sheet("교사별")
+        for teacher, schedule in teacher_schedule.items():
+            rows = [[schedule[day][p] for day in days] for p in range(len(period_labels))]
+            self._write_table(workbook, sheet, style_names, teacher,
+                              days, period_labels, rows)
+
+        # 3. 특별실 시트: 방별 사용 현황 (교사 시트와 같은 교시 x 요일 배치)
+        if room_schedule:
+            sheet = workbook.create_sheet("특별실별")
+            for room, schedule in room_schedule.items():
+                rows = [[schedule[day][p] for day in days] for p in range(len(period_labels))]
+                self._write_table(workbook, sheet, style_names, room, days, period_labels, rows)
+        
+        # 4. 검증 결과 시트
+        if report is not None:
+            self._write_report(workbook, style_names, report)
+
+        workbook.save(output)
+
+    def _write_report(self, workbook, style_names, report):
+        """
+        검증 결과(조건 만족 여부, 부족 시수, 교사별 시수/연속 수업)를 시트에 기록
+        """
+        sheet = workbook.create_sheet("검증 결과")
+
+        def header(*values):
+            sheet.append([self._make_cell(workbook, sheet, style_names, v, "header") for v in values])
+
+        header("항목", "결과")
+        sheet.append(["모든 조건 만족", "예" if report.is_valid else "아니오"])
+        sheet.append(["부족 시수 항목 수", len(report.missing_hours)])
+        sheet.append(["하루 과목 제한", "만족" if report.daily_limit_ok else "초과"])
+        sheet.append(["연속 수업 제한", "만족" if report.consecutive_ok else "초과"])
+        sheet.append(["주간 최대 시수", "만족" if report.teacher_max_ok else f"초과 {len(report.overloaded)}명"])
+        sheet.append(["특별실 개수", "만족" if report.room_ok else f"초과 {len(report.room_overflow)}개 시간대"])
+        sheet.append([])
+
+        if report.missing_hours:
+            header("과목", "학년", "반", "배정 시수", "필요 시수", "부족 시수")
+            for (subject, grade, cls), (required, assigned) in report.missing_hours.items():
+                sheet.append([subject, grade, cls, assigned, required, required - assigned])
+            sheet.append([])
+
+        if report.room_overflow:
+            header("특별실", "요일", "교시", "사용 수", "개수")
+            for (room, day, period), (used, capacity) in report.room_overflow.items():
+                sheet.append([room, day, f"{period + 1}교시", used, capacity])
+            sheet.append([])
+
+        header("교사", "주간 수업 시수", "최대 연속 수업 시간", "주간 최대 시수 초과")
+        for teacher, hours in report.teacher_hours.items():
+            over = report.overloaded.get(teacher)
+            sheet.append([teacher, hours, report.max_consecutive.get(teacher, 0),
+                          f"{over[0] - over[1]}시간 초과 (최대 {over[1]})" if over else ""])
+
+    def _get_period_count(self, timetable):
+        """
+        시간표의 교시 수 (시간표가 비어 있으면 설정의 최대 교시 수)
+        """
+        for grid in timetable.values():
+            return len(grid[0])
+        return max(self.settings['periods_per_day_by_day'].values())
+
+    def _write_table(self, workbook, sheet, style_names, title, days, period_labels, rows):
+        """
+        제목, 요일 헤더, 교시별 행으로 이루어진 표 하나를 시트에 기록
+
+        Args:
+            workbook: write-only 워크북
+            sheet: 기록할 시트
+            style_names: 스타일 캐시 딕셔너리
+            title: 표 제목 (예: "2학년 1반", 교사명)
+            days: 요일 목록
+            period_labels: 교시 라벨 목록
+            rows: 교시별 [요일별 값] 리스트
+        """
+        sheet.append([self._make_cell(workbook, sheet, style_names, title, "title")])
+        sheet.append([self._make_cell(workbook, sheet, style_names, "", "header")] +
+                     [self._make_cell(workbook, sheet, style_names, day, "header") for day in days])
+
+        for label, values in zip(period_labels, rows):
+            cells = [self._make_cell(workbook, sheet, style_names, label, "header")]
+            for val in values:
+                css = self.vis_manager.get_subject_style(val)
+                cells.append(self._make_cell(workbook, sheet, style_names, val, css))
+            sheet.append(cells)
+
+        sheet.append([])  # 표 사이 빈 줄
+
+    def _make_cell(self, workbook, sheet, style_names, value, css):
+        """
+        네임드 스타일이 적용된 write-only 셀 생성
+
+        같은 CSS는 한 번만 NamedStyle로 등록하고 이후에는 이름으로만 참조합니다.
+        """
+        if css not in style_names:
+            name = f"timetable_{len(style_names)}"
+            workbook.add_named_style(self._build_named_style(name, css))
+            style_names[css] = name
+
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.style = style_names[css]
+        return cell
+
+    def _build_named_style(self, name, css):
+        """
+        CSS 문자열(예: 'background-color: #ffcccb')을 NamedStyle로 변환
+        """
+        style = NamedStyle(name=name, border=self.THIN_BORDER,
+                           alignment=Alignment(horizontal='center', vertical='center'))
+
+        if css == "title":
+            style.font = Font(bold=True, size=12)
+            style.border = Border()
+            style.alignment = Alignment(horizontal='left')
+        elif css == "header":
+            style.font = Font(bold=True)
+            style.fill = PatternFill('solid', fgColor='DDDDDD')
+        elif css.startswith('background-color: #'):
+            style.fill = PatternFill('solid', fgColor=css.split('#', 1)[1].upper())
+
+        return style
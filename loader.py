@@ -0,0 +1,147 @@
+import pandas as pd
+
+# '기본 설정' 시트의 설정 항목 -> 알고리즘이 사용하는 settings 키
+SETTING_KEYS = {
+    '운영 요일': 'days',
+    '요일별 교시 수': 'periods_per_day_by_day',
+    '학년별 학급 수': 'grades',
+    '최대 연속 수업 제한': 'max_consecutive_teaching_hours',
+    '선택 그룹 이름': 'selection_group_names',
+    '최대 시수 적용 방식': 'teacher_max_hours_mode',
+    '핵심 과목': 'core_subjects',
+    '오전 교시 수': 'morning_periods',
+}
+
+# '최대 시수 적용 방식' 설정 값 -> teacher_max_hours_mode
+MAX_HOURS_MODES = {'엄격': 'hard', '경고': 'soft', 'hard': 'hard', 'soft': 'soft'}
+
+def load_excel_data(source):
+    """
+    시간표 설정 엑셀 파일을 읽고 필요한 파이썬 데이터 구조로 변환합니다.
+    (각 시트의 주요 컬럼이 비어있으면 읽기를 중단합니다)
+
+    Args:
+        source: 엑셀 파일 경로 또는 업로드된 파일 객체
+
+    Returns:
+        tuple: (settings, subjects, teachers, selection_groups, fixed_slots)
+    """
+    # 1. header=None 옵션으로 헤더 없이 순수 데이터만 먼저 읽어옵니다.
+    all_sheets_raw = pd.read_excel(source, sheet_name=None, header=None)
+
+    # 2. 읽어온 각 시트를 순회하며 헤더를 수동으로 설정합니다.
+    all_sheets = {}
+    for sheet_name, df_raw in all_sheets_raw.items():
+        # 빈 시트일 경우 건너뛰기
+        if df_raw.empty:
+            continue
+        new_header = df_raw.iloc[0]
+        df_new = df_raw[1:]
+        df_new.columns = new_header
+        all_sheets[sheet_name] = df_new.reset_index(drop=True)
+
+    # 3. 정리된 데이터를 사용하여 각 시트를 변환합니다.
+    df_settings = all_sheets.get('기본 설정')
+    df_subjects = all_sheets.get('과목 정보')
+    df_teachers = all_sheets.get('교사 및 배정')
+    df_selection = all_sheets.get('선택과목 그룹')
+    df_fixed = all_sheets.get('고정 시간표')
+    df_unavailable = all_sheets.get('교사 불가 시간')
+    df_rooms = all_sheets.get('특별실 정보')
+
+    settings, subjects, teachers, selection_groups, fixed_slots = {}, {}, {}, {}, set()
+
+    # '기본 설정' 시트 처리
+    if df_settings is not None:
+        for _, row in df_settings.iterrows():
+            # '설정 항목'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['설정 항목']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+
+            key, value = key_val, row['설정 값']
+            if key in ['운영 요일', '선택 그룹 이름', '핵심 과목']: settings[key] = str(value).split(',')
+            elif key in ['요일별 교시 수', '학년별 학급 수']: settings[key] = {item.split(':')[0]: int(item.split(':')[1]) for item in str(value).split(',')}
+            elif key in ['최대 연속 수업 제한', '오전 교시 수']: settings[key] = int(value)
+            else: settings[key] = value
+
+    # 알고리즘이 사용하는 키로도 저장 (학년 키는 정수로 변환)
+    for sheet_key, key in SETTING_KEYS.items():
+        if sheet_key in settings:
+            settings[key] = settings[sheet_key]
+    if 'grades' in settings:
+        settings['grades'] = {int(grade): count for grade, count in settings['grades'].items()}
+    if 'teacher_max_hours_mode' in settings:
+        settings['teacher_max_hours_mode'] = MAX_HOURS_MODES.get(str(settings['teacher_max_hours_mode']).strip(), 'soft')
+
+    # '과목 정보' 시트 처리
+    if df_subjects is not None:
+        for _, row in df_subjects.iterrows():
+            # '과목명'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['과목명']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            subjects[key_val] = {"hours": int(row['주간 시수']), "type": row['수업 유형'], "required": bool(row['필수 여부'])}
+            # '사용 특별실' 열은 선택 사항 (비어 있으면 일반 교실)
+            if '사용 특별실' in row and not pd.isna(row['사용 특별실']) and str(row['사용 특별실']).strip():
+                subjects[key_val]["room"] = str(row['사용 특별실']).strip()
+
+    # '특별실 정보' 시트 처리 (특별실 종류별 개수)
+    if df_rooms is not None:
+        settings['rooms'] = {}
+        for _, row in df_rooms.iterrows():
+            # '특별실'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['특별실']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            settings['rooms'][str(key_val).strip()] = int(row['개수'])
+
+    # '고정 시간표' 시트 처리 (학년 단위 고정 시간을 학년의 모든 반에 적용)
+    if df_fixed is not None:
+        for _, row in df_fixed.iterrows():
+            # '학년'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['학년']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            grade = int(key_val)
+            for cls in range(1, settings.get('grades', {}).get(grade, 0) + 1):
+                fixed_slots.add((grade, cls, row['요일'], int(row['교시']), row['활동명']))
+
+    # '선택과목 그룹' 시트 처리
+    if df_selection is not None:
+        for _, row in df_selection.iterrows():
+            # '학년'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['학년']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            grade, group_name, subject_name = int(key_val), row['선택 그룹명'], row['포함 과목명']
+            if grade not in selection_groups: selection_groups[grade] = {}
+            if group_name not in selection_groups[grade]: selection_groups[grade][group_name] = []
+            selection_groups[grade][group_name].append(subject_name)
+
+    # '교사 및 배정' 시트 처리
+    if df_teachers is not None:
+        for _, row in df_teachers.iterrows():
+            # '교사명'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['교사명']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            teacher_name, subject_name = key_val, row['담당 과목명']
+            if teacher_name not in teachers: teachers[teacher_name] = {"max": int(row['주간 최대 시수']), "subjects": []}
+            classes_list = [int(c) for c in str(row['대상 반(들)']).split(',')]
+            assignment = {"subject": subject_name, "grade": int(row['담당 학년']), "classes": classes_list, "hours": subjects[subject_name]['hours'], "required": subjects[subject_name]['required'], "group": {str(c): row['수업 그룹'] for c in classes_list}}
+            teachers[teacher_name]['subjects'].append(assignment)
+
+    # '교사 불가 시간' 시트 처리 ('교시'가 비어 있으면 그 요일 전체, "1,2"처럼 여러 교시 가능)
+    if df_unavailable is not None:
+        for _, row in df_unavailable.iterrows():
+            # '교사명'이 비어있으면 데이터 끝으로 간주하고 중단
+            key_val = row['교사명']
+            if pd.isna(key_val) or str(key_val).strip() == '':
+                break
+            if key_val not in teachers:
+                raise ValueError(f"'교사 불가 시간' 시트의 교사 '{key_val}'이(가) '교사 및 배정' 시트에 없습니다.")
+            periods = [None] if pd.isna(row['교시']) else [int(float(p)) for p in str(row['교시']).split(',')]
+            teachers[key_val].setdefault('unavailable', []).extend((row['요일'], p) for p in periods)
+
+    return settings, subjects, teachers, selection_groups, list(fixed_slots)
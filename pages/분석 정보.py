@@ -7,22 +7,17 @@ st.set_page_config(layout="wide", page_title="시간표 분석 정보")
 st.title("📊 시간표 분석 정보")
 
 # 세션 상태에 필요한 데이터가 있는지 먼저 확인
-if 'timetable' not in st.session_state:
+if 'result_manager' not in st.session_state:
     st.warning("아직 생성된 시간표가 없습니다. 홈(app.py) 페이지로 돌아가 시간표를 먼저 생성해주세요.")
 else:
-    # 세션에서 분석에 필요한 모든 데이터와 객체를 가져옴
-    validation_manager = st.session_state['validation_manager']
-    timetable = st.session_state['timetable']
-    teacher_schedule = st.session_state['teacher_schedule']
-    teachers = st.session_state['teachers']
-    selection_groups = st.session_state['selection_groups']
+    # 시간표 버전별로 캐시된 분석 결과 사용 (페이지 이동/재실행 시 재계산 없음)
+    result_manager = st.session_state['result_manager']
 
     st.subheader("1. 과목별 시수 충족 여부 검증")
     
-    # 시수 완료 검증 및 표시 (가져온 데이터 사용)
-    missing_hours = validation_manager.check_subject_hours_completed(
-        timetable, teachers, selection_groups)
-        
+    # 시수 완료 검증 및 표시 (캐시된 결과 사용)
+    missing_hours = result_manager.missing_hours()
+
     if not missing_hours:
         st.success("✅ 모든 과목이 필요한 시수만큼 정확히 배치되었습니다.")
     else:
@@ -44,11 +39,86 @@ else:
     st.subheader("2. 교사별 연속 수업 시간 분석")
     st.info(f"설정된 교사별 최대 연속 수업 시간은 **{st.session_state['settings']['max_consecutive_teaching_hours']}시간** 입니다.")
     
-    consecutive_analysis = validation_manager.analyze_consecutive_teaching(teacher_schedule)
+    consecutive_analysis = result_manager.consecutive_analysis()
     
     consecutive_df = pd.DataFrame({
         "교사": list(consecutive_analysis.keys()),
         "최대 연속 수업 시간": list(consecutive_analysis.values())
     }).sort_values("최대 연속 수업 시간", ascending=False)
     
-    st.dataframe(consecutive_df, height=400, use_container_width=True)
\ No newline at end of file
+    st.dataframe(consecutive_df, height=400, use_container_width=True)
+    
+    st.write("---")
+    
+    # 교사별 주간 시수와 최대 시수 비교
+    st.subheader("3. 교사별 주간 시수")
+    overloads = result_manager.teacher_overloads()
+    if not overloads:
+        st.success("✅ 모든 교사가 주간 최대 시수 이내입니다.")
+    else:
+        st.warning("⚠️ 주간 최대 시수를 넘은 교사가 있습니다. 교사 배정이나 최대 시수 설정을 확인해주세요.")
+        st.dataframe(pd.DataFrame([
+            {"교사": teacher, "주간 시수": hours, "최대 시수": limit, "초과 시수": hours - limit}
+            for teacher, (hours, limit) in overloads.items()
+        ]), use_container_width=True)
+    
+    st.write("---")
+    
+    # 품질 점수 (부드러운 제약 조건 위반 정도, 낮을수록 좋음)
+    st.subheader("4. 시간표 품질 점수")
+    quality = result_manager.quality()
+    if quality is None:
+        st.info("품질 점수 정보가 없습니다.")
+    else:
+        counts, score = quality
+        st.info(f"품질 점수는 **{score}점** 입니다. (낮을수록 좋음)")
+        labels = {"teacher_gap": "교사 공강 (첫 수업과 마지막 수업 사이 빈 시간)",
+                  "core_afternoon": "오전 밖에 배치된 핵심 과목",
+                  "subject_adjacent": "이웃한 요일에 연달아 배치된 과목"}
+        st.dataframe(pd.DataFrame([
+            {"항목": labels.get(name, name), "위반 횟수": count,
+             "가중치": result_manager.score_manager.weights.get(name, 0)}
+            for name, count in counts.items()
+        ]), use_container_width=True)
+    
+    st.write("---")
+    
+    # 생성 과정: 시도별 부족 시수와 단계별 실행 시간 (어느 단계에서 시간이 쓰였는지 확인)
+    st.subheader("5. 생성 과정 분석")
+    run = result_manager.run
+    if run is None or not (run.trial_missing or run.components):
+        st.info("생성 과정 정보가 없습니다.")
+    else:
+        # 묶음별로 나누어 생성한 경우 묶음마다 따로 표시
+        runs = run.components or [run]
+        series = {}
+        for i, component_run in enumerate(runs):
+            name = f"묶음 {i + 1}" if run.components else "부족 시수"
+            series[name] = pd.Series(component_run.trial_missing, index=range(1, len(component_run.trial_missing) + 1))
+        st.write("**시도별 부족 시수 항목 수** (0이어도 다른 조건을 어기면 실패한 시도)")
+        st.line_chart(pd.DataFrame(series))
+        
+        scores = {f"묶음 {i + 1}" if run.components else "품질 점수":
+                  pd.Series(component_run.trial_scores, index=range(1, len(component_run.trial_scores) + 1),
+                            dtype=float)
+                  for i, component_run in enumerate(runs)}
+        st.write("**시도별 품질 점수** (모든 조건을 만족한 시도만, 낮을수록 좋음)")
+        st.scatter_chart(pd.DataFrame(scores))
+        
+        summary = result_manager.phase_summary()
+        if not summary:
+            st.info("단계별 실행 시간을 측정하지 않았습니다. (메인 화면 사이드바의 '단계별 실행 시간 측정'을 켜고 생성하면 측정)")
+        else:
+            labels = {"selection_groups": "특별 선택 그룹 배치", "choice_groups": "일반 선택 그룹 배치",
+                      "optional_blocks": "선택 과목 배치", "required_blocks": "필수 과목 배치",
+                      "learning": "탐색 기억/학습 갱신", "fill_empty_slots": "빈 교시 재배치",
+                      "validation": "검증", "improve": "품질 개선", "trial": "시도 전체"}
+            phase_df = pd.DataFrame([
+                {"단계": labels.get(phase, phase), "측정 횟수": stats["count"],
+                 "합계(초)": stats["total"], "중앙값(ms)": stats["p50"] * 1000,
+                 "90%(ms)": stats["p90"] * 1000, "99%(ms)": stats["p99"] * 1000, "최대(ms)": stats["max"] * 1000}
+                for phase, stats in summary.items()
+            ])
+            st.write("**단계별 실행 시간**")
+            st.bar_chart(phase_df[phase_df["단계"] != labels["trial"]].set_index("단계")["합계(초)"])
+            st.dataframe(phase_df.round(3), use_container_width=True)
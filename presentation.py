@@ -0,0 +1,54 @@
+import pandas as pd
+
+# -----------------------------
+# 표시용 변환 모듈
+# -----------------------------
+# 시간표 생성 알고리즘은 pandas 없이 [요일][교시] 리스트로 동작하므로,
+# 화면 표시나 분석에 DataFrame이 필요할 때만 이 모듈을 불러와 변환합니다.
+
+def period_labels(count):
+    """교시 라벨 목록 (예: ["1교시", "2교시", ...])"""
+    return [f"{i+1}교시" for i in range(count)]
+
+def class_frame(grid, days):
+    """
+    학급 시간표 하나를 (요일 x 교시) DataFrame으로 변환
+
+    Args:
+        grid: 학급 시간표 [요일][교시] 리스트
+        days: 요일 목록
+
+    Returns:
+        DataFrame: 행은 요일, 열은 "N교시"
+    """
+    return pd.DataFrame(grid, index=days, columns=period_labels(len(grid[0]) if grid else 0))
+
+def timetable_frames(timetable, days):
+    """
+    전체 시간표를 {(학년, 반): DataFrame} 형태로 변환
+
+    Args:
+        timetable: 시간표 {(학년, 반): [요일][교시] 리스트}
+        days: 요일 목록
+
+    Returns:
+        dict: {(학년, 반): (요일 x 교시) DataFrame}
+    """
+    return {key: class_frame(grid, days) for key, grid in timetable.items()}
+
+def teacher_frame(schedule, days, max_periods):
+    """
+    교사 일정 하나를 (교시 x 요일) DataFrame으로 변환
+
+    Args:
+        schedule: 교사 일정 {요일: [교시별 수업]}
+        days: 요일 목록
+        max_periods: 표시할 교시 수
+
+    Returns:
+        DataFrame: 행은 "N교시", 열은 요일
+    """
+    return pd.DataFrame(
+        {day: schedule[day][:max_periods] for day in days},
+        index=period_labels(max_periods)
+    )
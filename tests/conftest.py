@@ -0,0 +1,38 @@
+"""
+테스트 공통 설정
+
+저장소 루트의 모듈(algorithm, data)을 불러올 수 있도록 경로를 추가하고,
+고정 시드로 만든 시간표를 여러 테스트에서 함께 사용합니다.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithm import TimetableManager  # noqa: E402
+import data  # noqa: E402
+
+SEEDS = [0, 1, 2]
+
+
+def make_manager(seed):
+    """기본 학교 데이터로 배치 기록을 남기는 TimetableManager 생성"""
+    return TimetableManager(data.settings, data.teachers, data.subjects, data.selection_groups,
+                            data.fixed_slots, seed=seed, record_trace=True)
+
+
+@pytest.fixture(scope="session")
+def generated():
+    """시드별 (TimetableManager, 시간표, 교사 일정) - 생성 과정의 출력은 숨김"""
+    result = {}
+    for seed in SEEDS:
+        manager = make_manager(seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            timetable, teacher_schedule = manager.create_timetable()
+        result[seed] = (manager, timetable, teacher_schedule)
+    return result
@@ -0,0 +1,21 @@
+"""명령줄 실행과 웹 화면(create_with_history)이 같은 실행 기록을 공유하는지 확인"""
+
+import contextlib
+import io
+import json
+
+import cli
+from conftest import make_manager
+
+
+def test_cli_and_app_share_history(tmp_path):
+    history_path = tmp_path / "trial_history.json"
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        cli.main(["--seed", "0", "--trials", "2", "--quiet", "--history", str(history_path),
+                  "--output", str(tmp_path / "timetable.json")])
+        make_manager(0).create_with_history(str(history_path))
+    
+    with open(history_path, encoding="utf-8") as f:
+        records = json.load(f)
+    assert len(records) == 1
+    assert len(next(iter(records.values()))) == 2
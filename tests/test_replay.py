@@ -0,0 +1,33 @@
+"""배치 기록(trace)으로 재현한 시간표가 원래 결과와 같은지 확인"""
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from conftest import SEEDS, make_manager
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_replay_reproduces_result(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    run = manager.last_run
+    assert run.trace
+    
+    # 결과 파일로 저장했다가 새 관리자로 재현하는 경우 (cli --replay와 같은 경로)
+    saved = json.loads(json.dumps(run.to_dict()))
+    replayed, replayed_schedule = make_manager(seed).replay(saved["trace"])
+    
+    assert replayed == timetable
+    assert replayed_schedule == teacher_schedule
+    score_manager = manager.score_manager
+    assert score_manager.score(replayed, replayed_schedule) == run.result_score == saved["result_score"]
+
+
+def test_same_seed_same_timetable(generated):
+    seed = SEEDS[0]
+    _, timetable, teacher_schedule = generated[seed]
+    with contextlib.redirect_stdout(io.StringIO()):
+        again = make_manager(seed).create_timetable()
+    assert again == (timetable, teacher_schedule)
@@ -0,0 +1,66 @@
+"""ScoreManager.delta와 전체 점수 재계산 비교"""
+
+import copy
+import random
+
+import pytest
+
+from conftest import SEEDS
+
+
+def lessons(manager, timetable, teacher_schedule):
+    """옮길 수 있는 수업 목록 [(학년, 반, 요일, 교시, 과목, 교사, 교사 일정 값)]"""
+    calendar = manager.score_manager.calendar
+    result = []
+    for teacher, schedule in sorted(teacher_schedule.items()):
+        for day in calendar.days:
+            for period, label in enumerate(schedule[day]):
+                for (grade, cls), grid in timetable.items():
+                    subject = grid[calendar.day_index[day]][period]
+                    if subject and label == f"{subject} ({grade}-{cls})":
+                        result.append((grade, cls, day, period, subject, teacher, label))
+    return result
+
+
+def random_changes(manager, timetable, teacher_schedule, rng):
+    """수업 하나를 같은 반의 다른 교시로 옮기거나 두 수업을 맞바꾸는 변경 목록"""
+    calendar = manager.score_manager.calendar
+    grade, cls, day, period, subject, teacher, label = rng.choice(
+        lessons(manager, timetable, teacher_schedule))
+    to_day = rng.choice(calendar.days)
+    to_period = rng.choice(calendar.open_periods(grade, cls, to_day))
+    changes = [(grade, cls, day, period, "", teacher, "")]
+    other = [lesson for lesson in lessons(manager, timetable, teacher_schedule)
+             if lesson[:4] == (grade, cls, to_day, to_period)]
+    if other:
+        # 옮겨 갈 자리의 수업은 원래 자리로 맞바꿈
+        _, _, _, _, other_subject, other_teacher, other_label = other[0]
+        changes += [(grade, cls, to_day, to_period, "", other_teacher, ""),
+                    (grade, cls, day, period, other_subject, other_teacher, other_label)]
+    changes.append((grade, cls, to_day, to_period, subject, teacher, label))
+    return changes
+
+
+def apply_changes(manager, timetable, teacher_schedule, changes):
+    calendar = manager.score_manager.calendar
+    for grade, cls, day, period, cell, teacher, label in changes:
+        timetable[(grade, cls)][calendar.day_index[day]][period] = cell
+        teacher_schedule[teacher][day][period] = label
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_delta_matches_rescore(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    timetable = copy.deepcopy(timetable)
+    teacher_schedule = copy.deepcopy(teacher_schedule)
+    score_manager = manager.score_manager
+    rng = random.Random(seed)
+    for _ in range(30):
+        changes = random_changes(manager, timetable, teacher_schedule, rng)
+        before = score_manager.score(timetable, teacher_schedule)
+        snapshot = copy.deepcopy((timetable, teacher_schedule))
+        delta = score_manager.delta(timetable, teacher_schedule, changes)
+        # delta는 시간표를 바꾸지 않아야 함
+        assert (timetable, teacher_schedule) == snapshot
+        apply_changes(manager, timetable, teacher_schedule, changes)
+        assert score_manager.score(timetable, teacher_schedule) - before == delta
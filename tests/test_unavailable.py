@@ -0,0 +1,26 @@
+"""수업 불가 시간 때문에 배치할 수 없는 입력도 시간표 생성이 끝나고 검증 결과를 내는지 확인"""
+
+import contextlib
+import copy
+import io
+
+import data
+from algorithm import TimetableManager
+
+
+def test_unavailable_group_teacher():
+    teachers = copy.deepcopy(data.teachers)
+    teachers['물리교사']['unavailable'] = [(day, None) for day in data.settings['days']]
+    manager = TimetableManager(data.settings, teachers, data.subjects, data.selection_groups,
+                               data.fixed_slots, seed=0)
+    
+    # 생성 전 검사에서 배치할 수 없는 선택 그룹을 알림
+    assert any(issue['level'] == 'error' and '선택A' in issue['message']
+               for issue in manager.check_feasibility())
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        timetable, teacher_schedule = manager.create_timetable(max_trials=3)
+    report = manager.validation_manager.validate(timetable, teacher_schedule, teachers, data.selection_groups)
+    assert not report.is_valid
+    assert report.missing_hours
+    assert all(not any(teacher_schedule['물리교사'][day]) for day in data.settings['days'])
@@ -0,0 +1,82 @@
+"""ValidationManager.validate와 기존 과목별 검증 함수의 결과 비교"""
+
+import copy
+import random
+
+import pytest
+
+import data
+from conftest import SEEDS
+
+
+def legacy_checks(manager, timetable, teacher_schedule):
+    """기존 검증 함수들로 계산한 (부족 시수, 하루 과목 제한, 연속 수업 제한, 교사별 최대 연속 수업)"""
+    validation = manager.validation_manager
+    limit = data.settings['max_consecutive_teaching_hours']
+    return (validation.check_subject_hours_completed(timetable, data.teachers, data.selection_groups),
+            validation.check_daily_subject_limit(timetable),
+            validation.check_consecutive_teaching_limit(teacher_schedule, limit),
+            validation.analyze_consecutive_teaching(teacher_schedule))
+
+
+def assert_same(manager, timetable, teacher_schedule):
+    report = manager.validation_manager.validate(timetable, teacher_schedule, data.teachers,
+                                                 data.selection_groups)
+    missing_hours, daily_limit_ok, consecutive_ok, max_consecutive = legacy_checks(
+        manager, timetable, teacher_schedule)
+    assert report.missing_hours == missing_hours
+    assert report.daily_limit_ok == daily_limit_ok
+    assert report.consecutive_ok == consecutive_ok
+    assert report.max_consecutive == max_consecutive
+    return report
+
+
+def lesson_cells(timetable):
+    """수업이 들어 있는 (학급, 요일 색인, 교시) 목록 (창체, 자습 제외)"""
+    return [(key, day_idx, period)
+            for key, grid in sorted(timetable.items())
+            for day_idx, row in enumerate(grid)
+            for period, cell in enumerate(row)
+            if cell and cell not in ("창체", "자습")]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_generated_timetable(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    report = assert_same(manager, timetable, teacher_schedule)
+    assert report.is_valid
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_removed_lessons(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    timetable = copy.deepcopy(timetable)
+    rng = random.Random(seed)
+    for key, day_idx, period in rng.sample(lesson_cells(timetable), 5):
+        timetable[key][day_idx][period] = ""
+    report = assert_same(manager, timetable, teacher_schedule)
+    assert report.missing_hours
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_repeated_subject(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    timetable = copy.deepcopy(timetable)
+    rng = random.Random(seed)
+    key, day_idx, period = rng.choice(lesson_cells(timetable))
+    row = timetable[key][day_idx]
+    row[(period + 1) % len(row)] = row[period]
+    report = assert_same(manager, timetable, teacher_schedule)
+    assert not report.daily_limit_ok
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_long_teaching_run(generated, seed):
+    manager, timetable, teacher_schedule = generated[seed]
+    teacher_schedule = copy.deepcopy(teacher_schedule)
+    rng = random.Random(seed)
+    teacher = rng.choice(sorted(teacher_schedule))
+    day = rng.choice(data.settings['days'])
+    teacher_schedule[teacher][day] = ["수업"] * len(teacher_schedule[teacher][day])
+    report = assert_same(manager, timetable, teacher_schedule)
+    assert not report.consecutive_ok
@@ -0,0 +1,373 @@
+import io
+import threading
+
+# -----------------------------
+# 시각화 모듈
+# -----------------------------
+class VisualizationManager:
+    """시간표 시각화를 담당하는 클래스"""
+    
+    # 기본 색상이 없는 선택 그룹(예: 3학년 '선택E')에 차례로 배정할 색상
+    EXTRA_GROUP_COLORS = ['#ffd6a5', '#caffbf', '#9bf6ff', '#bdb2ff', '#ffc6ff', '#fdffb6']
+    
+    def __init__(self, settings, selection_groups=None):
+        """
+        Args:
+            settings: 시간표 설정
+            selection_groups: 선택 그룹 정보 {학년: {그룹 이름: [과목]}} (반 시간표의 그룹 이름 색상 지정용)
+        """
+        self.settings = settings
+        
+        # 과목 그룹별 색상 정의
+        self.subject_group_colors = {
+            # 기본 항목
+            "empty": 'background-color: #f0f0f0',
+            "자습": 'background-color: #e9ecef',
+            "창체": 'background-color: #d4edda',
+            
+            # 선택 그룹
+            "선택A": 'background-color: #ffcccb',  # 연한 빨간색
+            "선택B": 'background-color: #ffec99',  # 연한 노란색
+            "선택C": 'background-color: #a8d8ea',  # 연한 파란색
+            "선택D": 'background-color: #d8b5ff',  # 연한 보라색
+            
+            # 국어 계열
+            "국어계열": 'background-color: #fff3cd',  # 노란색 계열
+            
+            # 수학 계열
+            "수학계열": 'background-color: #d1ecf1',  # 파란색 계열
+            
+            # 영어 계열
+            "영어계열": 'background-color: #f8d7da',  # 빨간색 계열
+            
+            # 과학 계열
+            "과학계열": 'background-color: #e2e3e5',  # 회색 계열
+            
+            # 사회 계열
+            "사회계열": 'background-color: #ffe0b2',  # 주황색 계열
+            
+            # 제2외국어 계열
+            "외국어계열": 'background-color: #c8e6c9',  # 초록색 계열
+            
+            # 예체능 계열
+            "예체능계열": 'background-color: #bbdefb',  # 하늘색 계열
+            
+            # 기타 계열
+            "기타계열": 'background-color: #d7ccc8'  # 갈색 계열
+        }
+        
+        # 선택 그룹 이름 (모든 학년, 데이터 순서) - 기본 색상이 없는 그룹은 추가 색상 배정
+        self.selection_group_names = list(dict.fromkeys(
+            ["선택A", "선택B", "선택C", "선택D"] +
+            [name for groups in (selection_groups or {}).values() for name in groups]))
+        extra = [name for name in self.selection_group_names if name not in self.subject_group_colors]
+        for idx, name in enumerate(extra):
+            color = self.EXTRA_GROUP_COLORS[idx % len(self.EXTRA_GROUP_COLORS)]
+            self.subject_group_colors[name] = f'background-color: {color}'
+        
+        # 과목별 그룹 매핑
+        self.subject_to_group = {
+            # 국어 계열 과목
+            "국어": "국어계열",
+            "문학": "국어계열",
+            "독서": "국어계열",
+            "화법과 작문": "국어계열",
+            "언어와 매체": "국어계열",
+            
+            # 수학 계열 과목
+            "수학": "수학계열",
+            "수학Ⅰ": "수학계열",
+            "수학Ⅱ": "수학계열",
+            "확률과 통계": "수학계열",
+            "미적분": "수학계열",
+            "기하": "수학계열",
+            
+            # 영어 계열 과목
+            "영어": "영어계열",
+            "영어Ⅰ": "영어계열",
+            "영어Ⅱ": "영어계열",
+            "영어 회화": "영어계열",
+            "영어 독해와 작문": "영어계열",
+            
+            # 과학 계열 과목
+            "과학": "과학계열",
+            "통합과학": "과학계열",
+            "물리학Ⅰ": "과학계열",
+            "화학Ⅰ": "과학계열",
+            "생명과학Ⅰ": "과학계열",
+            "지구과학Ⅰ": "과학계열",
+            "물리학Ⅱ": "과학계열",
+            "화학Ⅱ": "과학계열",
+            "생명과학Ⅱ": "과학계열",
+            "지구과학Ⅱ": "과학계열",
+            
+            # 사회 계열 과목
+            "사회": "사회계열",
+            "통합사회": "사회계열",
+            "한국사": "사회계열",
+            "세계사": "사회계열",
+            "경제": "사회계열",
+            "정치와 법": "사회계열",
+            "사회·문화": "사회계열",
+            "생활과 윤리": "사회계열",
+            "윤리와 사상": "사회계열",
+            "한국지리": "사회계열",
+            "세계지리": "사회계열",
+            "역사": "사회계열",
+            
+            # 제2외국어 계열
+            "중국어Ⅰ": "외국어계열",
+            "일본어Ⅰ": "외국어계열",
+            "독일어Ⅰ": "외국어계열",
+            "프랑스어Ⅰ": "외국어계열",
+            "스페인어Ⅰ": "외국어계열",
+            "중국어Ⅱ": "외국어계열",
+            "일본어Ⅱ": "외국어계열",
+            
+            # 예체능 계열
+            "체육": "예체능계열",
+            "음악": "예체능계열",
+            "미술": "예체능계열",
+            "연극": "예체능계열",
+            
+            # 기타 계열
+            "정보": "기타계열",
+            "프로그래밍/Python": "기타계열",
+            "진로": "기타계열"
+        }
+        
+        # 셀 값 -> 스타일 조회표 (color_subjects가 매번 매핑을 훑지 않도록 미리 계산)
+        self._style_cache = self._build_style_cache()
+        
+        # 교사별 시간표 뷰 캐시 (시간표 버전별)
+        self._teacher_view_cache = {}
+        self._teacher_view_version = None
+    
+    def generate_teacher_timetable_view(self, teacher_schedule):
+        """교사별 시간표 뷰 생성"""
+        return {teacher: self._build_teacher_view(schedule)
+                for teacher, schedule in teacher_schedule.items()}
+    
+    def get_teacher_timetable_view(self, teacher_schedule, teacher, version):
+        """
+        한 교사의 시간표 뷰 반환 (시간표 버전별로 한 번만 생성)
+        
+        Args:
+            teacher_schedule: 교사 일정
+            teacher: 교사명
+            version: 생성된 시간표의 버전 (새 시간표가 생성되면 캐시를 비움)
+        """
+        if version != self._teacher_view_version:
+            self._teacher_view_cache = {}
+            self._teacher_view_version = version
+        
+        if teacher not in self._teacher_view_cache:
+            self._teacher_view_cache[teacher] = self._build_teacher_view(teacher_schedule[teacher])
+        return self._teacher_view_cache[teacher]
+    
+    def _build_teacher_view(self, schedule):
+        """교사 일정 배열로부터 (교시 x 요일) DataFrame을 한 번에 생성"""
+        from presentation import teacher_frame  # pandas는 표가 필요할 때만 불러옴
+        max_periods = max(self.settings['periods_per_day_by_day'].values())
+        return teacher_frame(schedule, self.settings['days'], max_periods)
+    
+    def display_all_class_timetables(self, timetable, grade, classes, result_manager=None):
+        """특정 학년의 모든 반 시간표를 표시 (result_manager가 있으면 캐시된 표 사용)"""
+        import streamlit as st  # 화면 표시에만 필요하므로 이 함수에서만 불러옴
+        
+        col_count = min(3, classes)
+        
+        cols = st.columns(col_count)
+        
+        for cls in range(1, classes + 1):
+            col_idx = (cls - 1) % col_count
+            key = (grade, cls)
+            
+            with cols[col_idx]:
+                st.subheader(f"{grade}학년 {cls}반 시간표")
+                if key in timetable:
+                    # 색상으로 과목 표시
+                    if result_manager is not None:
+                        styled_df = result_manager.styled_class_timetable(key)
+                    else:
+                        from presentation import class_frame
+                        styled_df = class_frame(timetable[key], self.settings['days']).T.style.apply(
+                            self.color_subjects, axis=None)
+                    st.dataframe(styled_df, height=300, use_container_width=True)
+                else:
+                    st.warning("시간표가 존재하지 않습니다.")
+    
+    def color_subjects(self, df):
+        """시간표에 과목별 색상 적용 (셀 값 -> 스타일 조회표를 이용해 한 번에 매핑)"""
+        return df.map(self.get_subject_style)
+    
+    def get_subject_style(self, val):
+        """셀 값(과목명, 선택 그룹, 자습 등)에 해당하는 색상 스타일 반환"""
+        style = self._style_cache.get(val)
+        if style is None:
+            # 처음 보는 값(예: 교사 시간표의 "문학 (2-1)")은 한 번만 계산하여 저장
+            style = self._resolve_subject_style(val)
+            self._style_cache[val] = style
+        return style
+    
+    def _build_style_cache(self):
+        """자주 등장하는 셀 값의 스타일을 미리 계산한 조회표 생성"""
+        cache = {"": self.subject_group_colors["empty"]}
+        for label in self.selection_group_names + ["자습", "창체"]:
+            cache[label] = self.subject_group_colors[label]
+        for subject in self.subject_to_group:
+            cache[subject] = self._resolve_subject_style(subject)
+        return cache
+    
+    def _resolve_subject_style(self, val):
+        """조회표에 없는 셀 값의 스타일 계산"""
+        # 빈 셀인 경우
+        if val == "":
+            return self.subject_group_colors["empty"]
+        
+        # 선택 그룹인 경우 (선택A, 선택B 등 selection_groups의 그룹 이름)
+        if val in self.selection_group_names:
+            return self.subject_group_colors[val]
+        
+        # 자습, 창체인 경우
+        if val in ["자습", "창체"]:
+            return self.subject_group_colors[val]
+        
+        # 과목 그룹 매핑을 확인하여 색상 적용
+        for subject_prefix, group in self.subject_to_group.items():
+            if subject_prefix in val:  # 과목명이 포함되어 있는지 확인
+                return self.subject_group_colors[group]
+        
+        # 매핑된 그룹이 없는 경우 기타 계열로 처리
+        return self.subject_group_colors["기타계열"]
+
+# -----------------------------
+# 결과 캐시 모듈
+# -----------------------------
+class ResultManager:
+    """
+    생성된 시간표 하나에서 파생되는 분석 결과를 캐시하는 클래스
+    시간표가 생성될 때마다 새 버전으로 만들어지며, 부족 시수, 연속 수업 분석,
+    교사별 시수, 교사별 시간표, 색상 적용된 표 등을 버전별로 한 번만 계산합니다.
+    """
+    
+    def __init__(self, version, timetable, teacher_schedule, teachers, selection_groups,
+                 validation_manager, vis_manager, score_manager=None, run=None):
+        """
+        초기화: 생성된 시간표와 분석에 필요한 관리자 객체 저장
+        
+        Args:
+            version: 시간표 버전 (생성할 때마다 증가)
+            timetable: 시간표
+            teacher_schedule: 교사 일정
+            teachers: 교사 정보
+            selection_groups: 선택 그룹 정보
+            validation_manager: 검증 관리자
+            vis_manager: 시각화 관리자
+            score_manager: 품질 점수 관리자 (ScoreManager, 없으면 품질 점수를 계산하지 않음)
+            run: 생성 과정의 재현 정보 (RunRecord, 시도별 부족 시수와 단계별 실행 시간 표시에 사용)
+        """
+        self.version = version
+        self.timetable = timetable
+        self.teacher_schedule = teacher_schedule
+        self.teachers = teachers
+        self.selection_groups = selection_groups
+        self.validation_manager = validation_manager
+        self.vis_manager = vis_manager
+        self.score_manager = score_manager
+        self.run = run
+        
+        self._cache = {}
+        self._lock = threading.RLock()  # 백그라운드 사전 계산과 페이지 접근이 겹쳐도 한 번만 계산
+    
+    def _get(self, key, compute):
+        """캐시에 없으면 계산하여 저장한 뒤 반환"""
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+    
+    def report(self):
+        """검증 결과 (부족 시수, 연속 수업, 교사 시수를 한 번에 계산)"""
+        return self._get("report", lambda: self.validation_manager.validate(
+            self.timetable, self.teacher_schedule, self.teachers, self.selection_groups))
+    
+    def missing_hours(self):
+        """부족 시수 정보"""
+        return self.report().missing_hours
+    
+    def consecutive_analysis(self):
+        """교사별 최대 연속 수업 시간"""
+        return self.report().max_consecutive
+    
+    def teacher_hours(self):
+        """교사별 주간 수업 시수"""
+        return self.report().teacher_hours
+    
+    def teacher_overloads(self):
+        """주간 최대 시수를 넘은 교사 {교사명: (주간 시수, 최대 시수)}"""
+        return self.report().overloaded
+    
+    def quality(self):
+        """품질 점수 항목별 위반 횟수와 가중 점수 ({항목: 횟수}, 점수), score_manager가 없으면 None"""
+        if self.score_manager is None:
+            return None
+        def compute():
+            counts = self.score_manager.breakdown(self.timetable, self.teacher_schedule)
+            return counts, sum(self.score_manager.weights.get(name, 0) * count for name, count in counts.items())
+        return self._get("quality", compute)
+    
+    def phase_summary(self):
+        """단계별 실행 시간 요약 (RunRecord.phase_summary, 측정하지 않았으면 빈 딕셔너리)"""
+        if self.run is None:
+            return {}
+        return self._get("phase_summary", self.run.phase_summary)
+    
+    def teacher_view(self, teacher):
+        """교사별 시간표 (교시 x 요일)"""
+        return self._get(("teacher_view", teacher), lambda: self.vis_manager.get_teacher_timetable_view(
+            self.teacher_schedule, teacher, self.version))
+    
+    def class_frame(self, key):
+        """학급 시간표 DataFrame (요일 x 교시)"""
+        def build():
+            from presentation import class_frame  # pandas는 표가 필요할 때만 불러옴
+            return class_frame(self.timetable[key], self.vis_manager.settings['days'])
+        return self._get(("class_frame", key), build)
+    
+    def styled_class_timetable(self, key):
+        """색상이 적용된 학급 시간표 (교시 x 요일)"""
+        return self._get(("styled_class", key), lambda: self._style(self.class_frame(key).T))
+    
+    def styled_teacher_view(self, teacher):
+        """색상이 적용된 교사 시간표 (요일 x 교시)"""
+        return self._get(("styled_teacher", teacher), lambda: self._style(self.teacher_view(teacher).T))
+    
+    def excel_export(self):
+        """전체 시간표 엑셀 파일 (bytes)"""
+        def build():
+            from export import ExportManager
+            buffer = io.BytesIO()
+            ExportManager(self.vis_manager.settings, self.vis_manager).export_workbook(
+                self.timetable, self.teacher_schedule, buffer)
+            return buffer.getvalue()
+        return self._get("excel_export", build)
+    
+    def precompute(self):
+        """모든 분석 결과를 미리 계산 (페이지 이동 시 재계산이 없도록)"""
+        self.report()
+        for key in self.timetable:
+            self.styled_class_timetable(key)
+        for teacher in self.teacher_schedule:
+            self.styled_teacher_view(teacher)
+    
+    def precompute_in_background(self):
+        """모든 분석 결과를 백그라운드 스레드에서 미리 계산"""
+        thread = threading.Thread(target=self.precompute, daemon=True)
+        thread.start()
+        return thread
+    
+    def _style(self, df):
+        """색상 스타일을 미리 계산해 둔 Styler 생성 (렌더링 시 색상 조회를 반복하지 않음)"""
+        styles = self.vis_manager.color_subjects(df)
+        return df.style.apply(lambda _: styles, axis=None)